@@ -0,0 +1,7 @@
+"""
+Shared analysis code for the Reddit skills-based hiring project.
+
+Modules here are imported by both the cleaning pipeline
+(``scripts/clean_data.py``) and the dashboard (``streamlit_dashboard.py``).
+None of them import Streamlit.
+"""
@@ -0,0 +1,123 @@
+"""
+Author activity index and burst (brigading) detector.
+
+``ActivityIndex`` sorts events once by (key, timestamp) and stores, per key
+code, the offsets of its sorted timestamp run (CSR). With one key per author
+it maps each author to their posting times. With one key per author x
+subreddit it supports the sliding-window counts the burst detector needs.
+
+Burst detection counts, for every record, the same author's records in the
+same subreddit within the trailing ``window``. A binary search over the
+sorted composite key finds each window's left edge, so the whole pass is
+O(n log n). A record is a burst peak when its window holds at least
+``min_count`` records *and* at least ``multiplier`` times the author x
+subreddit baseline: their rate over the ``baseline`` period just before the
+window, found with the same binary search. A key with no recent history has
+a zero baseline, so only ``min_count`` applies to it. Every record inside a
+peak's window is flagged.
+"""
+import numpy as np
+import pandas as pd
+
+BURST_WINDOW = pd.Timedelta(hours=1)
+BURST_MIN_COUNT = 5
+BURST_MULTIPLIER = 10.0
+# Trailing period, before each window, that sets the author x subreddit's usual rate
+BURST_BASELINE = pd.Timedelta(days=14)
+# Placeholder authors shared by many accounts; never treated as one person
+ANONYMOUS_AUTHORS = {"unknown", "None", "[deleted]"}
+
+
+class ActivityIndex:
+    """Event timestamps grouped by integer key, each group sorted by time.
+
+    ``times[offsets[k]:offsets[k + 1]]`` are key ``k``'s timestamps (int64 ns)
+    and ``rows`` the original row of each sorted event.
+    """
+
+    def __init__(self, codes: np.ndarray, times: np.ndarray):
+        n_keys = int(codes.max()) + 1 if len(codes) else 0
+        self.rows = np.lexsort((times, codes))
+        self.codes = codes[self.rows]
+        self.times = times[self.rows]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n_keys))])
+
+    @classmethod
+    def from_columns(cls, keys, created) -> "ActivityIndex":
+        """Index ``created`` timestamps by the values in ``keys`` (any hashable labels)."""
+        codes, labels = pd.factorize(keys, sort=True)
+        index = cls(codes.astype(np.int64), np.asarray(created, dtype="datetime64[ns]").astype(np.int64))
+        index.labels = labels
+        return index
+
+    def times_of(self, code: int) -> np.ndarray:
+        """Sorted timestamps (datetime64[ns]) of key ``code``."""
+        return self.times[self.offsets[code]:self.offsets[code + 1]].astype("datetime64[ns]")
+
+    def rows_of(self, codes) -> np.ndarray:
+        """Original rows of every event of keys ``codes``, key by key in time order.
+
+        Codes the index has no events for are skipped.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        codes = codes[(codes >= 0) & (codes < len(self.offsets) - 1)]
+        lo = self.offsets[codes]
+        counts = self.offsets[codes + 1] - lo
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        return self.rows[np.repeat(lo - starts, counts) + np.arange(counts.sum())]
+
+    def window_starts(self, window: pd.Timedelta) -> np.ndarray:
+        """For each sorted event, the sorted position where its trailing window ``(t - window, t]`` begins.
+
+        Keys and times (whole seconds, as Reddit reports them) are folded into
+        one sortable int64, with a gap of at least ``window`` between keys, so
+        a single ``searchsorted`` serves every key without crossing key
+        boundaries.
+        """
+        if not len(self.times):
+            return np.zeros(0, dtype=np.int64)
+        seconds = (self.times - self.times.min()) // 10**9
+        width = int(window.total_seconds())
+        span = int(seconds.max()) + width + 1
+        composite = self.codes * span + seconds
+        return np.searchsorted(composite, composite - width, side="right")
+
+
+def author_index(df: pd.DataFrame) -> ActivityIndex:
+    """Each author's posting times; ``labels`` maps author code -> author name."""
+    return ActivityIndex.from_columns(df["author"].astype(str), df["created_utc"])
+
+
+def detect_bursts(authors, subreddits, created, window: pd.Timedelta = BURST_WINDOW,
+                  min_count: int = BURST_MIN_COUNT, multiplier: float = BURST_MULTIPLIER,
+                  baseline: pd.Timedelta = BURST_BASELINE) -> np.ndarray:
+    """Boolean flag per row: part of an author x subreddit posting burst.
+
+    Rows before the period being judged only need to reach back ``window +
+    baseline`` to give those rows their full baseline.
+    """
+    authors = pd.Series(authors, dtype=str).reset_index(drop=True)
+    created = np.asarray(created, dtype="datetime64[ns]")
+    keys = authors + "\x1f" + pd.Series(subreddits, dtype=str).reset_index(drop=True)
+    index = ActivityIndex.from_columns(keys, created)
+
+    n = len(index.times)
+    starts = index.window_starts(window)
+    counts = np.arange(n) - starts + 1
+
+    # Baseline: the key's records in (t - window - baseline, t - window],
+    # scaled to one window's worth
+    prior = starts - index.window_starts(window + baseline)
+    expected = prior * (window.value / baseline.value)
+    peaks = (counts >= min_count) & (counts >= multiplier * expected)
+    peaks &= ~authors.isin(ANONYMOUS_AUTHORS).to_numpy()[index.rows]
+
+    # Flag every record in a peak's window: +1 at the window start, -1 after the peak
+    marks = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(marks, starts[peaks], 1)
+    np.add.at(marks, np.flatnonzero(peaks) + 1, -1)
+    flagged_sorted = np.cumsum(marks[:-1]) > 0
+
+    flags = np.zeros(n, dtype=bool)
+    flags[index.rows] = flagged_sorted
+    return flags
@@ -0,0 +1,73 @@
+"""
+Vectorized bootstrap confidence intervals for per-group mean sentiment.
+
+Every group is resampled at once. Records are sorted by group, and one
+(resamples x draws) index matrix is drawn in which each column samples with
+replacement from its own group's slice. Fancy-indexing the values and one
+``np.add.reduceat`` along the column axis then give every group's mean in
+every resample. Percentiles along the resample axis are the interval.
+
+Large groups draw at most ``MAX_DRAWS`` records per resample: an
+m-out-of-n bootstrap whose spread around the group mean is rescaled by
+sqrt(m / n), which is consistent for the mean. The matrix size therefore
+depends on the number of groups, not the number of records, and thousands
+of resamples stay interactive on large corpora. Resamples are drawn in
+chunks of at most ``CHUNK_ELEMENTS`` indices to bound peak memory.
+"""
+import numpy as np
+import pandas as pd
+
+RESAMPLES = 2000
+CONFIDENCE = 0.95
+MAX_DRAWS = 64                  # records drawn per group and resample
+CHUNK_ELEMENTS = 1 << 22        # indices materialized at once
+
+
+def bootstrap_means(values, keys: pd.DataFrame, resamples: int = RESAMPLES, confidence: float = CONFIDENCE,
+                    max_draws: int = MAX_DRAWS, seed: int = 0) -> pd.DataFrame:
+    """Mean and percentile bootstrap interval of ``values`` per distinct row of ``keys``.
+
+    Returns the key columns plus ``n``, ``mean``, ``ci_low`` and ``ci_high``,
+    one row per group, sorted by key. Missing values are ignored.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    keys = keys[present].reset_index(drop=True)
+    values = values[present]
+    columns = [*keys.columns, "n", "mean", "ci_low", "ci_high"]
+    if not len(values):
+        return pd.DataFrame(columns=columns)
+
+    codes, uniques = pd.MultiIndex.from_frame(keys).factorize(sort=True)
+    order = np.argsort(codes, kind="stable")
+    ordered = values[order]
+    sizes = np.bincount(codes, minlength=len(uniques))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    means = np.add.reduceat(ordered, starts) / sizes
+
+    # One column per draw: each samples its group's slice of the sorted values
+    draws = np.minimum(sizes, max_draws)
+    draw_starts = np.concatenate([[0], np.cumsum(draws)[:-1]])
+    column_group = np.repeat(np.arange(len(sizes)), draws)
+    column_base = starts[column_group]
+    column_size = sizes[column_group]
+
+    rng = np.random.default_rng(seed)
+    boot = np.empty((resamples, len(sizes)))
+    chunk = max(1, CHUNK_ELEMENTS // len(column_group))
+    for lo in range(0, resamples, chunk):
+        rows = min(chunk, resamples - lo)
+        index = column_base + rng.integers(0, column_size, size=(rows, len(column_group)))
+        boot[lo:lo + rows] = np.add.reduceat(ordered[index], draw_starts, axis=1) / draws
+
+    # m-out-of-n: shrink each group's spread by sqrt(m / n); a no-op when m == n
+    boot = means + (boot - means) * np.sqrt(draws / sizes)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(boot, [alpha, 1 - alpha], axis=0)
+
+    result = uniques.to_frame(index=False, name=list(keys.columns))
+    result["n"] = sizes
+    result["mean"] = means
+    result["ci_low"] = low
+    result["ci_high"] = high
+    return result[columns]
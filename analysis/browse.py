@@ -0,0 +1,56 @@
+"""
+Server-side record browser: pre-sorted position indexes and one-page reads.
+
+For each entry of ``BROWSE_SORTS`` the dashboard keeps every row position
+ordered by that sort's key, ties in file order: one stable argsort per
+process, built on first use. Streamed rows are merged into an order rather
+than re-sorted. A filter plus text search is a boolean mask over row
+positions, and the matching rows in sort order are the index entries the mask
+keeps: one linear pass, no sort. Only the requested page's rows are read from
+the query backend, with bodies cut to a preview. The full text of a record is
+read when it is selected.
+
+The query backends order exports the same way (``sort`` in their
+``export_batches``), so a download lists the rows in the browser's order.
+"""
+import numpy as np
+import pandas as pd
+
+PAGE_ROWS = 50
+PREVIEW_CHARS = 200
+
+
+def sort_keys(values: pd.Series, descending: bool) -> np.ndarray:
+    """Keys whose ascending order is the sort's order: dates as day numbers, negated when descending."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        keys = values.to_numpy("datetime64[D]").astype(np.int64)
+    else:
+        keys = values.to_numpy(dtype=np.float64)
+    return -keys if descending else keys
+
+
+def sort_order(keys: np.ndarray) -> np.ndarray:
+    """Row positions ordered by ``keys``, ties in position order."""
+    return np.argsort(keys, kind="stable")
+
+
+def extend_order(order: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """``order`` (over the first ``len(order)`` rows) with the rows after it merged in.
+
+    ``keys`` covers every row. New rows have higher positions than indexed
+    ones, so among equal keys they go last, as a full sort would put them.
+    """
+    new = len(order) + sort_order(keys[len(order):])
+    return np.insert(order, np.searchsorted(keys[order], keys[new], side="right"), new)
+
+
+def matching(order: np.ndarray, selected: np.ndarray) -> np.ndarray:
+    """Positions of the ``selected`` rows (one bool per row), in ``order``."""
+    return order[selected[order]]
+
+
+def preview(bodies: pd.Series, chars: int = PREVIEW_CHARS) -> pd.Series:
+    """Bodies cut to ``chars`` characters, marked with an ellipsis where cut."""
+    bodies = bodies.fillna("").astype(str)
+    cut = bodies.str.len() > chars
+    return bodies.str.slice(0, chars).where(~cut, bodies.str.slice(0, chars).str.rstrip() + "…")
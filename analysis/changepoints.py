@@ -0,0 +1,188 @@
+"""
+Online change-point detection on daily discourse volume and sentiment.
+
+Every series (daily record count or daily mean sentiment of the whole
+corpus, of each subreddit and of each keyword) runs a two-sided CUSUM:
+
+  - the first ``WARMUP`` observations set a baseline mean and variance;
+  - each later observation is standardized against the baseline, and the
+    upper and lower sums accumulate ``max(0, S + z - drift)`` and
+    ``max(0, S - z - drift)``;
+  - when either sum passes ``threshold`` a change point is recorded in that
+    direction and the detector re-baselines from the next observation;
+  - otherwise the baseline follows slow drift through an exponentially
+    weighted mean and variance.
+
+Each update is O(1) in time and state, so ``ChangePointMonitor.update``
+only feeds the days after the last one it has seen. Days without records
+count as zero volume; they have no sentiment observation.
+
+Detections are compared with ``data/policy_events.csv``. ``match_events``
+finds each change point's nearest event, and ``event_coverage`` gives the
+share of change points expected within the matching window by chance.
+"""
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DRIFT = 0.5          # allowance per observation, in baseline standard deviations
+THRESHOLD = 5.0      # CUSUM alarm level, in baseline standard deviations
+SMOOTHING = 0.05     # weight of each new observation in the drifting baseline
+WARMUP = 14          # observations that set a fresh baseline
+MATCH_DAYS = 30      # a change point within this many days of an event matches it
+MIN_SD = {"volume": 0.5, "sentiment": 0.05}  # noise floors for the baseline standard deviation
+
+
+def monitor_path(data_path: Path) -> Path:
+    """Where the change-point monitor (detector state and detections) lives."""
+    return data_path.with_name(f"{data_path.stem}_changepoints.pkl")
+
+
+class Cusum:
+    """Two-sided CUSUM over one series, updated in O(1) per observation."""
+
+    __slots__ = ("min_sd", "n", "mean", "var", "high", "low")
+
+    def __init__(self, min_sd: float):
+        self.min_sd = min_sd
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.high = 0.0
+        self.low = 0.0
+
+    def update(self, value: float) -> tuple:
+        """Feed one observation; ``(direction, baseline)`` with direction +1/-1 on a change, else 0."""
+        if self.n < WARMUP:
+            # Welford's running mean and (population) variance
+            self.n += 1
+            delta = value - self.mean
+            self.mean += delta / self.n
+            self.var += (delta * (value - self.mean) - self.var) / self.n
+            return 0, self.mean
+        z = (value - self.mean) / max(np.sqrt(self.var), self.min_sd)
+        self.high = max(0.0, self.high + z - DRIFT)
+        self.low = max(0.0, self.low - z - DRIFT)
+        if self.high > THRESHOLD or self.low > THRESHOLD:
+            direction, baseline = (1 if self.high > THRESHOLD else -1), self.mean
+            self.reset()
+            return direction, baseline
+        delta = value - self.mean
+        self.mean += SMOOTHING * delta
+        self.var = (1 - SMOOTHING) * (self.var + SMOOTHING * delta * delta)
+        return 0, self.mean
+
+
+def daily_series(rows: pd.DataFrame, keyword_labels: list) -> pd.DataFrame:
+    """Daily ``n`` and ``sentiment_sum`` for the whole corpus, each subreddit and each keyword.
+
+    ``rows`` has ``date``, ``subreddit``, ``n``, ``sentiment_sum`` and one
+    boolean column per keyword label: per-record rows (``n`` = 1) or the
+    backends' ``event_combinations`` output.
+    """
+    rows = rows.assign(date=pd.to_datetime(rows["date"]).dt.normalize())
+    parts = [rows.assign(group_type="all", group="All")]
+    parts.append(rows.assign(group_type="subreddit", group=rows["subreddit"].astype(str)))
+    parts += [rows[rows[label]].assign(group_type="keyword", group=label) for label in keyword_labels]
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby(["group_type", "group", "date"], observed=True)[["n", "sentiment_sum"]]
+        .sum()
+        .reset_index()
+    )
+
+
+class ChangePointMonitor:
+    """One CUSUM per (group, metric) series, fed day by day; keeps every detection."""
+
+    def __init__(self):
+        self.detectors = {}          # (group_type, group, metric) -> Cusum
+        self.last_date = None        # last day fed to every series
+        self.detections = []         # (group_type, group, metric, date, direction, baseline, value)
+
+    def update(self, daily: pd.DataFrame) -> pd.DataFrame:
+        """Feed the days of ``daily`` (``daily_series`` output) after ``last_date``; returns new change points.
+
+        Volume series see every day up to the newest, with zeros for days
+        without records; sentiment series only see days with records.
+        """
+        if self.last_date is not None:
+            daily = daily[daily["date"] > self.last_date]
+        if daily.empty:
+            return self._frame([])
+        first = daily["date"].min() if self.last_date is None else self.last_date + pd.Timedelta(days=1)
+        days = pd.date_range(first, daily["date"].max(), freq="D")
+        found = []
+        series = {key: group for key, group in daily.groupby(["group_type", "group"], observed=True)}
+        # Series seen before but silent in this batch still get their zero-volume days
+        for group_type, group, metric in self.detectors:
+            if metric == "volume" and (group_type, group) not in series:
+                series[(group_type, group)] = daily.iloc[:0]
+        for (group_type, group), rows in sorted(series.items()):
+            counts = pd.Series(rows["n"].to_numpy(), index=rows["date"]).reindex(days, fill_value=0)
+            means = (rows["sentiment_sum"] / rows["n"]).to_numpy()
+            for metric, observed in (("volume", counts), ("sentiment", pd.Series(means, index=rows["date"]))):
+                detector = self.detectors.setdefault((group_type, group, metric), Cusum(MIN_SD[metric]))
+                for date, value in observed.items():
+                    direction, baseline = detector.update(float(value))
+                    if direction:
+                        found.append((group_type, group, metric, date, direction, baseline, float(value)))
+        self.last_date = days[-1]
+        self.detections.extend(found)
+        return self._frame(found)
+
+    @staticmethod
+    def _frame(detections: list) -> pd.DataFrame:
+        columns = ["group_type", "group", "metric", "date", "direction", "baseline", "value"]
+        frame = pd.DataFrame(detections, columns=columns)
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame.sort_values(["date", "group_type", "group", "metric"], kind="stable").reset_index(drop=True)
+
+    def changes(self) -> pd.DataFrame:
+        """Every change point detected so far, oldest first."""
+        return self._frame(self.detections)
+
+    def save(self, path: Path):
+        with open(path, "wb") as fh:
+            pickle.dump(self, fh)
+
+    @staticmethod
+    def load(path: Path) -> "ChangePointMonitor":
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+
+
+def match_events(changes: pd.DataFrame, events: pd.DataFrame, window_days: int = MATCH_DAYS) -> pd.DataFrame:
+    """``changes`` with the nearest policy event, the lag in days (positive = after it) and a match flag."""
+    event_dates = np.sort(events["date"].to_numpy("datetime64[D]"))
+    labels = events.sort_values("date", kind="stable")["label"].to_numpy()
+    dates = changes["date"].to_numpy("datetime64[D]")
+    right = np.clip(np.searchsorted(event_dates, dates), 1, len(event_dates) - 1)
+    left = right - 1
+    nearest = np.where(np.abs(dates - event_dates[left]) <= np.abs(event_dates[right] - dates), left, right)
+    if len(event_dates) == 1:
+        nearest = np.zeros(len(dates), dtype=np.int64)
+    lag = (dates - event_dates[nearest]).astype(np.int64)
+    return changes.assign(
+        nearest_event=labels[nearest],
+        lag_days=lag,
+        matched=np.abs(lag) <= window_days,
+    )
+
+
+def event_coverage(events: pd.DataFrame, start, end, window_days: int = MATCH_DAYS) -> float:
+    """Share of days in [start, end] within ``window_days`` of some event: the match rate expected by chance."""
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    if not len(days):
+        return 0.0
+    event_dates = np.sort(events["date"].to_numpy("datetime64[D]"))
+    index = np.clip(np.searchsorted(event_dates, days), 1, len(event_dates) - 1)
+    distance = np.minimum(np.abs(days - event_dates[index - 1]), np.abs(event_dates[index] - days))
+    if len(event_dates) == 1:
+        distance = np.abs(days - event_dates[0])
+    return float((distance.astype(np.int64) <= window_days).mean())
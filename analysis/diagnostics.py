@@ -0,0 +1,112 @@
+"""
+Render-time instrumentation for the dashboard.
+
+A ``Diagnostics`` recorder collects, for one script rerun:
+  - wall time per named section
+  - row counts and in-memory size of the DataFrames produced at each stage
+  - cache hits and misses per cached function
+  - serialized chart payload sizes
+
+When disabled every method is a cheap no-op, so the dashboard can call it
+unconditionally. Records are appended to a JSON-lines log for tracking rerun
+latency over time.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+
+def frame_stats(result) -> tuple:
+    """Total rows and deep memory (bytes) of the DataFrames in ``result``.
+
+    ``result`` may be a DataFrame, or a tuple/list holding DataFrames; anything
+    else counts as zero.
+    """
+    frames = result if isinstance(result, (tuple, list)) else [result]
+    frames = [f for f in frames if isinstance(f, pd.DataFrame)]
+    rows = sum(len(f) for f in frames)
+    memory = sum(int(f.memory_usage(deep=True).sum()) for f in frames)
+    return rows, memory
+
+
+class Diagnostics:
+    """Collects timings, sizes and cache statistics for one rerun."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.sections = {}
+        self.stages = []
+        self.charts = []
+        self.cache = {"hits": Counter(), "misses": Counter()}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name: str):
+        """Time the enclosed block under ``name`` (accumulates on repeat)."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self.sections[name] = self.sections.get(name, 0.0) + elapsed
+
+    def stage(self, name: str, rows: int, memory_bytes: int = None):
+        """Record the row count (and optionally memory) produced at a stage."""
+        if self.enabled:
+            with self._lock:
+                self.stages.append({"stage": name, "rows": int(rows), "memory_bytes": memory_bytes})
+
+    def result(self, name: str, result, hit: bool):
+        """Record a cached function call: hit/miss and the size of its output."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.cache["hits" if hit else "misses"][name] += 1
+        if isinstance(result, (pd.DataFrame, tuple, list)):
+            rows, memory = frame_stats(result)
+            self.stage(name, rows, memory)
+
+    def chart(self, name: str, payload_bytes: int):
+        if self.enabled:
+            with self._lock:
+                self.charts.append({"chart": name, "bytes": int(payload_bytes)})
+
+    # ── Reporting ──
+
+    def cache_table(self) -> pd.DataFrame:
+        names = sorted(set(self.cache["hits"]) | set(self.cache["misses"]))
+        return pd.DataFrame({
+            "function": names,
+            "hits": [self.cache["hits"][n] for n in names],
+            "misses": [self.cache["misses"][n] for n in names],
+        })
+
+    def to_record(self, **extra) -> dict:
+        return {
+            "timestamp": pd.Timestamp.now(tz="UTC").isoformat(),
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "sections": {k: round(v, 4) for k, v in self.sections.items()},
+            "stages": self.stages,
+            "charts": self.charts,
+            "cache_hits": dict(self.cache["hits"]),
+            "cache_misses": dict(self.cache["misses"]),
+            **extra,
+        }
+
+    def append_log(self, path: Path, **extra) -> dict:
+        """Append this rerun's record to the JSON-lines log at ``path``."""
+        record = self.to_record(**extra)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, default=str) + "\n")
+        return record
@@ -0,0 +1,125 @@
+"""
+Event-study engine: discourse volume and sentiment before vs. after policy events.
+
+For every event in ``data/policy_events.csv`` and every group (the whole
+corpus, each subreddit, each keyword), compares a pre-event window
+[date - W, date) with a post-event window [date, date + W).
+
+Input is the backend's event-combination table: one row per (day, subreddit,
+combination of matched keywords) with a record count ``n`` and a
+``sentiment_sum``. Events are dated and windows are whole days, so day-level
+rows give exactly the same answer as individual timestamps.
+
+All groups are answered in one vectorized pass. Rows are sorted once by a
+composite (group, day number) key. Every window bound for every
+(group, event) pair is then located with a single ``np.searchsorted`` call.
+Counts and sentiment sums come from differencing prefix sums over the sorted
+order.
+"""
+import numpy as np
+import pandas as pd
+
+
+def day_numbers(dates) -> np.ndarray:
+    """Days since 1970-01-01 of each date, as int64."""
+    return np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+def _group_arrays(rows: pd.DataFrame, keyword_labels: list) -> tuple:
+    """Stack (group code, day number, count, sentiment sum) arrays for every group.
+
+    Returns the four arrays plus a frame describing each code. A row appears
+    once under "All", once under its subreddit and once under every keyword
+    it matches.
+    """
+    times = day_numbers(rows["date"])
+    counts = rows["n"].to_numpy(dtype=np.int64)
+    sentiment = rows["sentiment_sum"].to_numpy(dtype=float)
+    sub_codes, subs = pd.factorize(rows["subreddit"], sort=True)
+
+    groups = [("all", "All")]
+    groups += [("subreddit", s) for s in subs]
+    codes = [np.zeros(len(rows), dtype=np.int64), sub_codes.astype(np.int64) + 1]
+    selections = [slice(None), slice(None)]
+    for label in keyword_labels:
+        hits = rows[label].to_numpy(dtype=bool)
+        codes.append(np.full(int(hits.sum()), len(groups), dtype=np.int64))
+        selections.append(hits)
+        groups.append(("keyword", label))
+
+    group_info = pd.DataFrame(groups, columns=["group_type", "group"])
+    return (
+        np.concatenate(codes),
+        np.concatenate([times[sel] for sel in selections]),
+        np.concatenate([counts[sel] for sel in selections]),
+        np.concatenate([sentiment[sel] for sel in selections]),
+        group_info,
+    )
+
+
+def event_study(
+    rows: pd.DataFrame,
+    events: pd.DataFrame,
+    window_days: int = 30,
+    keyword_labels: list = (),
+) -> pd.DataFrame:
+    """Pre/post-window volume and sentiment deltas for every event x group.
+
+    ``rows`` needs ``date``, ``subreddit``, ``n``, ``sentiment_sum`` and one
+    boolean column per keyword label. ``events`` needs ``date`` and ``label``
+    (other columns, e.g. ``state``, are carried through).
+
+    Returns one row per (event, group) with counts, mean sentiment in each
+    window, and the deltas. Mean sentiment is NaN for empty windows.
+    """
+    codes, times, counts, sentiment, group_info = _group_arrays(rows, list(keyword_labels))
+    event_times = day_numbers(events["date"])
+    window = int(window_days)
+
+    # Composite sort key: group code in the high part, day offset in the low
+    # part. The span covers every record and every window bound, so one sorted
+    # array answers every group's queries without crossing group boundaries.
+    # Counting in days rather than nanoseconds keeps codes * span far inside
+    # int64 for any number of groups.
+    t0 = min(times.min(initial=event_times.min()), event_times.min()) - window
+    span = max(times.max(initial=event_times.max()), event_times.max()) + window - t0 + 1
+    keys = codes * span + (times - t0)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    count_prefix = np.concatenate([[0], np.cumsum(counts[order])])
+    sent_prefix = np.concatenate([[0.0], np.cumsum(sentiment[order])])
+
+    n_groups = len(group_info)
+    group_base = np.arange(n_groups, dtype=np.int64)[:, None] * span
+    offsets = event_times[None, :] - t0
+    bounds = np.searchsorted(
+        keys,
+        np.stack([group_base + offsets - window, group_base + offsets, group_base + offsets + window]),
+        side="left",
+    )
+    lo, mid, hi = bounds[0].ravel(), bounds[1].ravel(), bounds[2].ravel()
+
+    pre_count = count_prefix[mid] - count_prefix[lo]
+    post_count = count_prefix[hi] - count_prefix[mid]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pre_sent = (sent_prefix[mid] - sent_prefix[lo]) / pre_count
+        post_sent = (sent_prefix[hi] - sent_prefix[mid]) / post_count
+        pct_change = np.where(pre_count > 0, (post_count - pre_count) / pre_count * 100, np.nan)
+
+    n_events = len(events)
+    result = pd.concat(
+        [
+            group_info.loc[np.repeat(np.arange(n_groups), n_events)].reset_index(drop=True),
+            events.iloc[np.tile(np.arange(n_events), n_groups)].reset_index(drop=True),
+        ],
+        axis=1,
+    )
+    result["pre_count"] = pre_count
+    result["post_count"] = post_count
+    result["volume_delta"] = post_count - pre_count
+    result["volume_pct_change"] = pct_change
+    result["pre_sentiment"] = pre_sent
+    result["post_sentiment"] = post_sent
+    result["sentiment_delta"] = post_sent - pre_sent
+    result["window_days"] = int(window_days)
+    return result
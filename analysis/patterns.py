@@ -0,0 +1,69 @@
+"""
+Discourse frame and keyword patterns used throughout the dashboard.
+
+Patterns are matched against the shared token store (``analysis.tokens``),
+not raw text. Each pattern is a tuple of phrases; a phrase is a sequence of
+space-separated regexes, each fully matching one lowercase token, and the
+phrase matches when consecutive tokens match in order. Hyphens and other
+punctuation split tokens, so "skills-based" is ``skills? based``.
+
+Every record's match bitmask per pattern set is computed once, by the
+cleaning pipeline, and saved next to the cleaned CSV with the patterns it
+was matched against. The dashboard reads the bitmasks from there, so it
+needs neither the token store nor a matching pass at startup; saved codes
+are ignored once the patterns they were matched against are edited.
+"""
+from pathlib import Path
+
+import numpy as np
+
+FRAMES = {
+    "Reform Advocacy": (
+        r"skills? based", r"stars", r"paper ceiling", r"remove degrees?", r"hiring reforms?",
+    ),
+    "Skepticism & Barriers": (
+        r"won'?t change", r"hr push back", r"hr pushback", r"classification systems?", r"opm", r"bureaucra\w*",
+    ),
+    "RIF & Workforce Cuts": (
+        r"rif(?:'d)?", r"layoffs?", r"doge", r"reductions? in force", r"fired",
+    ),
+    "Practitioner Experience": (
+        r"(?:re)?hired", r"my teams?", r"my agency", r"gs \d+", r"i'?ve seen", r"in my experience",
+    ),
+    "Career Transition": (
+        r"career chang\w*", r"transition\w*", r"military to civilian", r"no degrees?",
+    ),
+}
+
+KEYWORDS = {
+    "skills-based": (r"skills? based",),
+    "STARs": (r"stars?",),
+    "degree requirement": (r"degrees? requir\w*",),
+    "paper ceiling": (r"paper ceiling",),
+    "competency": (r"competen\w*",),
+    "RIF": (r"rif(?:'d)?",),
+}
+
+PATTERN_SETS = {"frames": FRAMES, "keywords": KEYWORDS}
+
+
+def codes_path(data_path: Path) -> Path:
+    """Where the pattern bitmasks for a cleaned data file live."""
+    return data_path.with_name(f"{data_path.stem}_patterns.npz")
+
+
+def pattern_codes(store) -> dict:
+    """Bitmask per record for each pattern set, matched against a token store."""
+    return {name: store.pattern_codes(patterns) for name, patterns in PATTERN_SETS.items()}
+
+
+def save_codes(path: Path, codes: dict):
+    np.savez_compressed(path, patterns=repr(PATTERN_SETS), **codes)
+
+
+def load_codes(path: Path):
+    """Saved bitmasks per pattern set, or None when the patterns have changed since."""
+    with np.load(path) as npz:
+        if str(npz["patterns"]) != repr(PATTERN_SETS):
+            return None
+        return {name: npz[name] for name in PATTERN_SETS}
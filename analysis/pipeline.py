@@ -0,0 +1,236 @@
+"""
+Content-hash memoized stage DAG for the cleaning pipeline.
+
+A stage is a function of its dependencies' results. Its fingerprint hashes
+  - its code: the source of ``run``, of every function or module in ``code``
+    and of the package modules those modules import
+  - its config, passed to ``run`` as keyword arguments
+  - the contents of its input files
+  - the fingerprints of its dependencies
+so a change to any of them changes the fingerprint of every stage downstream.
+
+Results of ``cache`` stages are pickled in the cache directory, one file per
+stage named by fingerprint. Output stages write files instead and are up to
+date while the manifest records their current fingerprint and every output
+exists. A run walks back from the target stages: up-to-date outputs are
+skipped, valid cached results are loaded, and only invalidated stages (and
+the stages that need their results) execute. ``plan`` makes the same
+decisions, with reasons, without running anything.
+
+Stages must not modify their dependencies' results: those may be shared with
+other stages or be written to the cache.
+"""
+import ast
+import hashlib
+import importlib
+import inspect
+import json
+import pickle
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+CHUNK_BYTES = 1 << 20
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def imported_modules(module) -> list:
+    """The modules of ``module``'s own package that it imports, directly or
+    through each other, including imports deferred into function bodies."""
+    package = module.__name__.partition(".")[0]
+    found, pending = {}, [module]
+    while pending:
+        for node in ast.walk(ast.parse(inspect.getsource(pending.pop()))):
+            if isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                if name.partition(".")[0] == package and name != module.__name__ and name not in found:
+                    found[name] = importlib.import_module(name)
+                    pending.append(found[name])
+    return [found[name] for name in sorted(found)]
+
+
+def code_hash(objects) -> str:
+    """SHA-256 of the source code of functions, classes or modules.
+
+    A module also brings in the package modules it imports, so a stage listing
+    ``analysis.terms`` is invalidated by a change to ``analysis.topics`` too.
+    """
+    objects = list(objects)
+    for module in [obj for obj in objects if inspect.ismodule(obj)]:
+        objects += [dep for dep in imported_modules(module) if dep not in objects]
+    return text_hash("\n".join(inspect.getsource(obj) for obj in objects))
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable            # called with the dependencies' results, then config and settings
+    deps: tuple = ()
+    code: tuple = ()         # functions/modules ``run`` relies on, hashed with it
+    config: dict = None      # keyword arguments that change the result (fingerprinted)
+    settings: dict = None    # keyword arguments that do not, such as worker counts
+    inputs: tuple = ()       # files whose contents are fingerprinted
+    outputs: tuple = ()      # files the stage writes; an output stage returns nothing
+    cache: bool = True       # pickle the result for later runs (ignored for output stages)
+    always: str = ""         # when set, the stage always runs, for this reason
+
+
+class Pipeline:
+    """Stages registered in dependency order, resolved against an on-disk cache."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.manifest_path = cache_dir / "manifest.json"
+        self.manifest = json.loads(self.manifest_path.read_text()) if self.manifest_path.exists() else {}
+        self.stages = {}
+        self._components = {}
+        self._results = {}
+
+    def add(self, stage: Stage) -> Stage:
+        unknown = [dep for dep in stage.deps if dep not in self.stages]
+        if unknown:
+            # Registering dependencies first also rules out cycles
+            raise ValueError(f"Stage {stage.name!r} depends on unregistered stage(s): {', '.join(unknown)}")
+        if stage.name in self.stages:
+            raise ValueError(f"Stage {stage.name!r} is already registered")
+        self.stages[stage.name] = stage
+        return stage
+
+    # ── Fingerprints ──
+
+    def components(self, name: str) -> dict:
+        """The hashes making up a stage's fingerprint, plus the fingerprint itself."""
+        if name not in self._components:
+            stage = self.stages[name]
+            parts = {
+                "code": code_hash([stage.run, *stage.code]),
+                "config": text_hash(repr(sorted((stage.config or {}).items()))),
+                "inputs": {str(path): file_hash(path) if path.exists() else "missing" for path in stage.inputs},
+                "deps": {dep: self.fingerprint(dep) for dep in stage.deps},
+            }
+            parts["fingerprint"] = text_hash(json.dumps(parts, sort_keys=True))
+            self._components[name] = parts
+        return self._components[name]
+
+    def fingerprint(self, name: str) -> str:
+        return self.components(name)["fingerprint"]
+
+    def _result_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}-{self.fingerprint(name)[:16]}.pkl"
+
+    def changes(self, name: str) -> list:
+        """Why a stage's fingerprint differs from the one recorded at its last run (empty if it does not)."""
+        stage = self.stages[name]
+        if stage.always:
+            return [stage.always]
+        current, recorded = self.components(name), self.manifest.get(name)
+        if recorded is None:
+            return ["never run"]
+        if recorded["fingerprint"] == current["fingerprint"]:
+            return []
+        reasons = []
+        if recorded["code"] != current["code"]:
+            reasons.append("code changed")
+        if recorded["config"] != current["config"]:
+            reasons.append("config changed")
+        for path, digest in current["inputs"].items():
+            if recorded["inputs"].get(path) != digest:
+                reasons.append(f"input {Path(path).name} changed")
+        for dep, fingerprint in current["deps"].items():
+            if recorded["deps"].get(dep) != fingerprint:
+                reasons.append(f"upstream {dep} changed")
+        return reasons or ["stage definition changed"]
+
+    # ── Planning and running ──
+
+    def _status(self, name: str, force: bool) -> tuple:
+        """``(action, reasons)`` for a stage on its own: ``skip``, ``load`` or ``run``."""
+        stage = self.stages[name]
+        reasons = ["forced"] if force else self.changes(name)
+        if reasons:
+            return "run", reasons
+        if stage.outputs:
+            missing = [path.name for path in stage.outputs if not path.exists()]
+            return ("run", [f"output {', '.join(missing)} missing"]) if missing else ("skip", [])
+        if stage.cache and self._result_path(name).exists():
+            return "load", []
+        return "run", ["cached result missing" if stage.cache else "not cached"]
+
+    def plan(self, targets: list, force: bool = False) -> list:
+        """``(stage, action, reasons)`` for every stage a run of ``targets`` touches, dependencies first."""
+        steps, seen = [], set()
+
+        def visit(name: str, needed_by: str = None):
+            if name in seen:
+                return
+            seen.add(name)
+            action, reasons = self._status(name, force)
+            if action == "run":
+                for dep in self.stages[name].deps:
+                    visit(dep, needed_by=name)
+                if reasons == ["not cached"] and needed_by:
+                    reasons = [f"needed by {needed_by}"]
+            steps.append((name, action, reasons))
+
+        for target in targets:
+            visit(target)
+        return steps
+
+    def run(self, targets: list, force: bool = False) -> dict:
+        """Bring ``targets`` up to date; returns the results that were loaded or computed."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for name, action, reasons in self.plan(targets, force):
+            stage = self.stages[name]
+            if action == "skip":
+                print(f"[up to date] {name}")
+                continue
+            if action == "load":
+                with open(self._result_path(name), "rb") as fh:
+                    self._results[name] = pickle.load(fh)
+                print(f"[cached] {name}")
+                continue
+            print(f"\n── {name} ({'; '.join(reasons)})")
+            result = stage.run(*(self._results[dep] for dep in stage.deps),
+                               **(stage.config or {}), **(stage.settings or {}))
+            if not stage.outputs:
+                self._results[name] = result
+                if stage.cache:
+                    self._store(name, result)
+            self._record(name)
+        return self._results
+
+    def _store(self, name: str, result):
+        for stale in self.cache_dir.glob(f"{name}-*.pkl"):
+            stale.unlink()
+        path = self._result_path(name)
+        partial = path.with_suffix(".tmp")
+        with open(partial, "wb") as fh:
+            pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        partial.replace(path)
+
+    def _record(self, name: str):
+        # Saved after every stage, so an interrupted run keeps its progress
+        self.manifest[name] = self.components(name)
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=1, sort_keys=True))
+
+
+def describe(steps: list) -> str:
+    """A plan as aligned text lines."""
+    width = max((len(name) for name, _, _ in steps), default=0)
+    return "\n".join(f"  {action:<5} {name:<{width}}  {'; '.join(reasons)}".rstrip()
+                     for name, action, reasons in steps)
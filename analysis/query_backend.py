@@ -0,0 +1,646 @@
+"""
+Query backends for dashboard filtering and aggregation.
+
+The dashboard never asks a backend for the filtered rows themselves, only
+for small pre-aggregated tables. The same chart code therefore works whether
+the corpus sits in a pandas DataFrame or is queried out of core by DuckDB.
+
+Backends:
+  - PandasBackend: filters and groups an in-memory DataFrame (default); read
+    from the pipeline's Arrow snapshot, its columns are memory-mapped views
+    of the file, shared through the OS page cache rather than copied per process
+  - DuckDBBackend: runs the same queries as SQL over the cleaned CSV or
+    Parquet file using embedded DuckDB (optional dependency)
+
+Frame and keyword analysis go through a "pattern combination" table: one row
+per (month, combination of matched patterns) with a record count and a
+sentiment sum. Pattern matches come from the shared token store as one
+bitmask code per row position; both backends group by that code, and
+``frame_summary`` and ``keyword_summary`` turn the result into chart tables,
+so the outputs match. The
+event study uses the same shape at (day, subreddit) grain. Time series are
+answered by ``analysis.time_index``, built once from ``daily_totals``.
+"""
+import copy
+import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from analysis.export import EXPORT_BATCH_ROWS
+
+CONTENT_TYPES = {"All": None, "Posts only": "post", "Comments only": "comment"}
+QUOTE_COLUMNS = ["body", "subreddit", "date", "score", "sentiment_label"]
+TABLE_COLUMNS = ["date", "subreddit", "type", "sentiment_label", "score", "body"]
+# Record browser orders: (column, descending); ties always in file order
+BROWSE_SORTS = {
+    "Newest first": ("date", True),
+    "Oldest first": ("date", False),
+    "Highest score": ("score", True),
+    "Lowest score": ("score", False),
+    "Most positive": ("sentiment_score", True),
+    "Most negative": ("sentiment_score", False),
+}
+DEFAULT_SORT = "Newest first"
+THREAD_SOURCE_COLUMNS = ["thread_key", "thread_id", "type", "subreddit", "title", "created_utc", "sentiment_score", "score"]
+REPLY_SOURCE_COLUMNS = ["id", "parent_id", "thread_key", "created_utc"]
+
+
+class FilterState(NamedTuple):
+    """Normalized sidebar selection; hashable so it can key cached results."""
+    start: datetime.date
+    end: datetime.date
+    subreddits: tuple
+    content_type: str
+    tiers: tuple
+    exclude_bursts: bool = False
+
+
+class Bounds(NamedTuple):
+    """Value ranges used to build the sidebar filter widgets."""
+    min_date: datetime.date
+    max_date: datetime.date
+    subreddits: list
+    tiers: list
+    total: int
+
+
+# ── Binning ──────────────────────────────────────────────────────────────────
+
+def nice_bin_edges(lo: float, hi: float, maxbins: int = 30) -> np.ndarray:
+    """Evenly spaced bin edges covering [lo, hi], mirroring Vega-Lite's ``maxbins``.
+
+    The step is the smallest of 1, 2 or 5 x 10^k that yields at most
+    ``maxbins`` bins, and edges are aligned to multiples of the step.
+    """
+    if hi <= lo:
+        hi = lo + 1.0
+    raw_step = (hi - lo) / maxbins
+    magnitude = 10 ** np.floor(np.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    start = np.floor(lo / step) * step
+    stop = np.ceil(hi / step) * step
+    if stop <= hi:
+        stop += step
+    return start + step * np.arange(int(round((stop - start) / step)) + 1)
+
+
+def histogram_bins(values, maxbins: int = 30) -> pd.DataFrame:
+    """Bin values server-side; one row per bin with ``bin_start``, ``bin_end``, ``count``."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    lo, hi = (values.min(), values.max()) if values.size else (0.0, 1.0)
+    edges = nice_bin_edges(lo, hi, maxbins)
+    # Bin index is computed the way the SQL backends do it: rounding before the
+    # floor keeps values sitting exactly on an edge in the upper bin.
+    step = edges[1] - edges[0]
+    bins = np.floor(np.round((values - edges[0]) / step, 9)).astype(np.int64)
+    counts = np.bincount(bins.clip(0, len(edges) - 2), minlength=len(edges) - 1)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+
+# ── Pattern Summaries ────────────────────────────────────────────────────────
+
+def decode_patterns(combos: pd.DataFrame, labels: list) -> pd.DataFrame:
+    """Replace the bitmask ``code`` column with one boolean column per pattern label."""
+    codes = combos.pop("code").to_numpy(dtype=np.int64)
+    for bit, label in enumerate(labels):
+        combos[label] = (codes >> bit) & 1 == 1
+    return combos
+
+
+def frame_summary(combos: pd.DataFrame, labels: list) -> tuple:
+    """Frame counts, mean sentiment per frame, and monthly frame counts.
+
+    A record can match several frames, so it is counted once per frame.
+    """
+    counts, means, monthly = [], [], []
+    for label in labels:
+        hits = combos[combos[label]]
+        n = hits["n"].sum()
+        if n == 0:
+            continue
+        counts.append({"frame": label, "count": int(n)})
+        means.append({"frame": label, "sentiment_score": hits["sentiment_sum"].sum() / n})
+        by_month = hits.groupby("month")["n"].sum().reset_index(name="count")
+        by_month["frame"] = label
+        monthly.append(by_month)
+
+    frame_counts = pd.DataFrame(counts, columns=["frame", "count"])
+    frame_counts = frame_counts.sort_values("count", ascending=False, kind="stable")
+    frame_sent = pd.DataFrame(means, columns=["frame", "sentiment_score"]).sort_values("sentiment_score")
+    if monthly:
+        frame_time = (
+            pd.concat(monthly, ignore_index=True)
+            .sort_values(["month", "frame"])
+            [["month", "frame", "count"]]
+            .reset_index(drop=True)
+        )
+    else:
+        frame_time = pd.DataFrame(columns=["month", "frame", "count"])
+    return frame_counts.reset_index(drop=True), frame_sent.reset_index(drop=True), frame_time
+
+
+def keyword_summary(combos: pd.DataFrame, labels: list) -> tuple:
+    """Monthly keyword mentions and pairwise keyword co-occurrence percentages."""
+    keyword_rows = []
+    for label in labels:
+        monthly_kw = combos[combos[label]].groupby("month")["n"].sum().reset_index(name="mentions")
+        monthly_kw["keyword"] = label
+        keyword_rows.append(monthly_kw)
+    kw_df = pd.concat(keyword_rows, ignore_index=True)
+
+    co_data = []
+    for primary in labels:
+        primary_count = combos.loc[combos[primary], "n"].sum()
+        if primary_count == 0:
+            continue
+        for secondary in labels:
+            if secondary == primary:
+                continue
+            both = combos.loc[combos[primary] & combos[secondary], "n"].sum()
+            co_data.append({
+                "primary": primary,
+                "co-occurs with": secondary,
+                "co-occurrence %": round(both / primary_count * 100, 1),
+            })
+    co_df = pd.DataFrame(co_data, columns=["primary", "co-occurs with", "co-occurrence %"])
+    return kw_df, co_df
+
+
+# ── Pandas Backend ───────────────────────────────────────────────────────────
+
+def snapshot_path(data_path: Path) -> Path:
+    """Where the memory-mappable Arrow snapshot of a cleaned data file lives."""
+    return data_path.with_suffix(".arrow")
+
+
+def write_snapshot(df: pd.DataFrame, path: Path):
+    """Save ``df`` with dashboard dtypes as an uncompressed Arrow IPC (Feather) file.
+
+    Written as one record batch, so every column is contiguous in the file
+    and ``read_snapshot`` can map it without concatenating (copying) chunks.
+    Written under a temporary name and renamed over ``path``, so processes
+    that have the old snapshot mapped keep reading its (unchanged) file.
+    """
+    df = df.reset_index(drop=True)
+    df = df.assign(**{column: pd.to_datetime(df[column]) for column in ("created_utc", "date", "month")})
+    partial = path.with_suffix(".tmp")
+    feather.write_feather(df, partial, compression="uncompressed", chunksize=max(len(df), 1))
+    partial.replace(path)
+
+
+def read_snapshot(path: Path) -> pd.DataFrame:
+    """Memory-map an Arrow snapshot as a read-only DataFrame over the file's pages.
+
+    Numeric, datetime and string columns wrap the mapped buffers without a
+    copy, so the corpus costs page cache (shared by every process mapping the
+    file) rather than heap.
+    """
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+
+def read_cleaned(path: Path) -> pd.DataFrame:
+    """Read the cleaned dataset (CSV, Parquet or Arrow snapshot) with dashboard dtypes."""
+    if path.suffix == ".arrow":
+        return read_snapshot(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+        df["created_utc"] = pd.to_datetime(df["created_utc"])
+    else:
+        df = pd.read_csv(path, parse_dates=["created_utc"])
+    df["date"] = pd.to_datetime(df["date"])
+    df["month"] = pd.to_datetime(df["month"])
+    return df
+
+
+class PandasBackend:
+    """Filter and aggregate an in-memory DataFrame.
+
+    Rows are indexed by their position (a default RangeIndex). Streamed rows
+    are held in a separate ``appended`` frame, indexed after the corpus's, so
+    the corpus frame (and its memory map) is shared rather than copied.
+    """
+
+    name = "pandas"
+
+    def __init__(self, data: pd.DataFrame, appended: pd.DataFrame = None):
+        self.data = data
+        self.appended = appended
+
+    def _frames(self) -> list:
+        return [self.data] if self.appended is None else [self.data, self.appended]
+
+    @staticmethod
+    def _concat(frames: list) -> pd.DataFrame:
+        return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+    def bounds(self) -> Bounds:
+        frames = self._frames()
+        return Bounds(
+            min_date=min(frame["date"].min() for frame in frames).date(),
+            max_date=max(frame["date"].max() for frame in frames).date(),
+            subreddits=sorted(set().union(*(frame["subreddit"].unique() for frame in frames))),
+            tiers=sorted(set().union(*(frame["engagement_tier"].unique() for frame in frames))),
+            total=sum(len(frame) for frame in frames),
+        )
+
+    def memory_bytes(self) -> int:
+        """Deep in-memory size of the corpus."""
+        return sum(int(frame.memory_usage(deep=True).sum()) for frame in self._frames())
+
+    @staticmethod
+    def _filter(data: pd.DataFrame, filters: FilterState) -> pd.DataFrame:
+        mask = (
+            (data["date"].dt.date >= filters.start)
+            & (data["date"].dt.date <= filters.end)
+            & (data["subreddit"].isin(filters.subreddits))
+            & (data["engagement_tier"].isin(filters.tiers))
+        )
+        content_type = CONTENT_TYPES[filters.content_type]
+        if content_type is not None:
+            mask = mask & (data["type"] == content_type)
+        if filters.exclude_bursts:
+            mask = mask & (data["burst_flag"] == 0)
+        return data[mask]
+
+    def filter(self, filters: FilterState) -> pd.DataFrame:
+        """Return the rows matching the sidebar selection."""
+        return self._concat([self._filter(frame, filters) for frame in self._frames()])
+
+    def count(self, filters: FilterState) -> int:
+        return len(self.filter(filters))
+
+    def subreddit_sentiment(self, filters: FilterState) -> pd.DataFrame:
+        return (
+            self.filter(filters)
+            .groupby("subreddit")["sentiment_score"]
+            .mean()
+            .reset_index()
+            .sort_values("sentiment_score")
+        )
+
+    def sentiment_histogram(self, filters: FilterState, maxbins: int = 30) -> pd.DataFrame:
+        return histogram_bins(self.filter(filters)["sentiment_score"], maxbins)
+
+    def _with_codes(self, filters: FilterState, codes: np.ndarray) -> pd.DataFrame:
+        filtered = self.filter(filters)
+        return filtered.assign(code=codes[filtered.index.to_numpy()])
+
+    def pattern_combinations(self, filters: FilterState, codes: np.ndarray, labels: list) -> pd.DataFrame:
+        combos = (
+            self._with_codes(filters, codes)
+            .groupby(["month", "code"], observed=True)["sentiment_score"]
+            .agg(n="size", sentiment_sum="sum")
+            .reset_index()
+        )
+        return decode_patterns(combos, labels)
+
+    def event_combinations(self, filters: FilterState, codes: np.ndarray, labels: list) -> pd.DataFrame:
+        combos = (
+            self._with_codes(filters, codes)
+            .groupby(["date", "subreddit", "code"], observed=True)["sentiment_score"]
+            .agg(n="size", sentiment_sum="sum")
+            .reset_index()
+        )
+        return decode_patterns(combos, labels)
+
+    def daily_totals(self, key_columns: list = None) -> pd.DataFrame:
+        from analysis.time_index import PARTITION_COLUMNS, daily_totals
+
+        return daily_totals(self._concat(self._frames()), key_columns or PARTITION_COLUMNS)
+
+    def score_keys(self) -> pd.DataFrame:
+        from analysis.topk import score_keys
+
+        return score_keys(self._concat(self._frames()))
+
+    def thread_keys(self, filters: FilterState) -> np.ndarray:
+        """Keys of the threads with at least one matching record."""
+        return self.filter(filters)["thread_key"].unique()
+
+    def columns(self, names: list) -> pd.DataFrame:
+        """Whole-corpus projection of ``names``, in row-position order."""
+        return self._concat([frame[names] for frame in self._frames()])
+
+    def positions(self, filters: FilterState) -> np.ndarray:
+        """Row positions of the matching rows, ascending."""
+        return self.filter(filters).index.to_numpy()
+
+    def with_rows(self, rows: pd.DataFrame) -> "PandasBackend":
+        """A backend over this corpus plus streamed ``rows`` (dashboard dtypes), numbered after its rows.
+
+        The corpus frame is shared, not copied, so a memory-mapped snapshot
+        stays mapped; only ``rows`` is re-indexed.
+        """
+        start = len(self.data)
+        return PandasBackend(self.data, rows.set_axis(pd.RangeIndex(start, start + len(rows))))
+
+    def select(self, filters: FilterState, names: list) -> pd.DataFrame:
+        """Matching rows projected to ``names`` plus their row position ``pos``, in row order."""
+        filtered = self.filter(filters)
+        return filtered[names].assign(pos=filtered.index.to_numpy()).reset_index(drop=True)
+
+    def top_positions(self, filters: FilterState, n: int) -> pd.DataFrame:
+        filtered = self.filter(filters)
+        top = filtered["score"].nlargest(n)
+        return pd.DataFrame({"pos": top.index.to_numpy(), "score": top.to_numpy()})
+
+    def take(self, positions, columns: list) -> pd.DataFrame:
+        """Rows at ``positions`` (in that order), projected to ``columns``."""
+        positions = np.asarray(positions, dtype=np.int64)
+        if self.appended is None:
+            return self.data.iloc[positions][columns].reset_index(drop=True)
+        streamed = positions >= len(self.data)
+        rows = pd.concat([
+            self.data.iloc[positions[~streamed]][columns],
+            self.appended.iloc[positions[streamed] - len(self.data)][columns],
+        ], ignore_index=True)
+        order = np.concatenate([np.flatnonzero(~streamed), np.flatnonzero(streamed)])
+        return rows.iloc[np.argsort(order, kind="stable")].reset_index(drop=True)
+
+    def _browse_positions(self, filters: FilterState, matches: np.ndarray = None,
+                          sort: str = DEFAULT_SORT) -> np.ndarray:
+        """Row positions for the record browser in ``sort`` order, ties in file order.
+
+        ``matches`` (one bool per row position, from the token store) narrows
+        the rows to a text search; ``None`` keeps them all.
+        """
+        positions = self.positions(filters)
+        if matches is not None:
+            positions = positions[matches[positions]]
+        from analysis.browse import sort_keys
+
+        column, descending = BROWSE_SORTS[sort]
+        keys = sort_keys(self.columns([column])[column], descending)[positions]
+        return positions[np.lexsort((positions, keys))]
+
+    def _browse_rows(self, positions: np.ndarray) -> pd.DataFrame:
+        rows = self.take(positions, TABLE_COLUMNS)
+        return rows.assign(date=rows["date"].dt.strftime("%Y-%m-%d"))
+
+    def export_batches(self, filters: FilterState, matches: np.ndarray = None, sort: str = DEFAULT_SORT,
+                       batch_rows: int = EXPORT_BATCH_ROWS) -> pa.RecordBatchReader:
+        """The record browser's rows as Arrow batches, projected one slice of positions at a time."""
+        positions = self._browse_positions(filters, matches, sort)
+        schema = pa.Schema.from_pandas(self._browse_rows(positions[:0]), preserve_index=False)
+        # Text columns of an empty frame infer as null; they hold strings
+        schema = pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                            for field in schema])
+
+        def batches():
+            for start in range(0, len(positions), batch_rows):
+                rows = self._browse_rows(positions[start:start + batch_rows])
+                yield pa.RecordBatch.from_pandas(rows, schema=schema, preserve_index=False)
+
+        return pa.RecordBatchReader.from_batches(schema, batches())
+
+
+# ── DuckDB Backend ───────────────────────────────────────────────────────────
+
+_WHERE = """
+    date BETWEEN $start AND $end
+    AND list_contains(CAST($subreddits AS VARCHAR[]), subreddit)
+    AND list_contains(CAST($tiers AS VARCHAR[]), CAST(engagement_tier AS VARCHAR))
+    AND (CAST($type AS VARCHAR) IS NULL OR type = CAST($type AS VARCHAR))
+    AND (NOT $exclude_bursts OR burst_flag = 0)
+"""
+
+
+def _sql_literal(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _position_table(**columns) -> pd.DataFrame:
+    """Per-row-position arrays as a frame keyed by ``pos``, for joining in SQL."""
+    n = len(next(iter(columns.values())))
+    return pd.DataFrame({"pos": np.arange(n), **columns})
+
+
+class DuckDBBackend:
+    """Run dashboard queries as SQL over the cleaned CSV or Parquet file.
+
+    Parquet files are scanned in place through a view, so the corpus never has
+    to fit in memory. CSV files are loaded once into a DuckDB table, which is
+    compressed and columnar but held by the process. Streamed rows are an
+    Arrow table registered next to the corpus, never imported into it.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, path: Path):
+        import duckdb
+
+        self.path = path
+        self._con = duckdb.connect()
+        self._streamed = None
+        source = _sql_literal(str(path))
+        # ``pos`` is the row's position in the file, matching the pandas backend's
+        # row numbers, so indexes built by the pipeline address the same rows.
+        if path.suffix == ".parquet":
+            self._con.execute(f"""
+                CREATE VIEW records AS
+                SELECT * EXCLUDE (file_row_number), file_row_number AS pos
+                FROM read_parquet({source}, file_row_number = true)
+            """)
+        else:
+            self._con.execute(f"CREATE TABLE records_csv AS SELECT * FROM read_csv_auto({source})")
+            self._con.execute("CREATE VIEW records AS SELECT *, rowid AS pos FROM records_csv")
+
+    def with_rows(self, rows: pd.DataFrame) -> "DuckDBBackend":
+        """A backend over this corpus plus streamed ``rows`` (dashboard dtypes), numbered after its rows.
+
+        Shares this backend's connection, so the corpus is not read again;
+        ``rows`` is converted to Arrow once and registered with each query.
+        """
+        start = int(self._con.execute("SELECT count(*) FROM main.records").fetchone()[0])
+        backend = copy.copy(self)
+        backend._streamed = pa.Table.from_pandas(rows.assign(pos=np.arange(start, start + len(rows))),
+                                                 preserve_index=False)
+        return backend
+
+    def _execute(self, sql: str, filters: FilterState = None, tables: dict = None, **params):
+        if filters is not None:
+            params.update(
+                start=filters.start,
+                end=filters.end,
+                subreddits=list(filters.subreddits),
+                tiers=list(filters.tiers),
+                type=CONTENT_TYPES[filters.content_type],
+                exclude_bursts=bool(filters.exclude_bursts),
+            )
+        # A cursor is a separate connection to the same database, safe to use
+        # from the Streamlit script thread that issued the query. ``tables``
+        # are DataFrames registered (zero-copy) on that cursor only.
+        cursor = self._con.cursor()
+        for name, frame in (tables or {}).items():
+            cursor.register(name, frame)
+        if self._streamed is not None:
+            # ``records`` in the query then means the corpus followed by the streamed rows
+            cursor.register("streamed_records", self._streamed)
+            sql = f"WITH records AS (SELECT * FROM main.records UNION ALL BY NAME SELECT * FROM streamed_records) {sql}"
+        return cursor.execute(sql, params)
+
+    def _query(self, sql: str, filters: FilterState = None, tables: dict = None, **params) -> pd.DataFrame:
+        return self._execute(sql, filters, tables, **params).df()
+
+    def bounds(self) -> Bounds:
+        row = self._query("SELECT min(date) AS lo, max(date) AS hi, count(*) AS n FROM records").iloc[0]
+        subs = self._query("SELECT DISTINCT subreddit FROM records ORDER BY 1")["subreddit"]
+        tiers = self._query(
+            "SELECT DISTINCT CAST(engagement_tier AS VARCHAR) AS tier FROM records ORDER BY 1"
+        )["tier"]
+        return Bounds(
+            min_date=pd.Timestamp(row["lo"]).date(),
+            max_date=pd.Timestamp(row["hi"]).date(),
+            subreddits=subs.tolist(),
+            tiers=tiers.tolist(),
+            total=int(row["n"]),
+        )
+
+    def memory_bytes(self) -> int:
+        """Memory currently held by the DuckDB buffer manager."""
+        used = self._query("SELECT sum(memory_usage_bytes) AS used FROM duckdb_memory()")["used"].iloc[0]
+        return int(used) if pd.notna(used) else 0
+
+    def count(self, filters: FilterState) -> int:
+        return int(self._query(f"SELECT count(*) AS n FROM records WHERE {_WHERE}", filters)["n"].iloc[0])
+
+    def subreddit_sentiment(self, filters: FilterState) -> pd.DataFrame:
+        return self._query(f"""
+            SELECT subreddit, avg(sentiment_score) AS sentiment_score
+            FROM records WHERE {_WHERE}
+            GROUP BY ALL ORDER BY sentiment_score
+        """, filters)
+
+    def sentiment_histogram(self, filters: FilterState, maxbins: int = 30) -> pd.DataFrame:
+        stats = self._query(f"""
+            SELECT min(sentiment_score) AS lo, max(sentiment_score) AS hi
+            FROM records WHERE {_WHERE}
+        """, filters).iloc[0]
+        if pd.isna(stats["lo"]):
+            return histogram_bins([], maxbins)
+        edges = nice_bin_edges(float(stats["lo"]), float(stats["hi"]), maxbins)
+        step = edges[1] - edges[0]
+        binned = self._query(f"""
+            SELECT CAST(floor(round((sentiment_score - $lo) / $step, 9)) AS BIGINT) AS bin, count(*) AS n
+            FROM records WHERE {_WHERE} AND sentiment_score IS NOT NULL
+            GROUP BY ALL
+        """, filters, lo=float(edges[0]), step=float(step))
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        bins = binned["bin"].clip(0, len(counts) - 1).to_numpy()
+        np.add.at(counts, bins, binned["n"].to_numpy())
+        return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+    def pattern_combinations(self, filters: FilterState, codes: np.ndarray, labels: list) -> pd.DataFrame:
+        combos = self._query(f"""
+            SELECT date_trunc('month', created_utc) AS month, code,
+                   count(*) AS n, sum(sentiment_score) AS sentiment_sum
+            FROM records JOIN pattern_codes USING (pos)
+            WHERE {_WHERE}
+            GROUP BY ALL
+        """, filters, tables={"pattern_codes": _position_table(code=codes)})
+        return decode_patterns(combos, labels)
+
+    def event_combinations(self, filters: FilterState, codes: np.ndarray, labels: list) -> pd.DataFrame:
+        combos = self._query(f"""
+            SELECT CAST(date AS TIMESTAMP) AS date, subreddit, code,
+                   count(*) AS n, sum(sentiment_score) AS sentiment_sum
+            FROM records JOIN pattern_codes USING (pos)
+            WHERE {_WHERE}
+            GROUP BY ALL
+        """, filters, tables={"pattern_codes": _position_table(code=codes)})
+        return decode_patterns(combos, labels)
+
+    def daily_totals(self, key_columns: list = None) -> pd.DataFrame:
+        from analysis.time_index import PARTITION_COLUMNS
+
+        keys = ", ".join(f"CAST({col} AS VARCHAR) AS {col}" for col in key_columns or PARTITION_COLUMNS)
+        return self._query(f"""
+            SELECT CAST(date AS TIMESTAMP) AS date, {keys},
+                   count(*) AS n, sum(sentiment_score) AS sentiment_sum, sum(score) AS score_sum
+            FROM records
+            GROUP BY ALL ORDER BY ALL
+        """)
+
+    def score_keys(self) -> pd.DataFrame:
+        """Row position, score, month and partition columns for the top-k index."""
+        from analysis.time_index import PARTITION_COLUMNS
+
+        keys = ", ".join(f"CAST({col} AS VARCHAR) AS {col}" for col in PARTITION_COLUMNS)
+        return self._query(f"""
+            SELECT pos, score, strftime(created_utc, '%Y-%m') AS month, {keys}
+            FROM records
+        """)
+
+    def thread_keys(self, filters: FilterState) -> np.ndarray:
+        """Keys of the threads with at least one matching record."""
+        return self._query(f"SELECT DISTINCT thread_key FROM records WHERE {_WHERE}", filters)["thread_key"].to_numpy()
+
+    def columns(self, names: list) -> pd.DataFrame:
+        """Whole-corpus projection of ``names``, in row-position order."""
+        return self._query(f"SELECT {', '.join(names)} FROM records ORDER BY pos")
+
+    def positions(self, filters: FilterState) -> np.ndarray:
+        """Row positions of the matching rows, ascending."""
+        return self._query(f"SELECT pos FROM records WHERE {_WHERE} ORDER BY pos", filters)["pos"].to_numpy()
+
+    def select(self, filters: FilterState, names: list) -> pd.DataFrame:
+        """Matching rows projected to ``names`` plus their row position ``pos``, in row order."""
+        return self._query(f"SELECT {', '.join(names)}, pos FROM records WHERE {_WHERE} ORDER BY pos", filters)
+
+    def top_positions(self, filters: FilterState, n: int) -> pd.DataFrame:
+        return self._query(f"""
+            SELECT pos, score FROM records WHERE {_WHERE}
+            ORDER BY score DESC, pos
+            LIMIT $n
+        """, filters, n=n)
+
+    def take(self, positions, columns: list) -> pd.DataFrame:
+        """Rows at ``positions`` (in that order), projected to ``columns``."""
+        rows = self._query(f"""
+            SELECT pos, {', '.join(columns)}
+            FROM records WHERE list_contains(CAST($positions AS BIGINT[]), pos)
+        """, positions=[int(p) for p in positions])
+        return rows.set_index("pos").loc[list(positions), columns].reset_index(drop=True)
+
+    def _browse_sql(self, matches: np.ndarray = None, sort: str = DEFAULT_SORT) -> tuple:
+        """SQL and registered tables for the record browser in ``sort`` order, ties in file order."""
+        hits, tables = "", None
+        if matches is not None:
+            hits = "AND pos IN (SELECT pos FROM search_hits)"
+            tables = {"search_hits": pd.DataFrame({"pos": np.flatnonzero(matches)})}
+        column, descending = BROWSE_SORTS[sort]
+        sql = f"""
+            SELECT strftime(date, '%Y-%m-%d') AS date, subreddit, type, sentiment_label, score, body
+            FROM records WHERE {_WHERE} {hits}
+            ORDER BY records.{column} {"DESC" if descending else "ASC"}, pos
+        """
+        return sql, tables
+
+    def export_batches(self, filters: FilterState, matches: np.ndarray = None, sort: str = DEFAULT_SORT,
+                       batch_rows: int = EXPORT_BATCH_ROWS) -> pa.RecordBatchReader:
+        """The record browser's rows as Arrow batches, streamed from DuckDB's result."""
+        sql, tables = self._browse_sql(matches, sort)
+        cursor = self._execute(sql, filters, tables=tables)
+        reader = cursor.fetch_record_batch(batch_rows)
+
+        def batches():
+            # Holds the cursor (and its registered tables) open until the reader is drained
+            with cursor:
+                yield from reader
+
+        return pa.RecordBatchReader.from_batches(reader.schema, batches())
+
+
+def make_backend(name: str, path: Path):
+    """Build the query backend selected by ``name`` (``pandas`` or ``duckdb``)."""
+    if name == "pandas":
+        return PandasBackend(read_cleaned(path))
+    if name == "duckdb":
+        return DuckDBBackend(path)
+    raise ValueError(f"Unknown query backend {name!r}; expected 'pandas' or 'duckdb'")
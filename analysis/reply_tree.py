@@ -0,0 +1,169 @@
+"""
+Array-backed reply-tree index over posts and comments.
+
+Each record's ``parent_id`` links it to the post or comment it replies to.
+The index lays every thread out in preorder: a node is followed by its whole
+subtree, so the subtree of the node at preorder slot ``p`` is the contiguous
+slice ``p:subtree_end[p]``. Any per-record value can then be summed over
+every subtree at once by differencing a single prefix sum. Replies are
+ordered by ``created_utc``.
+
+Everything is built level by level with NumPy (no Python objects per node),
+so the index scales to millions of comments:
+  1. resolve ``parent_id`` to row positions
+  2. walk the tree top-down one depth level at a time to assign depths
+  3. accumulate subtree sizes bottom-up, level by level
+  4. assign preorder slots top-down from the parents' slots and sizes
+
+Records whose parent was not collected (or whose parent chain loops) become
+roots of their own subtree.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ARRAYS = ["order", "slot", "parent_slot", "subtree_end", "depth", "child_offsets", "children"]
+
+
+def tree_path(data_path: Path) -> Path:
+    """Where the reply-tree index for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_reply_tree.npz")
+
+
+def default_parents(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill ``parent_id`` and ``depth`` for records collected without them.
+
+    Posts have no parent and depth 0. A comment without a recorded parent is
+    assumed to be a top-level reply to its thread's post (depth 1).
+    """
+    is_comment = df["type"] == "comment"
+    if "parent_id" not in df.columns:
+        df["parent_id"] = ""
+    df["parent_id"] = df["parent_id"].fillna("").astype(str)
+    missing = is_comment & (df["parent_id"] == "")
+    df.loc[missing, "parent_id"] = df.loc[missing, "thread_id"]
+    if "depth" not in df.columns:
+        df["depth"] = np.nan
+    df["depth"] = df["depth"].fillna(is_comment.astype(int)).astype(np.int64)
+    return df
+
+
+def _gather(offsets: np.ndarray, items: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Concatenate the CSR rows ``items[offsets[i]:offsets[i + 1]]`` for ``nodes``."""
+    lo = offsets[nodes]
+    counts = offsets[nodes + 1] - lo
+    idx = np.repeat(lo - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(counts.sum())
+    return items[idx]
+
+
+class ReplyTree:
+    """Preorder layout of every thread's reply tree.
+
+    Arrays indexed by preorder slot: ``order`` (row at the slot), ``parent_slot``
+    (-1 for roots), ``subtree_end`` (exclusive), ``depth``, and CSR
+    ``child_offsets``/``children`` (child slots). ``slot`` maps row -> slot.
+    """
+
+    def __init__(self, **arrays):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(cls, ids, parent_ids, thread_keys, created) -> "ReplyTree":
+        ids = np.asarray(ids, dtype=str)
+        thread_keys = np.asarray(thread_keys)
+        created = np.asarray(created, dtype="datetime64[ns]")
+        n = len(ids)
+        rows = np.arange(n)
+
+        # 1. parent row per record (-1 when the parent was not collected)
+        lookup = pd.Series(rows, index=ids)
+        lookup = lookup[~lookup.index.duplicated()]
+        parent = lookup.reindex(np.asarray(parent_ids, dtype=str)).fillna(-1).to_numpy(dtype=np.int64, copy=True)
+        parent[parent == rows] = -1
+
+        while True:
+            # Children of each row as CSR, each row's children in created order
+            by_parent = np.lexsort((created, parent))
+            by_parent = by_parent[parent[by_parent] >= 0]
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(parent[by_parent], minlength=n))])
+
+            # 2. depths, one level at a time from the roots
+            depth = np.full(n, -1, dtype=np.int64)
+            levels = []
+            frontier = np.flatnonzero(parent < 0)
+            frontier = frontier[np.lexsort((created[frontier], thread_keys[frontier]))]
+            while frontier.size:
+                depth[frontier] = len(levels)
+                levels.append(frontier)
+                frontier = _gather(offsets, by_parent, frontier)
+            # Rows never reached hang off a parent cycle; cut them loose as roots.
+            unreached = depth < 0
+            if not unreached.any():
+                break
+            parent[unreached] = -1
+
+        # 3. subtree sizes, deepest level first
+        size = np.ones(n, dtype=np.int64)
+        for level in reversed(levels[1:]):
+            np.add.at(size, parent[level], size[level])
+
+        # 4. preorder slots: roots back to back, then each level's children
+        # packed after their parent's slot in sibling order.
+        slot = np.empty(n, dtype=np.int64)
+        roots = levels[0]
+        slot[roots] = np.cumsum(size[roots]) - size[roots]
+        for level in levels[1:]:
+            p = parent[level]
+            before = np.cumsum(size[level]) - size[level]
+            group_first = np.concatenate([[True], p[1:] != p[:-1]])
+            group_base = before[np.maximum.accumulate(np.where(group_first, np.arange(len(level)), 0))]
+            slot[level] = slot[p] + 1 + before - group_base
+
+        order = np.empty(n, dtype=np.int64)
+        order[slot] = rows
+        parent_slot = np.where(parent[order] >= 0, slot[np.maximum(parent[order], 0)], -1)
+        # Group child slots by parent; ascending slots already follow sibling order.
+        child_slots = np.flatnonzero(parent_slot >= 0)
+        child_slots = child_slots[np.argsort(parent_slot[child_slots], kind="stable")]
+        return cls(
+            order=order,
+            slot=slot,
+            parent_slot=parent_slot,
+            subtree_end=np.arange(n) + size[order],
+            depth=depth[order],
+            child_offsets=np.concatenate([[0], np.cumsum(np.bincount(parent_slot[child_slots], minlength=n))]),
+            children=child_slots,
+        )
+
+    def save(self, path: Path):
+        np.savez_compressed(path, **{name: getattr(self, name) for name in ARRAYS})
+
+    @classmethod
+    def load(cls, path: Path) -> "ReplyTree":
+        with np.load(path) as npz:
+            return cls(**{name: npz[name] for name in ARRAYS})
+
+    # ── Queries (inputs and outputs are in row order) ──
+
+    def subtree_sums(self, values) -> np.ndarray:
+        """Sum of ``values`` over each record's subtree, the record included."""
+        prefix = np.concatenate([[0], np.cumsum(np.asarray(values)[self.order])])
+        return (prefix[self.subtree_end] - prefix[:-1])[self.slot]
+
+    def descendant_counts(self) -> np.ndarray:
+        """Number of direct and indirect replies to each record."""
+        return (self.subtree_end - np.arange(len(self.order)) - 1)[self.slot]
+
+    def reply_means(self, values) -> np.ndarray:
+        """Mean of ``values`` over each record's replies (NaN when it has none)."""
+        values = np.asarray(values, dtype=float)
+        replies = self.descendant_counts()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(replies > 0, (self.subtree_sums(values) - values) / replies, np.nan)
+
+    def children_of(self, row: int) -> np.ndarray:
+        """Rows of the direct replies to ``row``, oldest first."""
+        s = self.slot[row]
+        return self.order[self.children[self.child_offsets[s]:self.child_offsets[s + 1]]]
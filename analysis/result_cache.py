@@ -0,0 +1,120 @@
+"""
+Process-wide, memory-bounded LRU cache of dashboard section results.
+
+Sessions that pick the same filters (usually one of a few presets) share a
+single computed result instead of each recomputing, and each receiving a
+pickled copy of, the same aggregates. Keys are built from the section, its
+extra arguments and the normalized filter state, so selecting the same
+subreddits in a different order is still a hit.
+
+Entries are sized by deep memory (DataFrames, arrays and tuples of them).
+Once the total exceeds the byte budget, the least recently used entries are
+evicted. Results are shared, not copied: callers must treat them as
+read-only.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from analysis.query_backend import FilterState
+
+
+def normalize_filters(filters: FilterState) -> FilterState:
+    """The same selection in canonical form: subreddits and tiers sorted and de-duplicated."""
+    return filters._replace(
+        subreddits=tuple(sorted(set(filters.subreddits))),
+        tiers=tuple(sorted(set(filters.tiers))),
+    )
+
+
+def normalize_query(query: str) -> str:
+    """A search query in canonical form: lowercase, single-spaced (search ignores case and spacing)."""
+    return " ".join(query.lower().split())
+
+
+def result_bytes(value) -> int:
+    """Deep in-memory size of a cached result."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(result_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(result_bytes(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU mapping of result keys to values, bounded by total bytes."""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = int(budget_bytes)
+        self._entries = OrderedDict()  # key -> (value, bytes), least recently used first
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, compute: Callable) -> tuple:
+        """``(value, hit)`` for ``key``, calling ``compute()`` and storing its value on a miss.
+
+        ``compute`` runs outside the lock, so sessions computing different
+        results do not wait on each other.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value, False
+
+    def put(self, key: Hashable, value):
+        """Store ``value``, evicting least recently used entries to stay within budget.
+
+        A value larger than the whole budget is not stored.
+        """
+        size = result_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.budget_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.budget_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,246 @@
+"""
+Pluggable batched sentiment backends for the cleaning pipeline.
+
+Every backend scores a batch of texts at a time and returns polarity in
+[-1, 1]. ``score`` walks a corpus in ``batch_size`` chunks. ``label`` turns
+scores into ``negative`` / ``neutral`` / ``positive`` using the backend's own
+(lower, upper) thresholds, since each model spreads its scores differently.
+
+Backends:
+  - textblob: TextBlob pattern-lexicon polarity (default; the original scorer)
+  - lexicon: VADER-style rule-based lexicon (negation, boosters, "but"
+    shifts) scored for the whole batch at once with NumPy over token ids
+    from ``analysis.tokens``; can load a full VADER-format lexicon file
+  - onnx: a local ONNX sequence-classification model on CPU (optional
+    dependencies: onnxruntime and tokenizers)
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.tokens import TokenStore
+
+LABELS = np.array(["negative", "neutral", "positive"])
+
+
+class SentimentBackend:
+    """Base class: batching and labelling shared by every backend."""
+
+    name = ""
+    batch_size = 256
+    thresholds = (-0.1, 0.1)
+    # Backends that score tokens rather than raw text also implement
+    # ``score_tokens(store)`` over the pipeline's shared token store.
+    uses_tokens = False
+
+    def __init__(self, batch_size: int = None, thresholds: tuple = None):
+        if batch_size is not None:
+            self.batch_size = int(batch_size)
+        if thresholds is not None:
+            self.thresholds = tuple(float(t) for t in thresholds)
+
+    def score_batch(self, texts: list) -> np.ndarray:
+        raise NotImplementedError
+
+    def score(self, texts) -> np.ndarray:
+        """Polarity for every text, computed ``batch_size`` texts at a time."""
+        texts = [str(text) for text in texts]
+        batches = [
+            self.score_batch(texts[i:i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        return np.concatenate(batches) if batches else np.zeros(0)
+
+    def label(self, scores) -> np.ndarray:
+        """``positive`` above the upper threshold, ``negative`` below the lower, else ``neutral``."""
+        lower, upper = self.thresholds
+        scores = np.asarray(scores, dtype=float)
+        return LABELS[np.where(scores > upper, 2, np.where(scores < lower, 0, 1))]
+
+
+# ── TextBlob ─────────────────────────────────────────────────────────────────
+
+class TextBlobBackend(SentimentBackend):
+    name = "textblob"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        from textblob import TextBlob
+
+        self._blob = TextBlob
+
+    def score_batch(self, texts: list) -> np.ndarray:
+        return np.array([self._blob(text).sentiment.polarity for text in texts], dtype=float)
+
+
+# ── VADER-style Lexicon ──────────────────────────────────────────────────────
+
+# Valences on VADER's -4..4 scale: general sentiment plus hiring/policy terms
+LEXICON = {
+    "good": 1.9, "great": 3.1, "excellent": 2.7, "amazing": 2.8, "awesome": 3.1,
+    "best": 3.2, "better": 1.9, "love": 3.2, "like": 1.5, "happy": 2.7,
+    "glad": 2.0, "hope": 1.9, "hopeful": 2.3, "helpful": 1.8, "fair": 1.3,
+    "fairer": 1.4, "win": 2.8, "opportunity": 1.6, "opportunities": 1.6, "success": 2.7,
+    "successful": 2.8, "benefit": 2.0, "benefits": 2.0, "improve": 1.9, "improved": 2.1,
+    "improvement": 2.0, "promising": 1.7, "progress": 1.8, "support": 1.7, "supportive": 2.0,
+    "inclusive": 1.6, "qualified": 1.2, "skilled": 1.5, "valuable": 2.1, "welcome": 2.0,
+    "thanks": 1.9, "thank": 1.5, "interesting": 1.7, "easier": 1.5, "finally": 0.9,
+    "hired": 1.6, "offer": 1.1, "promotion": 1.9, "promoted": 1.9, "raise": 1.0,
+    "bad": -2.5, "worse": -2.1, "worst": -3.1, "terrible": -2.1, "awful": -2.0,
+    "horrible": -2.5, "hate": -2.7, "sad": -2.1, "angry": -2.3, "afraid": -2.0,
+    "fear": -2.2, "worried": -1.2, "worry": -1.9, "anxious": -1.0, "stress": -1.8,
+    "stressful": -2.0, "frustrated": -2.4, "frustrating": -1.9, "unfair": -2.1, "wrong": -2.1,
+    "problem": -1.7, "problems": -1.7, "fail": -2.5, "failed": -2.3, "failure": -2.3,
+    "lose": -1.8, "lost": -1.3, "loss": -1.3, "hard": -0.4, "difficult": -1.5,
+    "impossible": -1.4, "useless": -1.8, "waste": -1.8, "pointless": -1.6, "broken": -1.7,
+    "rejected": -1.9, "rejection": -1.8, "ghosted": -1.8, "denied": -1.6, "layoff": -2.0,
+    "layoffs": -2.0, "laid": -1.2, "fired": -2.2, "rif": -1.8, "cuts": -1.2,
+    "cut": -1.1, "unemployed": -1.9, "scam": -2.3, "gatekeeping": -1.6, "discrimination": -2.6,
+    "biased": -1.6, "bias": -1.4, "chaos": -2.3, "mess": -1.5, "ridiculous": -1.5,
+    "joke": -0.5, "disappointed": -1.9, "disappointing": -2.2, "uncertain": -1.2, "uncertainty": -1.4,
+}
+NEGATIONS = {
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without",
+    "isn't", "aren't", "wasn't", "weren't", "don't", "doesn't", "didn't", "can't",
+    "cannot", "couldn't", "won't", "wouldn't", "shouldn't", "hasn't", "haven't", "hadn't",
+}
+BOOSTERS = {
+    "very": 1, "really": 1, "extremely": 1, "so": 1, "incredibly": 1, "totally": 1,
+    "completely": 1, "absolutely": 1, "super": 1, "highly": 1, "most": 1, "especially": 1,
+    "slightly": -1, "somewhat": -1, "barely": -1, "kinda": -1, "kind": -1, "hardly": -1,
+    "marginally": -1, "partly": -1, "little": -1,
+}
+BOOST_INCREMENT = 0.293   # VADER's booster/dampener step
+NEGATION_SCALAR = -0.74   # VADER's valence multiplier per negation in the window
+NEGATION_WINDOW = 3
+NORMALIZE_ALPHA = 15      # compound = sum / sqrt(sum^2 + alpha)
+
+
+def read_vader_lexicon(path: Path) -> dict:
+    """Token -> mean valence from a VADER-format file (``token<TAB>mean<TAB>...``)."""
+    table = pd.read_csv(path, sep="\t", header=None, usecols=[0, 1], names=["token", "valence"],
+                        quoting=3, keep_default_na=False)
+    return dict(zip(table["token"].astype(str), table["valence"].astype(float)))
+
+
+class LexiconBackend(SentimentBackend):
+    """VADER-style compound score, computed over a flattened batch of tokens.
+
+    Each token's valence is scaled by -0.74 for every negation among the
+    three tokens before it, nudged by a booster or dampener right before it,
+    halved before the first "but" and raised by half after it. The sum per
+    text is normalized to [-1, 1] as ``s / sqrt(s^2 + 15)``.
+    """
+
+    name = "lexicon"
+    uses_tokens = True
+    batch_size = 4096
+    thresholds = (-0.05, 0.05)
+
+    def __init__(self, lexicon_path: Path = None, **options):
+        super().__init__(**options)
+        self.lexicon = read_vader_lexicon(lexicon_path) if lexicon_path else LEXICON
+
+    def score_batch(self, texts: list) -> np.ndarray:
+        store = TokenStore.from_texts(texts)
+        return self._compound(store, self._vocab_tables(store.vocab))
+
+    def score_tokens(self, store: TokenStore) -> np.ndarray:
+        """Polarity per record of a token store, ``batch_size`` records at a time."""
+        tables = self._vocab_tables(store.vocab)
+        batches = [
+            self._compound(store.slice(i, min(i + self.batch_size, len(store))), tables)
+            for i in range(0, len(store), self.batch_size)
+        ]
+        return np.concatenate(batches) if batches else np.zeros(0)
+
+    def _vocab_tables(self, vocab: np.ndarray) -> dict:
+        """Valence, negation, booster and "but" lookups per vocabulary entry."""
+        vocab = pd.Series(vocab, dtype=str)
+        return {
+            "valence": vocab.map(self.lexicon).fillna(0.0).to_numpy(dtype=float),
+            "negation": vocab.isin(NEGATIONS).to_numpy(),
+            "boost": vocab.map(BOOSTERS).fillna(0).to_numpy(dtype=float),
+            "but": (vocab == "but").to_numpy(),
+        }
+
+    def _compound(self, store: TokenStore, tables: dict) -> np.ndarray:
+        doc = store.doc_index()
+        valence = tables["valence"][store.ids]
+        position = np.arange(len(store.ids))
+
+        def before(values: np.ndarray, k: int) -> np.ndarray:
+            """The value k tokens earlier in the same text (zero at a text's start)."""
+            shifted = np.zeros_like(values)
+            if k < len(values):
+                shifted[k:] = np.where(doc[k:] == doc[:-k], values[:-k], 0)
+            return shifted
+
+        negation = tables["negation"][store.ids]
+        for k in range(1, NEGATION_WINDOW + 1):
+            valence = np.where(before(negation, k), valence * NEGATION_SCALAR, valence)
+
+        boost = before(tables["boost"][store.ids], 1)
+        valence += np.sign(valence) * BOOST_INCREMENT * boost
+
+        is_but = tables["but"][store.ids]
+        first_but = np.full(len(store), np.iinfo(np.int64).max)
+        np.minimum.at(first_but, doc[is_but], position[is_but])
+        has_but = first_but[doc] < np.iinfo(np.int64).max
+        valence *= np.where(has_but & (position < first_but[doc]), 0.5,
+                            np.where(has_but & (position > first_but[doc]), 1.5, 1.0))
+
+        total = np.bincount(doc, weights=valence, minlength=len(store))
+        return total / np.sqrt(total ** 2 + NORMALIZE_ALPHA)
+
+
+# ── ONNX Model ───────────────────────────────────────────────────────────────
+
+class OnnxBackend(SentimentBackend):
+    """A local ONNX sequence-classification model run on CPU.
+
+    Expects ``tokenizer.json`` (Hugging Face ``tokenizers`` format) next to
+    the model unless ``tokenizer_path`` is given. Class order must be
+    (negative, positive) or (negative, neutral, positive); polarity is
+    P(positive) - P(negative).
+    """
+
+    name = "onnx"
+    batch_size = 32
+    thresholds = (-0.25, 0.25)
+
+    def __init__(self, model_path: Path = None, tokenizer_path: Path = None,
+                 max_length: int = 256, **options):
+        super().__init__(**options)
+        if model_path is None:
+            raise ValueError("The onnx sentiment backend needs a model file (--onnx-model)")
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = Path(model_path)
+        self._session = onnxruntime.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(str(tokenizer_path or model_path.with_name("tokenizer.json")))
+        self._tokenizer.enable_truncation(max_length)
+        self._tokenizer.enable_padding()
+
+    def score_batch(self, texts: list) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        logits = self._session.run(None, {k: v for k, v in feeds.items() if k in self._inputs})[0]
+        probs = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs[:, -1] - probs[:, 0]
+
+
+BACKENDS = {backend.name: backend for backend in (TextBlobBackend, LexiconBackend, OnnxBackend)}
+
+
+def get_backend(name: str, **options) -> SentimentBackend:
+    """Instantiate a sentiment backend by name; ``None`` options keep its defaults."""
+    return BACKENDS[name](**{k: v for k, v in options.items() if v is not None})
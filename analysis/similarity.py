@@ -0,0 +1,131 @@
+"""
+"More like this": random-projection LSH over TF-IDF record vectors.
+
+Each record's sparse TF-IDF row (the topic model's vocabulary rules, via
+``analysis.topics``) is projected onto ``SIGNATURE_BITS`` fixed Gaussian
+directions, and the sign of each projection becomes one bit of a SimHash
+signature. The Hamming distance between two signatures estimates the angle
+between the records' TF-IDF vectors, so cosine similarity can be ranked
+without touching text.
+
+A query costs one XOR and popcount per candidate over 16 bytes per record:
+the filtered records are ranked by Hamming distance, the ``RERANK`` nearest
+are re-scored by exact cosine on their TF-IDF rows and the top ``k``
+returned. Records without any vocabulary term have no meaningful direction
+and are never returned.
+
+The pipeline saves the signatures next to the cleaned CSV; the dashboard
+loads them, or rebuilds them from the token store when missing or stale.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.tokens import TokenStore
+from analysis.topics import BATCH_ROWS, batches, select_terms, tfidf_matrix
+
+SIGNATURE_BITS = 128
+RERANK = 500          # nearest signatures re-scored by exact cosine
+TOP_K = 10
+
+# Popcount per byte, where numpy has no bitwise_count (numpy < 2)
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def similarity_path(data_path: Path) -> Path:
+    """Where the similarity index for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_similarity.npz")
+
+
+def hamming(signatures: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Differing bits between each row of ``signatures`` and ``query`` (uint64 words)."""
+    diff = signatures ^ query
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.int32)
+    return _BYTE_BITS[diff.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def _projection(n_terms: int, bits: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n_terms, bits)).astype(np.float32)
+
+
+def _sign(store: TokenStore, terms: np.ndarray, idf: np.ndarray, projection: np.ndarray, batch_rows: int) -> tuple:
+    """Packed signature bits and a has-any-term flag per record of ``store``."""
+    signatures = np.zeros((len(store), projection.shape[1] // 64), dtype=np.uint64)
+    has_terms = np.zeros(len(store), dtype=bool)
+    start = 0
+    for batch in batches(store, batch_rows):
+        matrix = tfidf_matrix(batch, terms, idf)
+        packed = np.packbits(np.asarray(matrix @ projection) > 0, axis=1, bitorder="little")
+        signatures[start:start + len(batch)] = packed.view(np.uint64)
+        has_terms[start:start + len(batch)] = np.diff(matrix.indptr) > 0
+        start += len(batch)
+    return signatures, has_terms
+
+
+class SimilarityIndex:
+    """Per-record SimHash signatures plus the TF-IDF vocabulary used for re-ranking."""
+
+    def __init__(self, terms: np.ndarray, idf: np.ndarray, signatures: np.ndarray, has_terms: np.ndarray):
+        self.terms = terms
+        self.idf = idf
+        self.signatures = signatures
+        self.has_terms = has_terms
+
+    @classmethod
+    def build(cls, store: TokenStore, bits: int = SIGNATURE_BITS, batch_rows: int = BATCH_ROWS,
+              seed: int = 42) -> "SimilarityIndex":
+        """Sign bits of every record's TF-IDF row projected on ``bits`` random directions."""
+        if bits % 64:
+            raise ValueError(f"Signature bits must be a multiple of 64, not {bits}")
+        terms, idf = select_terms(store, batch_rows=batch_rows)
+        signatures, has_terms = _sign(store, terms, idf, _projection(len(terms), bits, seed), batch_rows)
+        return cls(terms, idf, signatures, has_terms)
+
+    def extend(self, store: TokenStore, batch_rows: int = BATCH_ROWS, seed: int = 42) -> "SimilarityIndex":
+        """This index plus signatures for the records of ``store``, appended after its own.
+
+        The vocabulary, IDF weights and projection (``seed`` as in ``build``)
+        stay fixed, so existing signatures and query results are unchanged.
+        """
+        projection = _projection(len(self.terms), self.signatures.shape[1] * 64, seed)
+        signatures, has_terms = _sign(store, self.terms, self.idf, projection, batch_rows)
+        return SimilarityIndex(self.terms, self.idf, np.concatenate([self.signatures, signatures]),
+                               np.concatenate([self.has_terms, has_terms]))
+
+    def save(self, path: Path):
+        np.savez_compressed(path, terms=self.terms, idf=self.idf, signatures=self.signatures,
+                            has_terms=self.has_terms)
+
+    @classmethod
+    def load(cls, path: Path) -> "SimilarityIndex":
+        with np.load(path) as npz:
+            return cls(npz["terms"], npz["idf"], npz["signatures"], npz["has_terms"])
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def query(self, store: TokenStore, record: int, candidates: np.ndarray, k: int = TOP_K,
+              rerank: int = RERANK) -> pd.DataFrame:
+        """The ``k`` records among ``candidates`` (row positions) most similar to ``record``.
+
+        Returns ``pos`` and cosine ``similarity``, most similar first; empty
+        when ``record`` has no vocabulary term.
+        """
+        empty = pd.DataFrame({"pos": np.array([], dtype=np.int64), "similarity": np.array([], dtype=float)})
+        if not self.has_terms[record]:
+            return empty
+        candidates = np.asarray(candidates, dtype=np.int64)
+        candidates = candidates[self.has_terms[candidates] & (candidates != record)]
+        if not len(candidates):
+            return empty
+        distance = hamming(self.signatures[candidates], self.signatures[record])
+        if len(candidates) > rerank:
+            candidates = candidates[np.argpartition(distance, rerank - 1)[:rerank]]
+        vectors = tfidf_matrix(store.take(candidates), self.terms, self.idf)
+        target = tfidf_matrix(store.take([record]), self.terms, self.idf)
+        scores = np.asarray((vectors @ target.T).todense()).ravel()
+        # Most similar first; ties by row position for a stable order
+        order = np.lexsort((candidates, -scores))[:k]
+        return pd.DataFrame({"pos": candidates[order], "similarity": scores[order]})
@@ -0,0 +1,181 @@
+"""
+Streaming ingestion: event sources, micro-batching and the append-only partition store.
+
+``scripts/stream_data.py`` follows new submissions and comments, cleans them
+in micro-batches and appends each batch to ``<cleaned stem>_stream/`` as one
+Parquet partition with the cleaned CSV's columns. A partition is written
+under a temporary name and renamed, so readers never see a partial file,
+and is never rewritten, so a reader that has seen some partitions only
+needs the ones after them. The dashboard polls the directory and extends
+its indexes with the new rows alone.
+
+Sources return whatever arrived since their last poll, as raw-record dicts
+with the raw CSV's columns (plus ``parent_id`` and ``depth`` when known):
+  - JsonlSource tails a JSON-lines spool file. It is the local stand-in for
+    Reddit: anything that appends lines to the spool is an event source,
+    such as ``replay``, which re-issues raw records as new ones at a set rate
+  - PrawSource follows the subreddits' submission and comment streams
+    through PRAW (``pip install praw``, with Reddit API credentials)
+"""
+import datetime
+import json
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from analysis.query_backend import read_cleaned
+
+MAX_BATCH_RECORDS = 500
+MAX_BATCH_SECONDS = 60.0   # a non-empty batch is flushed at most this long after its first record
+POLL_SECONDS = 5.0
+
+
+def stream_dir(data_path: Path) -> Path:
+    """Where streamed partitions for a cleaned data file live."""
+    return data_path.with_name(f"{data_path.stem}_stream")
+
+
+def partitions(directory: Path) -> list:
+    """Committed partitions in ``directory``, oldest first."""
+    return sorted(directory.glob("part-*.parquet")) if directory.exists() else []
+
+
+def write_partition(df: pd.DataFrame, directory: Path) -> Path:
+    """Append ``df`` as the next partition; the file appears complete or not at all."""
+    directory.mkdir(parents=True, exist_ok=True)
+    existing = partitions(directory)
+    number = int(existing[-1].stem.split("-")[1]) + 1 if existing else 1
+    path = directory / f"part-{number:06d}.parquet"
+    partial = path.with_suffix(".tmp")
+    df.to_parquet(partial, index=False)
+    partial.replace(path)
+    return path
+
+
+def read_partitions(paths: list) -> pd.DataFrame:
+    """Partitions concatenated in order, with dashboard dtypes."""
+    return pd.concat([read_cleaned(Path(path)) for path in paths], ignore_index=True)
+
+
+# ── Sources ──────────────────────────────────────────────────────────────────
+
+class JsonlSource:
+    """Raw records appended to a JSON-lines spool file, read from where the last poll stopped.
+
+    With ``follow`` false the source ends (``poll`` returns None) at the end
+    of the file instead of waiting for more lines.
+    """
+
+    def __init__(self, path: Path, follow: bool = True):
+        self.path = path
+        self.follow = follow
+        self.offset = 0
+
+    def poll(self):
+        records = []
+        if self.path.exists():
+            with open(self.path, "rb") as fh:
+                fh.seek(self.offset)
+                for line in fh:
+                    if not line.endswith(b"\n"):
+                        break  # a writer is mid-line; read it next time
+                    self.offset += len(line)
+                    if line.strip():
+                        records.append(json.loads(line))
+        if not records and not self.follow:
+            return None
+        return records
+
+
+class PrawSource:
+    """New submissions and comments in ``subreddits``, through PRAW's polling streams."""
+
+    def __init__(self, reddit, subreddits: list):
+        subreddit = reddit.subreddit("+".join(subreddits))
+        # pause_after=-1 makes each stream yield None as soon as it has nothing new
+        self.streams = [
+            subreddit.stream.submissions(pause_after=-1, skip_existing=True),
+            subreddit.stream.comments(pause_after=-1, skip_existing=True),
+        ]
+
+    def poll(self):
+        records = []
+        for stream in self.streams:
+            for item in stream:
+                if item is None:
+                    break
+                records.append(praw_record(item))
+        return records
+
+
+def utc_naive(ts: float) -> datetime.datetime:
+    """A Unix timestamp as naive UTC wall time, matching batch ``created_utc`` values."""
+    return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).replace(tzinfo=None)
+
+
+def praw_record(item) -> dict:
+    """A PRAW submission or comment as a raw record, as ``fetch_reddit_praw.py`` collects them."""
+    common = {
+        "created_utc": utc_naive(item.created_utc).isoformat(sep=" "),
+        "score": item.score,
+        "subreddit": item.subreddit.display_name,
+        "author": str(item.author),
+    }
+    if hasattr(item, "selftext"):
+        return {"type": "post", "thread_id": item.id, "id": item.id, "parent_id": "", "depth": 0,
+                "title": item.title, "body": item.selftext, **common}
+    # Depth needs the whole thread walked; left missing (cleaned as 1) below top level
+    parent_id = item.parent_id.split("_", 1)[1]
+    thread_id = item.link_id.split("_", 1)[1]
+    return {"type": "comment", "thread_id": thread_id, "id": item.id, "parent_id": parent_id,
+            "depth": 1 if parent_id == thread_id else None, "title": "", "body": item.body, **common}
+
+
+def micro_batches(source, max_records: int = MAX_BATCH_RECORDS, max_seconds: float = MAX_BATCH_SECONDS,
+                  poll_seconds: float = POLL_SECONDS, clock=time.monotonic, sleep=time.sleep):
+    """Lists of records from ``source``, each flushed when full or ``max_seconds`` after its first record.
+
+    Ends, after flushing, when the source's ``poll`` returns None.
+    """
+    pending, first_seen = [], None
+    while True:
+        records = source.poll()
+        if records is None:
+            if pending:
+                yield pending
+            return
+        if records and first_seen is None:
+            first_seen = clock()
+        pending.extend(records)
+        while len(pending) >= max_records:
+            yield pending[:max_records]
+            pending = pending[max_records:]
+            first_seen = clock() if pending else None
+        if pending and clock() - first_seen >= max_seconds:
+            yield pending
+            pending, first_seen = [], None
+        if not records:
+            sleep(poll_seconds)
+
+
+def replay(raw: pd.DataFrame, spool: Path, rate: float, clock=time.time, sleep=time.sleep):
+    """Append ``raw`` records to ``spool`` as new events, ``rate`` per second.
+
+    Each record gets a fresh ``id`` and the current time. Posts start a new
+    thread; comments keep their ``thread_id`` and reply to its post, so
+    replayed comments also update existing threads.
+    """
+    spool.parent.mkdir(parents=True, exist_ok=True)
+    for record in raw.to_dict("records"):
+        record["id"] = uuid.uuid4().hex[:7]
+        if record["type"] == "post":
+            record["thread_id"] = record["id"]
+        record.pop("parent_id", None)
+        record.pop("depth", None)
+        record["created_utc"] = utc_naive(clock()).isoformat(sep=" ", timespec="seconds")
+        record = {key: (None if pd.isna(value) else value) for key, value in record.items()}
+        with open(spool, "a") as fh:
+            fh.write(json.dumps(record) + "\n")
+        sleep(1 / rate)
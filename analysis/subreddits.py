@@ -0,0 +1,10 @@
+"""
+Subreddits the dataset is collected from.
+
+The PRAW fetcher covers federal employment communities and the Pushshift
+fetcher career and HR ones. Streaming follows both by default, so live
+records come from the same communities as the cleaned corpus.
+"""
+FEDERAL_SUBREDDITS = ("deptHHS", "FedEmployees", "feddiscussion", "govfire")
+CAREER_SUBREDDITS = ("humanresources", "recruiting", "jobs", "careerguidance")
+SUBREDDITS = FEDERAL_SUBREDDITS + CAREER_SUBREDDITS
@@ -0,0 +1,298 @@
+"""
+Open-vocabulary term statistics: a sparse document-term matrix and its aggregates.
+
+The curated ``KEYWORDS`` only find terms someone thought to list. This index
+covers the whole token-store vocabulary, so new terms ("doge", "schedule f")
+show up as soon as they are used:
+
+  - terms are single tokens (no stop words, digits or very short tokens, as
+    for topics) and two-token phrases (no stop words; one token may be short,
+    as in "schedule f" or "gs 13") occurring in at least ``MIN_DF`` records
+  - ``matrix`` is the binary (records x terms) document-term matrix, kept in
+    CSC form so a handful of terms' columns slice out cheaply
+  - ``counts`` is the (groups x terms) number of records mentioning each term,
+    where a group is one day and partition as in ``TimeIndex``. It is one
+    sparse product of a group-indicator matrix with ``matrix``, so filtered
+    monthly mentions of any terms never touch individual records
+
+Co-occurrence of the chosen terms within the filtered records is the sparse
+product ``X.T @ X`` of their columns. Emerging terms come from the monthly
+(months x terms) counts, themselves a sparse product with ``counts``: each
+month's share of records mentioning a term is compared with its share over
+the ``BASELINE_MONTHS`` before, with add-one smoothing so terms absent from
+the baseline still get a finite growth ratio.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.query_backend import FilterState
+from analysis.time_index import PARTITION_COLUMNS, partition_selection
+from analysis.tokens import TokenStore, tokenize
+from analysis.topics import BATCH_ROWS, MIN_DF, batches, candidate_terms
+
+BASELINE_MONTHS = 3
+MIN_MENTIONS = 3      # records in the month before a term can be emerging
+TOP_EMERGING = 10     # terms per month
+
+
+def index_path(data_path: Path) -> Path:
+    """Where the term index for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_terms.npz")
+
+
+def phrase_parts(vocab: np.ndarray) -> np.ndarray:
+    """Vocabulary entries allowed in a two-token phrase: letters or digits, no stop words."""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+    parts = pd.Series(vocab, dtype=str)
+    return (parts.str.fullmatch(r"[a-z0-9]+") & ~parts.isin(ENGLISH_STOP_WORDS)).to_numpy(dtype=bool)
+
+
+def occurrences(store: TokenStore, batch_rows: int = BATCH_ROWS) -> tuple:
+    """Distinct ``(record, key)`` pairs of ``store``, sorted.
+
+    A key below ``len(vocab)`` is a single token's vocabulary id; a phrase of
+    ids ``a, b`` is ``(a + 1) * len(vocab) + b``.
+    """
+    n_vocab = len(store.vocab)
+    single, part = candidate_terms(store.vocab), phrase_parts(store.vocab)
+    docs, keys, start = [], [], 0
+    for batch in batches(store, batch_rows):
+        doc = batch.doc_index().astype(np.int64)
+        ids = batch.ids.astype(np.int64)
+        first, second = ids[:-1], ids[1:]
+        pairs = (doc[:-1] == doc[1:]) & part[first] & part[second] & (single[first] | single[second])
+        batch_docs = np.concatenate([doc[single[ids]], doc[:-1][pairs]])
+        batch_keys = np.concatenate([ids[single[ids]], (first[pairs] + 1) * n_vocab + second[pairs]])
+        # One (record, key) per record and term; records are < batch_rows apart, keys < n_vocab ** 2 + n_vocab
+        unique = np.unique(batch_docs * (n_vocab + 1) * n_vocab + batch_keys)
+        docs.append(unique // ((n_vocab + 1) * n_vocab) + start)
+        keys.append(unique % ((n_vocab + 1) * n_vocab))
+        start += len(batch)
+    if not docs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(docs), np.concatenate(keys)
+
+
+def key_terms(keys: np.ndarray, vocab: np.ndarray) -> np.ndarray:
+    """The term string of each occurrence key."""
+    n_vocab = len(vocab)
+    phrase = keys >= n_vocab
+    terms = vocab[np.where(phrase, 0, keys)].astype(object)
+    first, second = vocab[keys[phrase] // n_vocab - 1], vocab[keys[phrase] % n_vocab]
+    terms[phrase] = np.char.add(np.char.add(first.astype(str), " "), second.astype(str))
+    return terms.astype(str)
+
+
+def group_codes(rows: pd.DataFrame) -> tuple:
+    """Each record's group (day x partition) code, and the sorted group keys."""
+    keyed = pd.DataFrame({"date": pd.to_datetime(rows["date"]).dt.normalize().astype("datetime64[ns]")})
+    for col in PARTITION_COLUMNS:
+        keyed[col] = rows[col].astype(str).to_numpy()
+    codes, uniques = pd.MultiIndex.from_frame(keyed).factorize(sort=True)
+    return codes, uniques.to_frame(index=False, name=["date", *PARTITION_COLUMNS])
+
+
+def indicator(codes: np.ndarray, n_groups: int):
+    """Sparse (groups x items) matrix with a one where item ``i`` belongs to group ``codes[i]``."""
+    from scipy import sparse
+
+    return sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (codes, np.arange(len(codes)))),
+                             shape=(n_groups, len(codes)))
+
+
+class TermIndex:
+    """Document-term matrix over the open vocabulary, plus per-group mention counts."""
+
+    def __init__(self, terms: np.ndarray, matrix, keys: pd.DataFrame, counts, sizes: np.ndarray):
+        self.terms = terms            # sorted term strings
+        self.matrix = matrix          # (records x terms) binary, CSC
+        self.keys = keys              # group keys: date plus the partition columns
+        self.counts = counts          # (groups x terms) records mentioning each term, CSR
+        self.sizes = sizes            # records per group
+
+    @classmethod
+    def build(cls, store: TokenStore, rows: pd.DataFrame, min_df: int = MIN_DF,
+              batch_rows: int = BATCH_ROWS) -> "TermIndex":
+        """Index ``store``'s records; ``rows`` holds their ``date`` and partition columns, in the same order."""
+        docs, keys = occurrences(store, batch_rows)
+        distinct, column, df_counts = np.unique(keys, return_inverse=True, return_counts=True)
+        kept = df_counts >= min_df
+        terms = key_terms(distinct[kept], store.vocab)
+        # Phrase keys sort after single tokens; order columns by the term strings instead
+        order = np.argsort(terms, kind="stable")
+        remap = np.full(len(distinct), -1, dtype=np.int64)
+        remap[np.flatnonzero(kept)[order]] = np.arange(len(order))
+        column = remap[column]
+        present = column >= 0
+        matrix = cls._matrix(docs[present], column[present], len(store), len(terms))
+        codes, group_keys = group_codes(rows)
+        return cls(terms[order], matrix, group_keys, *cls._group_counts(matrix, codes, len(group_keys)))
+
+    def extend(self, store: TokenStore, rows: pd.DataFrame, batch_rows: int = BATCH_ROWS) -> "TermIndex":
+        """A new index with ``store``'s records appended, numbered after the indexed ones.
+
+        New records are counted against the existing terms; terms they
+        introduce join the vocabulary on the next full build.
+        """
+        from scipy import sparse
+
+        docs, keys = occurrences(store, batch_rows)
+        distinct, inverse = np.unique(keys, return_inverse=True)
+        column = self.lookup(key_terms(distinct, store.vocab))[inverse]
+        present = column >= 0
+        added = self._matrix(docs[present], column[present], len(store), len(self.terms))
+
+        new_codes, new_keys = group_codes(rows)
+        codes, uniques = pd.MultiIndex.from_frame(pd.concat([self.keys, new_keys], ignore_index=True)).factorize(
+            sort=True)
+        old, new = codes[:len(self.keys)], codes[len(self.keys):]
+        counts, sizes = self._group_counts(added, new[new_codes], len(uniques))
+        counts = (counts + indicator(old, len(uniques)) @ self.counts).tocsr()
+        sizes += np.bincount(old, weights=self.sizes, minlength=len(uniques)).astype(np.int64)
+        return TermIndex(self.terms, sparse.vstack([self.matrix, added], format="csc"),
+                         uniques.to_frame(index=False, name=list(self.keys.columns)), counts, sizes)
+
+    @staticmethod
+    def _matrix(docs: np.ndarray, columns: np.ndarray, n_records: int, n_terms: int):
+        from scipy import sparse
+
+        return sparse.csc_matrix((np.ones(len(docs), dtype=np.int32), (docs, columns)),
+                                 shape=(n_records, n_terms))
+
+    @staticmethod
+    def _group_counts(matrix, codes: np.ndarray, n_groups: int) -> tuple:
+        """(groups x terms) mention counts, as the sparse product of a group-indicator matrix with ``matrix``."""
+        return (indicator(codes, n_groups) @ matrix).tocsr(), np.bincount(codes, minlength=n_groups).astype(np.int64)
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path,
+            terms=self.terms,
+            n_records=np.array(self.matrix.shape[0]),
+            matrix_indices=self.matrix.indices,
+            matrix_indptr=self.matrix.indptr,
+            key_date=self.keys["date"].to_numpy("datetime64[D]"),
+            **{f"key_{col}": self.keys[col].to_numpy(dtype=str) for col in PARTITION_COLUMNS},
+            counts_data=self.counts.data,
+            counts_indices=self.counts.indices,
+            counts_indptr=self.counts.indptr,
+            sizes=self.sizes,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "TermIndex":
+        from scipy import sparse
+
+        with np.load(path) as npz:
+            terms = npz["terms"]
+            indices = npz["matrix_indices"]
+            matrix = sparse.csc_matrix((np.ones(len(indices), dtype=np.int32), indices, npz["matrix_indptr"]),
+                                       shape=(int(npz["n_records"]), len(terms)))
+            keys = pd.DataFrame({"date": npz["key_date"].astype("datetime64[ns]"),
+                                 **{col: npz[f"key_{col}"] for col in PARTITION_COLUMNS}})
+            counts = sparse.csr_matrix((npz["counts_data"], npz["counts_indices"], npz["counts_indptr"]),
+                                       shape=(len(keys), len(terms)))
+            return cls(terms, matrix, keys, counts, npz["sizes"])
+
+    # ── Queries ──
+
+    def lookup(self, terms) -> np.ndarray:
+        """Column of each term string, -1 for terms not in the index."""
+        terms = np.asarray(terms, dtype=str)
+        column = np.searchsorted(self.terms, terms)
+        column[column == len(self.terms)] = 0
+        found = self.terms[column] == terms if len(self.terms) else np.zeros(len(terms), dtype=bool)
+        return np.where(found, column, -1)
+
+    def normalize(self, text: str) -> str:
+        """A typed term in index form: tokenized as record bodies are, tokens joined by spaces."""
+        return " ".join(tokenize([text])[0].to_pylist())
+
+    def document_frequencies(self) -> np.ndarray:
+        return np.diff(self.matrix.indptr)
+
+    def group_mask(self, filters: FilterState) -> np.ndarray:
+        dates = self.keys["date"].to_numpy("datetime64[D]")
+        mask = (dates >= np.datetime64(filters.start, "D")) & (dates <= np.datetime64(filters.end, "D"))
+        for col, allowed in partition_selection(filters).items():
+            if allowed is not None:
+                mask &= self.keys[col].isin(allowed).to_numpy()
+        return mask
+
+    def monthly(self, filters: FilterState, terms: list) -> pd.DataFrame:
+        """Records per month mentioning each of ``terms`` (index form), within the filters."""
+        columns = self.lookup(terms)
+        mask = self.group_mask(filters)
+        selected = self.counts[mask][:, columns[columns >= 0]].tocoo()
+        months = self.keys.loc[mask, "date"].dt.to_period("M").dt.start_time.to_numpy()
+        found = np.asarray(terms, dtype=str)[columns >= 0]
+        mentions = pd.DataFrame({"month": months[selected.row], "term": found[selected.col],
+                                 "mentions": selected.data.astype(np.int64)})
+        return mentions.groupby(["month", "term"], as_index=False)["mentions"].sum()
+
+    def cooccurrence(self, positions: np.ndarray, terms: list) -> pd.DataFrame:
+        """Share of records mentioning each term that also mention each other one, among ``positions``."""
+        columns = self.lookup(terms)
+        found = np.asarray(terms, dtype=str)[columns >= 0]
+        selected = self.matrix[:, columns[columns >= 0]].tocsr()[positions]
+        both = (selected.T @ selected).toarray()
+        mentions = np.diag(both)
+        primary, secondary = np.meshgrid(np.arange(len(found)), np.arange(len(found)), indexing="ij")
+        keep = (primary != secondary) & (mentions[primary] > 0)
+        return pd.DataFrame({
+            "primary": found[primary[keep]],
+            "co-occurs with": found[secondary[keep]],
+            "co-occurrence %": np.round(both[keep] / mentions[primary[keep]] * 100, 1),
+        })
+
+    def emerging(self, filters: FilterState = None, baseline_months: int = BASELINE_MONTHS,
+                 min_mentions: int = MIN_MENTIONS, top: int = TOP_EMERGING) -> pd.DataFrame:
+        """The ``top`` fastest-growing terms of each month, against the ``baseline_months`` before it.
+
+        Growth is the month's share of records mentioning the term over its
+        share in the baseline, both with one added mention. Months without a
+        baseline (the first in range) have no emerging terms.
+        """
+        from scipy import sparse
+
+        columns = ["month", "term", "mentions", "share", "baseline_share", "growth"]
+        mask = np.ones(len(self.keys), dtype=bool) if filters is None else self.group_mask(filters)
+        periods = self.keys.loc[mask, "date"].dt.to_period("M")
+        ordinal = (periods.dt.year * 12 + periods.dt.month).to_numpy()
+        if len(np.unique(ordinal)) < 2:
+            return pd.DataFrame(columns=columns)
+        month = ordinal - ordinal.min()
+        n_months = int(month.max()) + 1
+
+        # (months x groups) @ (groups x terms): every calendar month, empty ones included
+        by_month = indicator(month, n_months)
+        monthly = (by_month @ self.counts[mask]).tocsr()
+        totals = by_month @ self.sizes[mask].astype(np.float64)
+        # Each month's baseline sums the ``baseline_months`` rows before it
+        lags = range(1, min(baseline_months, n_months - 1) + 1)
+        window = sparse.diags([np.ones(n_months - k) for k in lags], [-k for k in lags], shape=(n_months, n_months),
+                              format="csr")
+        baseline = (window @ monthly).tocsr()
+        baseline_totals = window @ totals
+
+        current = monthly.tocoo()
+        keep = (current.data >= min_mentions) & (baseline_totals[current.row] > 0)
+        row, col, mentions = current.row[keep], current.col[keep], current.data[keep]
+        before = np.asarray(baseline[row, col]).ravel()
+        share = (mentions + 1) / (totals[row] + 1)
+        baseline_share = (before + 1) / (baseline_totals[row] + 1)
+        labels = pd.period_range(periods.min(), periods=n_months, freq="M").start_time
+        result = pd.DataFrame({
+            "month": labels[row],
+            "term": self.terms[col],
+            "mentions": mentions.astype(np.int64),
+            "share": share * 100,
+            "baseline_share": baseline_share * 100,
+            "growth": share / baseline_share,
+        })
+        result = result[result["growth"] > 1]
+        result = result.sort_values(["month", "growth", "mentions", "term"], ascending=[True, False, False, True])
+        return result.groupby("month").head(top).reset_index(drop=True)[columns]
@@ -0,0 +1,77 @@
+"""
+Thread-level rollup: one row per Reddit thread, keyed by an integer thread key.
+
+Posts and their comments share ``thread_id``. The cleaning pipeline maps it to
+a dense integer ``thread_key`` and writes this rollup next to the cleaned CSV,
+so thread views join on an int key instead of regrouping raw rows.
+
+The rollup is one sort-based pass: records are sorted by (thread_key,
+created_utc), thread boundaries are found once, and every statistic is a
+``ufunc.reduceat`` over the sorted arrays.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROLLUP_COLUMNS = [
+    "thread_key", "thread_id", "subreddit", "title", "records", "comments",
+    "sentiment_mean", "sentiment_var", "first_utc", "last_utc", "lifetime_hours", "max_score",
+]
+
+
+def rollup_path(data_path: Path) -> Path:
+    """Where the thread rollup for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_threads.csv")
+
+
+def thread_keys(thread_ids: pd.Series) -> np.ndarray:
+    """Dense integer key per thread, in sorted ``thread_id`` order."""
+    return pd.factorize(thread_ids, sort=True)[0].astype(np.int64)
+
+
+def thread_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """Comment count, sentiment mean/variance, first/last timestamp and max score per thread.
+
+    ``subreddit`` is that of the thread's earliest record; ``title`` is that of
+    its post (empty when the post itself was not collected). Variance is the
+    population variance of record sentiment.
+    """
+    created = pd.to_datetime(df["created_utc"]).to_numpy("datetime64[ns]")
+    order = np.lexsort((created, df["thread_key"].to_numpy()))
+    keys = df["thread_key"].to_numpy()[order]
+    created = created[order]
+    sentiment = df["sentiment_score"].to_numpy(dtype=float)[order]
+    is_post = (df["type"].to_numpy() == "post")[order]
+
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    records = np.diff(np.append(starts, len(keys)))
+    sent_sum = np.add.reduceat(sentiment, starts)
+    sent_sq = np.add.reduceat(sentiment ** 2, starts)
+    mean = sent_sum / records
+
+    # First post row per thread; len(keys) marks threads without a post.
+    post_rank = np.where(is_post, np.arange(len(keys)), len(keys))
+    first_post = np.minimum.reduceat(post_rank, starts)
+    titles = np.append(df["title"].fillna("").astype(str).to_numpy()[order], "")
+
+    first = created[starts]
+    last = created[np.append(starts[1:], len(keys)) - 1]
+    return pd.DataFrame({
+        "thread_key": keys[starts],
+        "thread_id": df["thread_id"].to_numpy()[order][starts],
+        "subreddit": df["subreddit"].to_numpy()[order][starts],
+        "title": titles[first_post],
+        "records": records,
+        "comments": records - np.add.reduceat(is_post.astype(np.int64), starts),
+        "sentiment_mean": mean,
+        "sentiment_var": np.maximum(sent_sq / records - mean ** 2, 0.0),
+        "first_utc": first,
+        "last_utc": last,
+        "lifetime_hours": (last - first) / np.timedelta64(1, "h"),
+        "max_score": np.maximum.reduceat(df["score"].to_numpy()[order], starts),
+    })
+
+
+def read_rollup(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, parse_dates=["first_utc", "last_utc"])
@@ -0,0 +1,197 @@
+"""
+Prefix-sum time index for constant-time range queries over volume and sentiment.
+
+For every partition (one combination of ``PARTITION_COLUMNS`` values) the
+index stores a cumulative sum of record counts, sentiment sums and score sums
+over every day of the corpus. The total for any date range is the difference
+of two prefix entries. Any granularity (day, week, month or a trailing
+rolling window) is therefore a few array lookups per period, whatever the
+corpus size.
+
+Extra key columns beyond the partitions (such as ``topic_id``) make an
+index whose series can be broken down by them too; sidebar filters still
+apply through the partition columns.
+
+The cleaning pipeline saves the index next to the cleaned CSV. The dashboard
+loads it, or builds it from its query backend when the file is missing or
+older than the data.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.query_backend import CONTENT_TYPES, FilterState
+
+PARTITION_COLUMNS = ["subreddit", "type", "engagement_tier", "burst_flag"]
+VALUE_COLUMNS = ["n", "sentiment_sum", "score_sum"]
+GRANULARITIES = {"day": "D", "week": "W", "month": "M", "rolling": None}
+
+
+def index_path(data_path: Path) -> Path:
+    """Where the time index for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_time_index.npz")
+
+
+def daily_totals(df: pd.DataFrame, key_columns: list = PARTITION_COLUMNS) -> pd.DataFrame:
+    """Per-day, per-key record counts, sentiment sums and score sums."""
+    keyed = df.assign(date=pd.to_datetime(df["date"]))
+    for col in key_columns:
+        keyed[col] = keyed[col].astype(str)
+    return (
+        keyed.groupby(["date", *key_columns], observed=True)
+        .agg(n=("sentiment_score", "size"), sentiment_sum=("sentiment_score", "sum"), score_sum=("score", "sum"))
+        .reset_index()
+    )
+
+
+def partition_selection(filters: FilterState) -> dict:
+    """Allowed values per partition column for a sidebar selection (None = any)."""
+    content_type = CONTENT_TYPES[filters.content_type]
+    return {
+        "subreddit": filters.subreddits,
+        "type": None if content_type is None else (content_type,),
+        "engagement_tier": filters.tiers,
+        "burst_flag": ("0",) if filters.exclude_bursts else None,
+    }
+
+
+class TimeIndex:
+    """Daily prefix sums per partition (or per combination of ``keys`` columns).
+
+    ``prefix[col]`` has shape (partitions, days + 1); entry ``[p, d]`` is the
+    total of ``col`` for partition ``p`` over the first ``d`` days.
+    """
+
+    def __init__(self, start: np.datetime64, keys: pd.DataFrame, prefix: dict):
+        self.start = np.datetime64(start, "D")
+        self.keys = keys
+        self.prefix = prefix
+        self.n_days = prefix["n"].shape[1] - 1
+
+    @classmethod
+    def from_daily(cls, daily: pd.DataFrame, key_columns: list = PARTITION_COLUMNS) -> "TimeIndex":
+        """Build from a ``daily_totals``-shaped frame keyed on ``key_columns``."""
+        days = daily["date"].to_numpy("datetime64[D]")
+        start = days.min()
+        offsets = (days - start).astype(np.int64)
+        n_days = int(offsets.max()) + 1
+
+        codes, uniques = pd.MultiIndex.from_frame(daily[key_columns].astype(str)).factorize(sort=True)
+        keys = uniques.to_frame(index=False, name=key_columns)
+
+        prefix = {}
+        for col in VALUE_COLUMNS:
+            values = daily[col].to_numpy()
+            grid = np.zeros((len(keys), n_days + 1), dtype=np.int64 if col == "n" else np.float64)
+            np.add.at(grid, (codes, offsets + 1), values)
+            prefix[col] = np.cumsum(grid, axis=1)
+        return cls(start, keys, prefix)
+
+    def extend(self, daily: pd.DataFrame) -> "TimeIndex":
+        """A new index with the totals of ``daily`` (``daily_totals``-shaped, same keys) added.
+
+        Days and keys the index lacks are added. The cost is one pass over the
+        (keys x days) grid, however many records the index already covers.
+        """
+        if daily.empty:
+            return self
+        key_columns = list(self.keys.columns)
+        days = daily["date"].to_numpy("datetime64[D]")
+        start = min(self.start, days.min())
+        end = max(self.start + self.n_days, days.max() + 1)
+        n_days = int((end - start).astype(np.int64))
+        shift = int((self.start - start).astype(np.int64))
+        offsets = (days - start).astype(np.int64)
+
+        combined = pd.concat([self.keys, daily[key_columns].astype(str)], ignore_index=True)
+        codes, uniques = pd.MultiIndex.from_frame(combined).factorize(sort=True)
+        keys = uniques.to_frame(index=False, name=key_columns)
+        old, new = codes[:len(self.keys)], codes[len(self.keys):]
+
+        prefix = {}
+        for col in VALUE_COLUMNS:
+            grid = np.zeros((len(keys), n_days + 1), dtype=self.prefix[col].dtype)
+            grid[old, shift + 1:shift + 1 + self.n_days] = np.diff(self.prefix[col], axis=1)
+            np.add.at(grid, (new, offsets + 1), daily[col].to_numpy())
+            prefix[col] = np.cumsum(grid, axis=1)
+        return TimeIndex(start, keys, prefix)
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path,
+            start=np.array(self.start),
+            key_columns=np.array(self.keys.columns, dtype=str),
+            **{f"key_{col}": self.keys[col].to_numpy(dtype=str) for col in self.keys.columns},
+            **{f"prefix_{col}": self.prefix[col] for col in VALUE_COLUMNS},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "TimeIndex":
+        with np.load(path) as npz:
+            key_columns = list(npz["key_columns"]) if "key_columns" in npz else PARTITION_COLUMNS
+            keys = pd.DataFrame({col: npz[f"key_{col}"] for col in key_columns})
+            prefix = {col: npz[f"prefix_{col}"] for col in VALUE_COLUMNS}
+            return cls(npz["start"], keys, prefix)
+
+    # ── Queries ──
+
+    def partition_mask(self, filters: FilterState) -> np.ndarray:
+        mask = np.ones(len(self.keys), dtype=bool)
+        for col, allowed in partition_selection(filters).items():
+            if allowed is not None:
+                mask &= self.keys[col].isin(allowed).to_numpy()
+        return mask
+
+    def _offset(self, date) -> int:
+        days = (np.datetime64(date, "D") - self.start).astype(np.int64)
+        return int(np.clip(days, 0, self.n_days))
+
+    def series(self, filters: FilterState, granularity: str = "month", by: str = None,
+               window: int = 7, step: int = 1) -> pd.DataFrame:
+        """Totals per period (and per ``by`` partition column) within the filter range.
+
+        ``granularity`` is ``day``, ``week``, ``month`` or ``rolling``. Rolling
+        gives the trailing ``window``-day totals (clipped to the range start)
+        every ``step`` days, ending on the last day of the range. Periods with
+        no records are omitted, matching groupby.
+        """
+        mask = self.partition_mask(filters)
+        lo = self._offset(filters.start)
+        hi = self._offset(np.datetime64(filters.end, "D") + 1)
+
+        if by is None:
+            group_codes, group_labels = np.zeros(int(mask.sum()), dtype=np.int64), None
+        else:
+            group_codes, group_labels = pd.factorize(self.keys.loc[mask, by], sort=True)
+        n_groups = 1 if group_labels is None else len(group_labels)
+
+        dates = pd.DatetimeIndex(self.start + np.arange(lo, hi))
+        freq = GRANULARITIES[granularity]
+        if freq is None:
+            ends = np.arange(hi, lo, -int(step))[::-1]
+            starts = np.maximum(ends - int(window), lo)
+            periods = dates[ends - 1 - lo]
+        else:
+            labels = dates.to_period(freq).start_time
+            first = np.ones(len(labels), dtype=bool)
+            first[1:] = labels[1:] != labels[:-1]
+            starts = np.flatnonzero(first) + lo
+            ends = np.append(starts[1:], hi)[:len(starts)]
+            periods = labels[starts - lo]
+
+        totals = {}
+        for col in VALUE_COLUMNS:
+            summed = np.zeros((n_groups, self.n_days + 1), dtype=self.prefix[col].dtype)
+            np.add.at(summed, group_codes, self.prefix[col][mask])
+            totals[col] = (summed[:, ends] - summed[:, starts]).ravel()
+
+        result = pd.DataFrame({"period": np.tile(np.asarray(periods), n_groups)})
+        if by is not None:
+            result[by] = np.repeat(np.asarray(group_labels), len(periods))
+        result["count"] = totals["n"]
+        result["sentiment_sum"] = totals["sentiment_sum"]
+        result["score_sum"] = totals["score_sum"]
+        result = result[result["count"] > 0].reset_index(drop=True)
+        result["sentiment_score"] = result["sentiment_sum"] / result["count"]
+        return result
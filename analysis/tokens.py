@@ -0,0 +1,186 @@
+"""
+Shared token store: every record's body tokenized once, in integer-vocabulary form.
+
+Text is lowercased, possessive ``'s`` is dropped and the rest is split into
+word tokens: runs of letters, digits and apostrophes, trimmed of apostrophes
+at either end (``won't`` and ``i've`` stay whole). Tokenizing runs in
+pyarrow's vectorized string kernels. The store keeps a sorted vocabulary,
+one int32 id per token and CSR ``offsets``, so record ``i``'s tokens are
+``vocab[ids[offsets[i]:offsets[i + 1]]]``.
+
+Everything downstream reads the store instead of re-parsing text:
+  - word_count is ``diff(offsets)``
+  - the lexicon sentiment backend looks valences up per vocabulary entry
+  - frame/keyword patterns and the record search match token sequences,
+    testing each pattern token against the vocabulary once (not every text)
+    and then following candidate positions through ``ids``
+
+The cleaning pipeline saves the store next to the cleaned CSV, along with
+the pattern bitmasks matched against it. The dashboard loads the store on the
+first search or similarity query, or rebuilds it from the body column when it
+is missing or stale.
+Streamed records are tokenized on their own and appended as a second
+segment (``AppendedTokenStore``), so the corpus's store is never re-encoded.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SEPARATOR_PATTERN = r"[^a-z0-9']+"
+POSSESSIVE_PATTERN = r"'s\b"
+
+
+def store_path(data_path: Path) -> Path:
+    """Where the token store for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_tokens.npz")
+
+
+def tokenize(texts) -> tuple:
+    """All tokens of ``texts`` in order, and the index of the text each came from."""
+    raw = pd.Series(texts, dtype=object).fillna("").astype(str).to_numpy()
+    normalized = pc.replace_substring(pc.utf8_lower(pa.array(raw, type=pa.large_string())), "’", "'")
+    words = pc.split_pattern_regex(pc.replace_substring_regex(normalized, POSSESSIVE_PATTERN, ""), SEPARATOR_PATTERN)
+    flat = pc.utf8_trim(pc.list_flatten(words), "'")
+    keep = pc.not_equal(flat, "")
+    return flat.filter(keep), pc.list_parent_indices(words).filter(keep).to_numpy()
+
+
+class TokenStore:
+    """Tokens of every record as vocabulary ids in CSR layout."""
+
+    def __init__(self, vocab: np.ndarray, ids: np.ndarray, offsets: np.ndarray):
+        self.vocab = vocab
+        self.ids = ids
+        self.offsets = offsets
+
+    @classmethod
+    def from_texts(cls, texts) -> "TokenStore":
+        flat, parents = tokenize(texts)
+        encoded = pc.dictionary_encode(flat)
+        # Re-number the dictionary so ids follow the sorted vocabulary
+        terms = encoded.dictionary.to_numpy(zero_copy_only=False).astype(str)
+        order = np.argsort(terms)
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        ids = rank[encoded.indices.to_numpy(zero_copy_only=False)]
+        lengths = np.bincount(parents, minlength=len(texts))
+        return cls(terms[order], ids, np.concatenate([[0], np.cumsum(lengths)]))
+
+    @classmethod
+    def concat(cls, stores: list) -> "TokenStore":
+        """Records of ``stores`` in sequence, re-encoded over the union of their vocabularies."""
+        vocab = np.unique(np.concatenate([store.vocab for store in stores]))
+        ids = [np.searchsorted(vocab, store.vocab).astype(np.int32)[store.ids] for store in stores]
+        lengths = np.concatenate([store.word_counts() for store in stores])
+        return cls(vocab, np.concatenate(ids), np.concatenate([[0], np.cumsum(lengths)]))
+
+    def append(self, store: "TokenStore") -> "AppendedTokenStore":
+        """This store followed by the records of ``store``, without re-encoding either."""
+        return AppendedTokenStore(self, store)
+
+    def take(self, records: np.ndarray) -> "TokenStore":
+        """Records at ``records`` (in that order) as a store sharing this vocabulary."""
+        lo = self.offsets[records]
+        lengths = self.offsets[np.asarray(records) + 1] - lo
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        idx = np.repeat(lo - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return TokenStore(self.vocab, self.ids[idx], offsets)
+
+    def save(self, path: Path):
+        np.savez_compressed(path, vocab=self.vocab, ids=self.ids, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path: Path) -> "TokenStore":
+        with np.load(path) as npz:
+            return cls(npz["vocab"], npz["ids"], npz["offsets"])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def word_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def doc_index(self) -> np.ndarray:
+        """Record number of every token."""
+        return np.repeat(np.arange(len(self)), self.word_counts())
+
+    def slice(self, start: int, stop: int) -> "TokenStore":
+        """Records ``start:stop`` as a store sharing this vocabulary."""
+        lo, hi = self.offsets[start], self.offsets[stop]
+        return TokenStore(self.vocab, self.ids[lo:hi], self.offsets[start:stop + 1] - lo)
+
+    # ── Matching ──
+
+    def term_mask(self, pattern: str) -> np.ndarray:
+        """Vocabulary entries fully matching the regex ``pattern``."""
+        return pd.Series(self.vocab, dtype=str).str.fullmatch(pattern).to_numpy(dtype=bool)
+
+    def _sequence(self, masks: list) -> np.ndarray:
+        """Records containing consecutive tokens accepted by ``masks[0]``, ``masks[1]``, ..."""
+        hits = np.flatnonzero(masks[0][self.ids])
+        for step, mask in enumerate(masks[1:], start=1):
+            hits = hits[hits + step < self.offsets[np.searchsorted(self.offsets, hits, side="right")]]
+            hits = hits[mask[self.ids[hits + step]]]
+        found = np.zeros(len(self), dtype=bool)
+        found[np.searchsorted(self.offsets, hits, side="right") - 1] = True
+        return found
+
+    def matches(self, phrases) -> np.ndarray:
+        """Records containing any of ``phrases`` (space-separated per-token regexes)."""
+        found = np.zeros(len(self), dtype=bool)
+        for phrase in phrases:
+            found |= self._sequence([self.term_mask(term) for term in phrase.split()])
+        return found
+
+    def pattern_codes(self, patterns: dict) -> np.ndarray:
+        """Bitmask per record: bit ``i`` is set when the ``i``-th pattern matches."""
+        codes = np.zeros(len(self), dtype=np.int64)
+        for bit, phrases in enumerate(patterns.values()):
+            codes |= self.matches(phrases).astype(np.int64) << bit
+        return codes
+
+    def search(self, query: str) -> np.ndarray:
+        """Records containing the query's tokens in order, each as a word prefix."""
+        terms = tokenize([query])[0].to_pylist()
+        if not terms:
+            return np.zeros(len(self), dtype=bool)
+        vocab = pd.Series(self.vocab, dtype=str)
+        return self._sequence([vocab.str.startswith(term).to_numpy(dtype=bool) for term in terms])
+
+
+class AppendedTokenStore:
+    """A corpus's token store followed by appended records, each segment with its own vocabulary.
+
+    Answers the queries the dashboard makes of a ``TokenStore`` over the
+    combined record numbering. Appending re-encodes only the appended
+    segment, so its cost does not depend on the size of the corpus.
+    """
+
+    def __init__(self, base: TokenStore, appended: TokenStore):
+        self.base = base
+        self.appended = appended
+
+    def append(self, store: TokenStore) -> "AppendedTokenStore":
+        return AppendedTokenStore(self.base, TokenStore.concat([self.appended, store]))
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.appended)
+
+    def take(self, records: np.ndarray) -> TokenStore:
+        """Records at ``records`` (in that order) as one store over their segments' joint vocabulary."""
+        records = np.asarray(records, dtype=np.int64)
+        appended = records >= len(self.base)
+        store = TokenStore.concat([self.base.take(records[~appended]),
+                                   self.appended.take(records[appended] - len(self.base))])
+        # concat lists base records first; restore the requested order
+        order = np.concatenate([np.flatnonzero(~appended), np.flatnonzero(appended)])
+        return store.take(np.argsort(order, kind="stable"))
+
+    def pattern_codes(self, patterns: dict) -> np.ndarray:
+        return np.concatenate([self.base.pattern_codes(patterns), self.appended.pattern_codes(patterns)])
+
+    def search(self, query: str) -> np.ndarray:
+        return np.concatenate([self.base.search(query), self.appended.search(query)])
@@ -0,0 +1,193 @@
+"""
+Topic model over the shared token store: sparse TF-IDF and mini-batch NMF.
+
+Unlike the hand-written frames in ``analysis.patterns``, topics are learned
+from the corpus. The vocabulary is the ``MAX_TERMS`` most widespread token-store terms
+(stop words, numbers and very short or rare terms removed). Each record is
+a sparse, L2-normalized TF-IDF row over that vocabulary, and scikit-learn's
+``MiniBatchNMF`` factors the rows into ``n_topics`` topics.
+
+Memory stays fixed however many records there are. Document frequencies,
+fitting and transforming all walk the token store ``batch_rows`` records at
+a time, so only one sparse batch and the (topics x terms) model are ever
+held. ``partial_fit`` continues training on new records with the saved
+vocabulary and IDF weights, so an update does not retrain from scratch.
+
+Per record the pipeline keeps the full topic-weight row (``*_topics.npz``),
+plus ``topic_id`` (the strongest topic, -1 when no vocabulary term occurs)
+and ``topic_weight`` (that topic's share of the row). Monthly topic counts
+for the dashboard come from a ``TimeIndex`` keyed on ``topic_id`` as well as
+the usual partitions.
+"""
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.tokens import TokenStore
+
+N_TOPICS = 10
+MAX_TERMS = 20_000
+MIN_DF = 3            # documents a term must occur in
+MIN_TERM_LENGTH = 3
+BATCH_ROWS = 4096
+PASSES = 5            # epochs over the corpus on a full fit
+TOP_TERMS = 8
+
+
+def model_path(data_path: Path) -> Path:
+    """Where the fitted topic model (for incremental updates) lives."""
+    return data_path.with_name(f"{data_path.stem}_topic_model.pkl")
+
+
+def weights_path(data_path: Path) -> Path:
+    """Where per-record topic weights and topic labels live."""
+    return data_path.with_name(f"{data_path.stem}_topics.npz")
+
+
+def index_path(data_path: Path) -> Path:
+    """Where the topic x partition time index lives."""
+    return data_path.with_name(f"{data_path.stem}_topic_index.npz")
+
+
+def batches(store: TokenStore, batch_rows: int):
+    """Consecutive ``batch_rows``-record slices of ``store``."""
+    for start in range(0, len(store), batch_rows):
+        yield store.slice(start, min(start + batch_rows, len(store)))
+
+
+def document_frequencies(store: TokenStore, batch_rows: int = BATCH_ROWS) -> np.ndarray:
+    """Number of records containing each vocabulary entry."""
+    counts = np.zeros(len(store.vocab), dtype=np.int64)
+    for batch in batches(store, batch_rows):
+        pairs = np.unique(batch.doc_index().astype(np.int64) * len(store.vocab) + batch.ids)
+        counts += np.bincount(pairs % len(store.vocab), minlength=len(store.vocab))
+    return counts
+
+
+def candidate_terms(vocab: np.ndarray) -> np.ndarray:
+    """Vocabulary entries eligible as topic terms: no stop words, digits or apostrophes."""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+    terms = pd.Series(vocab, dtype=str)
+    return (
+        (terms.str.len() >= MIN_TERM_LENGTH)
+        & terms.str.fullmatch(r"[a-z]+")
+        & ~terms.isin(ENGLISH_STOP_WORDS)
+    ).to_numpy(dtype=bool)
+
+
+def select_terms(store: TokenStore, max_terms: int = MAX_TERMS, min_df: int = MIN_DF,
+                 batch_rows: int = BATCH_ROWS) -> tuple:
+    """The TF-IDF vocabulary of ``store`` (sorted terms) and each term's smoothed IDF."""
+    df_counts = document_frequencies(store, batch_rows)
+    eligible = np.flatnonzero(candidate_terms(store.vocab) & (df_counts >= min_df))
+    # Most widespread terms first; ties by vocabulary order for reproducibility
+    keep = np.sort(eligible[np.argsort(-df_counts[eligible], kind="stable")[:max_terms]])
+    return store.vocab[keep], np.log((1 + len(store)) / (1 + df_counts[keep])) + 1
+
+
+def tfidf_matrix(store: TokenStore, terms: np.ndarray, idf: np.ndarray):
+    """Sparse (records x terms) TF-IDF matrix of ``store``, rows L2-normalized.
+
+    ``store`` may have any vocabulary; its tokens are mapped onto ``terms``
+    by string, and tokens outside them are dropped.
+    """
+    from scipy import sparse
+
+    column = np.searchsorted(terms, store.vocab)
+    column[column == len(terms)] = 0
+    known = terms[column] == store.vocab if len(terms) else np.zeros(len(store.vocab), dtype=bool)
+    columns = column[store.ids]
+    kept = known[store.ids]
+    matrix = sparse.csr_matrix(
+        (np.ones(int(kept.sum())), (store.doc_index()[kept], columns[kept])),
+        shape=(len(store), len(terms)),
+    )
+    matrix.sum_duplicates()
+    matrix = matrix.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+class TopicModel:
+    """Fixed TF-IDF vocabulary plus a mini-batch NMF factorization."""
+
+    def __init__(self, terms: np.ndarray, idf: np.ndarray, nmf):
+        self.terms = terms
+        self.idf = idf
+        self.nmf = nmf
+
+    @classmethod
+    def fit(cls, store: TokenStore, n_topics: int = N_TOPICS, batch_rows: int = BATCH_ROWS,
+            passes: int = PASSES, max_terms: int = MAX_TERMS, min_df: int = MIN_DF,
+            seed: int = 42) -> "TopicModel":
+        """Choose the vocabulary, then train over ``passes`` epochs of mini-batches."""
+        from sklearn.decomposition import MiniBatchNMF
+
+        terms, idf = select_terms(store, max_terms, min_df, batch_rows)
+        if len(terms) < n_topics:
+            raise ValueError(f"Only {len(terms)} terms occur in at least {min_df} records; "
+                             f"too few for {n_topics} topics")
+        nmf = MiniBatchNMF(n_components=n_topics, batch_size=batch_rows, init="nndsvda",
+                           beta_loss="frobenius", random_state=seed)
+        model = cls(terms, idf, nmf)
+        for _ in range(passes):
+            model.partial_fit(store, batch_rows)
+        return model
+
+    def tfidf(self, store: TokenStore):
+        """TF-IDF rows of ``store`` over this model's vocabulary."""
+        return tfidf_matrix(store, self.terms, self.idf)
+
+    def partial_fit(self, store: TokenStore, batch_rows: int = BATCH_ROWS) -> "TopicModel":
+        """One pass of mini-batch updates over ``store`` (new records, in an update)."""
+        for batch in batches(store, batch_rows):
+            matrix = self.tfidf(batch)
+            if matrix.nnz:
+                self.nmf.partial_fit(matrix)
+        return self
+
+    def transform(self, store: TokenStore, batch_rows: int = BATCH_ROWS) -> np.ndarray:
+        """(records x topics) weights, computed one mini-batch at a time."""
+        weights = np.zeros((len(store), self.nmf.n_components), dtype=np.float32)
+        start = 0
+        for batch in batches(store, batch_rows):
+            matrix = self.tfidf(batch)
+            if matrix.nnz:
+                weights[start:start + len(batch)] = self.nmf.transform(matrix)
+            start += len(batch)
+        return weights
+
+    def top_terms(self, n: int = TOP_TERMS) -> list:
+        """The ``n`` highest-loading terms of each topic."""
+        return [[str(term) for term in self.terms[np.argsort(-row)[:n]]] for row in self.nmf.components_]
+
+    def save(self, path: Path):
+        with open(path, "wb") as fh:
+            pickle.dump(self, fh)
+
+    @staticmethod
+    def load(path: Path) -> "TopicModel":
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+
+
+def assign_topics(weights: np.ndarray) -> tuple:
+    """Strongest topic per record (-1 for an all-zero row) and its share of the row's weight."""
+    totals = weights.sum(axis=1)
+    topic_id = np.where(totals > 0, weights.argmax(axis=1), -1)
+    share = np.divide(weights.max(axis=1, initial=0), totals, out=np.zeros(len(weights)), where=totals > 0)
+    return topic_id, share
+
+
+def save_weights(path: Path, weights: np.ndarray, labels: list):
+    np.savez_compressed(path, weights=weights, labels=np.array(labels, dtype=str))
+
+
+def load_labels(path: Path) -> list:
+    """Top terms of each topic, as saved alongside the weights."""
+    with np.load(path) as npz:
+        return [[str(term) for term in row] for row in npz["labels"]]
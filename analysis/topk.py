@@ -0,0 +1,151 @@
+"""
+Precomputed top-k score index for featured quotes.
+
+For every partition (``PARTITION_COLUMNS`` x month) the index keeps the row
+positions and scores of the ``k`` highest-scoring records, sorted by score.
+The lists are stored back to back in CSR form: ``offsets[p]`` to
+``offsets[p + 1]`` index into ``positions`` and ``scores``.
+
+The top ``n`` (n <= k) records for a sidebar selection are the top ``n`` of
+the union of the selected partitions' lists, merged in O(partitions * k).
+Months only partly covered by the date range cannot use the lists, so the
+caller supplies an exact fallback for those few days. Only the final ``n``
+positions are then fetched from the corpus.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.query_backend import FilterState
+from analysis.time_index import PARTITION_COLUMNS, partition_selection
+
+TOP_K = 250
+KEY_COLUMNS = [*PARTITION_COLUMNS, "month"]
+
+
+def index_path(data_path: Path) -> Path:
+    """Where the top-k index for a cleaned data file lives."""
+    return data_path.with_name(f"{data_path.stem}_topk.npz")
+
+
+def score_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Row position, score, month (``YYYY-MM``) and partition columns per record."""
+    keys = df[["score", *PARTITION_COLUMNS]].astype({col: str for col in PARTITION_COLUMNS})
+    keys["month"] = pd.to_datetime(df["month"]).dt.strftime("%Y-%m")
+    keys["pos"] = np.arange(len(df))
+    return keys.reset_index(drop=True)
+
+
+def top_n(positions: np.ndarray, scores: np.ndarray, n: int) -> tuple:
+    """The ``n`` highest scores, ties broken by lower row position."""
+    order = np.lexsort((positions, -scores))[:n]
+    return positions[order], scores[order]
+
+
+class TopKIndex:
+    """Per-partition top-k row positions by score, in CSR layout."""
+
+    def __init__(self, keys: pd.DataFrame, offsets: np.ndarray, positions: np.ndarray,
+                 scores: np.ndarray, k: int):
+        self.keys = keys
+        self.offsets = offsets
+        self.positions = positions
+        self.scores = scores
+        self.k = int(k)
+        months = keys["month"].to_numpy(dtype="datetime64[M]")
+        self._month_start = months.astype("datetime64[D]")
+        self._month_end = (months + 1).astype("datetime64[D]") - 1
+
+    @classmethod
+    def build(cls, rows: pd.DataFrame, k: int = TOP_K) -> "TopKIndex":
+        """Build from a ``score_keys``-shaped frame."""
+        codes, uniques = pd.MultiIndex.from_frame(rows[KEY_COLUMNS].astype(str)).factorize(sort=True)
+        keys = uniques.to_frame(index=False, name=KEY_COLUMNS)
+        positions = rows["pos"].to_numpy(dtype=np.int64)
+        scores = rows["score"].to_numpy(dtype=np.float64)
+
+        # One sort by (partition, score desc, position); rank within partition
+        # is then the distance from the partition's first sorted row.
+        order = np.lexsort((positions, -scores, codes))
+        sorted_codes = codes[order]
+        first = np.searchsorted(sorted_codes, np.arange(len(keys)))
+        keep = np.arange(len(order)) - first[sorted_codes] < k
+
+        counts = np.bincount(sorted_codes[keep], minlength=len(keys))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(keys, offsets, positions[order][keep], scores[order][keep], k)
+
+    def extend(self, rows: pd.DataFrame) -> "TopKIndex":
+        """A new index with the ``score_keys``-shaped ``rows`` added.
+
+        Only records already kept can stay in their partition's top k, so the
+        kept lists and ``rows`` are all the new index needs.
+        """
+        kept = self.keys.loc[self.keys.index.repeat(np.diff(self.offsets))].reset_index(drop=True)
+        kept["pos"] = self.positions
+        kept["score"] = self.scores
+        return TopKIndex.build(pd.concat([kept, rows[kept.columns]], ignore_index=True), self.k)
+
+    def save(self, path: Path):
+        np.savez_compressed(
+            path,
+            k=np.array(self.k),
+            offsets=self.offsets,
+            positions=self.positions,
+            scores=self.scores,
+            **{f"key_{col}": self.keys[col].to_numpy(dtype=str) for col in KEY_COLUMNS},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "TopKIndex":
+        with np.load(path) as npz:
+            keys = pd.DataFrame({col: npz[f"key_{col}"] for col in KEY_COLUMNS})
+            return cls(keys, npz["offsets"], npz["positions"], npz["scores"], int(npz["k"]))
+
+    # ── Queries ──
+
+    def boundary_ranges(self, filters: FilterState) -> list:
+        """(start, end) date ranges in months the filter only partly covers."""
+        start, end = np.datetime64(filters.start, "D"), np.datetime64(filters.end, "D")
+        first_month, last_month = start.astype("datetime64[M]"), end.astype("datetime64[M]")
+        first_day = first_month.astype("datetime64[D]")
+        last_day = (last_month + 1).astype("datetime64[D]") - 1
+        if first_month == last_month:
+            return [] if (start, end) == (first_day, last_day) else [(start, end)]
+        ranges = []
+        if start != first_day:
+            ranges.append((start, (first_month + 1).astype("datetime64[D]") - 1))
+        if end != last_day:
+            ranges.append((last_month.astype("datetime64[D]"), end))
+        return ranges
+
+    def top(self, filters: FilterState, n: int, exact) -> np.ndarray:
+        """Row positions of the ``n`` highest-scoring records matching ``filters``.
+
+        ``exact(filters, n)`` must return a frame of ``pos`` and ``score`` for
+        the true top ``n`` of a (narrow) date range; it answers boundary months.
+        """
+        if n > self.k:
+            raise ValueError(f"Top-k index holds {self.k} records per partition; asked for {n}")
+        mask = (
+            (self._month_start >= np.datetime64(filters.start, "D"))
+            & (self._month_end <= np.datetime64(filters.end, "D"))
+        )
+        for col, allowed in partition_selection(filters).items():
+            if allowed is not None:
+                mask &= self.keys[col].isin(allowed).to_numpy()
+
+        # Gather each selected partition's first min(n, len) entries.
+        selected = np.flatnonzero(mask)
+        lo = self.offsets[selected]
+        take = np.minimum(self.offsets[selected + 1] - lo, n)
+        idx = np.repeat(lo - np.concatenate([[0], np.cumsum(take)[:-1]]), take) + np.arange(take.sum())
+        positions, scores = [self.positions[idx]], [self.scores[idx]]
+
+        for start, end in self.boundary_ranges(filters):
+            sub = exact(filters._replace(start=start.item(), end=end.item()), n)
+            positions.append(sub["pos"].to_numpy(dtype=np.int64))
+            scores.append(sub["score"].to_numpy(dtype=np.float64))
+
+        return top_n(np.concatenate(positions), np.concatenate(scores), n)[0]
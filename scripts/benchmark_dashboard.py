@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Headless Performance Benchmark for the Streamlit Dashboard
+
+Drives streamlit_dashboard.py through Streamlit's AppTest against synthetic
+cleaned corpora of increasing size, scripting the interactions a reader
+makes: opening each section tab, narrowing the date range, picking
+subreddits, toggling content type and searching records.
+
+For each corpus size it records cold-start time, per-interaction rerun
+latency and peak resident memory, then opens further sessions on the same
+server process to show how memory grows per concurrent viewer. Each size
+runs in a fresh process, so the peak and the cold start are not polluted by
+earlier runs. The pandas backend serves the corpus from its memory-mapped
+Arrow snapshot, as a deployed dashboard does. Results are saved
+as JSON. Passing --baseline compares latencies against an earlier result
+file and exits non-zero on regressions, so it can gate a deploy.
+
+Usage:
+    python scripts/benchmark_dashboard.py
+    python scripts/benchmark_dashboard.py --sizes 1000 50000 --backend duckdb
+    python scripts/benchmark_dashboard.py --baseline benchmarks/baseline.json
+
+Input:  data/cleaned/reddit_skills_cleaned.csv (resampled into synthetic corpora)
+Output: benchmarks/results/dashboard-<timestamp>.json
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ── Paths ────────────────────────────────────────────────────────────────────
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = PROJECT_ROOT / "streamlit_dashboard.py"
+CLEAN_PATH = PROJECT_ROOT / "data" / "cleaned" / "reddit_skills_cleaned.csv"
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from analysis.query_backend import snapshot_path, write_snapshot  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_SESSIONS = 4
+STUDY_START = pd.Timestamp("2022-01-01")
+STUDY_END = pd.Timestamp("2025-06-30")
+
+
+def synthetic_corpus(base: pd.DataFrame, n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Resample the cleaned corpus to ``n_rows`` records spread across the study period.
+
+    Text, scores and sentiment are drawn from real cleaned rows; timestamps are
+    redrawn uniformly and ids made unique so the result behaves like a larger
+    collection rather than repeated copies.
+    """
+    rng = np.random.default_rng(seed)
+    df = base.iloc[rng.integers(0, len(base), n_rows)].reset_index(drop=True)
+    span = int((STUDY_END - STUDY_START).total_seconds())
+    df["created_utc"] = STUDY_START + pd.to_timedelta(np.sort(rng.integers(0, span, n_rows)), unit="s")
+    df["date"] = df["created_utc"].dt.date
+    df["month"] = df["created_utc"].dt.strftime("%Y-%m")
+    df["id"] = "syn" + pd.Series(np.arange(n_rows)).astype(str)
+    return df
+
+
+# Tab whose aggregates the sidebar filter steps are timed against
+FILTER_SECTION = "Sentiment"
+
+
+def widget(elements, label):
+    """Return the element in ``elements`` with ``label``, failing loudly if it did not render."""
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"widget {label!r} not rendered")
+
+
+def interactions(at, bounds):
+    """Yield (name, action) pairs; each action mutates the AppTest before a rerun.
+
+    A tab selected through session state only holds for the next rerun, after
+    which AppTest falls back to the first tab, so every action reselects the
+    section it is meant to time before touching a widget.
+    """
+    sections = ["Sentiment", "Framing", "Keywords", "Threads", "Voices", "Volume & Policy Events"]
+    min_date, max_date = bounds
+    mid = min_date + (max_date - min_date) / 2
+
+    def on(section, action=lambda: None):
+        def run():
+            at.session_state["section"] = section
+            action()
+        return run
+
+    sidebar = at.sidebar
+    yield "warm_rerun", lambda: None
+    for section in sections:
+        yield f"tab:{section}", on(section)
+    yield f"date_range ({FILTER_SECTION})", on(
+        FILTER_SECTION, lambda: widget(sidebar.date_input, "Date range").set_value((min_date, mid)))
+    yield f"subreddits ({FILTER_SECTION})", on(
+        FILTER_SECTION, lambda: widget(sidebar.multiselect, "Subreddits").set_value(["FedEmployees", "jobs"]))
+    yield f"content_type ({FILTER_SECTION})", on(
+        FILTER_SECTION, lambda: widget(sidebar.radio, "Content type").set_value("Comments only"))
+    yield f"exclude_bursts ({FILTER_SECTION})", on(
+        FILTER_SECTION, lambda: widget(sidebar.checkbox, "Exclude posting bursts").check())
+    yield "tab:Voices (filtered)", on("Voices")
+    yield "search:RIF", on("Voices", lambda: widget(at.text_input, "Search text content").input("RIF"))
+    yield "search:degree", on("Voices", lambda: widget(at.text_input, "Search text content").input("degree"))
+
+    def reset():
+        widget(sidebar.date_input, "Date range").set_value((min_date, max_date))
+        subreddits = widget(sidebar.multiselect, "Subreddits")
+        subreddits.set_value(subreddits.options)
+        widget(sidebar.radio, "Content type").set_value("All")
+        widget(sidebar.checkbox, "Exclude posting bursts").uncheck()
+    yield f"reset_filters ({FILTER_SECTION})", on(FILTER_SECTION, reset)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_size(n_rows: int, backend: str, timeout: float, sessions: int) -> dict:
+    """Benchmark one corpus size. Runs inside a fresh worker process."""
+    from streamlit.testing.v1 import AppTest
+
+    base = pd.read_csv(CLEAN_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = synthetic_corpus(base, n_rows)
+        suffix = ".parquet" if backend == "duckdb" else ".csv"
+        data_path = Path(tmp) / f"corpus_{n_rows}{suffix}"
+        if suffix == ".parquet":
+            corpus.to_parquet(data_path, index=False)
+        else:
+            corpus.to_csv(data_path, index=False)
+            write_snapshot(corpus, snapshot_path(data_path))
+        os.environ["DASHBOARD_DATA_PATH"] = str(data_path)
+        os.environ["DASHBOARD_BACKEND"] = backend
+        bounds = (corpus["created_utc"].min().date(), corpus["created_utc"].max().date())
+        del corpus
+
+        at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        t0 = time.perf_counter()
+        at.run()
+        cold_start = time.perf_counter() - t0
+        errors = [str(e.value) for e in at.exception]
+
+        latencies = {}
+        for name, action in interactions(at, bounds):
+            # A failing step is recorded and skipped so the rest of the run still reports
+            try:
+                action()
+                t0 = time.perf_counter()
+                at.run()
+            except Exception as e:
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+                continue
+            latencies[name] = round(time.perf_counter() - t0, 4)
+            errors += [f"{name}: {e.value}" for e in at.exception]
+
+        # Further viewers on the same process share its cached resources;
+        # each session is kept open so its state stays resident
+        session_rss = [peak_rss_mb()]
+        viewers = []
+        for _ in range(sessions):
+            viewer = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+            viewer.run()
+            viewers.append(viewer)
+            session_rss.append(peak_rss_mb())
+            errors += [f"session {len(viewers)}: {e.value}" for e in viewer.exception]
+
+    return {
+        "rows": n_rows,
+        "cold_start_seconds": round(cold_start, 4),
+        "rerun_seconds": latencies,
+        "peak_rss_mb": peak_rss_mb(),
+        # Peak RSS with 1, 2, ... sessions open
+        "session_peak_rss_mb": session_rss,
+        "errors": errors,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions where latency exceeds baseline x tolerance."""
+    regressions = []
+    previous = {r["rows"]: r for r in baseline["runs"]}
+    for run in results["runs"]:
+        before = previous.get(run["rows"])
+        if before is None:
+            continue
+        pairs = [("cold_start", run["cold_start_seconds"], before["cold_start_seconds"])]
+        pairs += [
+            (name, secs, before["rerun_seconds"].get(name))
+            for name, secs in run["rerun_seconds"].items()
+        ]
+        for name, now, then in pairs:
+            if then and now > then * tolerance:
+                regressions.append(f"{run['rows']:>9,} rows  {name:<28} {then:.3f}s -> {now:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="corpus sizes (rows) to benchmark")
+    parser.add_argument("--backend", choices=["pandas", "duckdb"], default="pandas")
+    parser.add_argument("--timeout", type=float, default=300, help="per-rerun timeout in seconds")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS,
+                        help="extra concurrent sessions to open after the interactions")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/dashboard-<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="flag latencies slower than baseline x tolerance")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Dashboard Performance Benchmark")
+    print("=" * 60)
+
+    runs = []
+    ctx = multiprocessing.get_context("spawn")
+    for n_rows in args.sizes:
+        with ctx.Pool(1) as pool:
+            run = pool.apply(run_size, (n_rows, args.backend, args.timeout, args.sessions))
+        runs.append(run)
+        slowest = max(run["rerun_seconds"].items(), key=lambda kv: kv[1], default=("-", 0.0))
+        print(f"{n_rows:>9,} rows  cold start {run['cold_start_seconds']:.2f}s  "
+              f"slowest rerun {slowest[0]} {slowest[1]:.2f}s  peak {run['peak_rss_mb']:,.0f} MB")
+        growth = run["session_peak_rss_mb"][-1] - run["session_peak_rss_mb"][0]
+        print(f"{'':>15}+{args.sessions} sessions: +{growth:,.0f} MB peak")
+        for err in run["errors"]:
+            print(f"    error: {err}")
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "backend": args.backend,
+        "python": sys.version.split()[0],
+        "runs": runs,
+    }
+    output = args.output or RESULTS_DIR / f"dashboard-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nSaved results to {output}")
+
+    failed = any(run["errors"] for run in runs)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("backend") != args.backend:
+            print(f"\nWarning: baseline was recorded with the {baseline.get('backend')} backend")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions vs {args.baseline.name} (tolerance x{args.tolerance}):")
+            print("\n".join(regressions))
+            failed = True
+        else:
+            print(f"\nNo regressions vs {args.baseline.name}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Throughput Benchmark for the Sentiment Backends
+
+Scores the cleaned corpus's body texts, resampled to a fixed number of texts,
+with each sentiment backend at each batch size. For every run it records
+texts per second, peak Python heap allocation (tracemalloc, in a separate
+untimed pass) and the label distribution under the backend's thresholds, so
+accuracy/throughput trade-offs between backends can be compared on the same
+texts. Results are saved as JSON.
+
+Usage:
+    python scripts/benchmark_sentiment.py
+    python scripts/benchmark_sentiment.py --backends textblob lexicon --batch-sizes 64 1024
+    python scripts/benchmark_sentiment.py --backends onnx --onnx-model models/sentiment.onnx
+
+Input:  data/cleaned/reddit_skills_cleaned.csv (body texts, resampled)
+Output: benchmarks/results/sentiment-<timestamp>.json
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ── Paths ────────────────────────────────────────────────────────────────────
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CLEAN_PATH = PROJECT_ROOT / "data" / "cleaned" / "reddit_skills_cleaned.csv"
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from analysis import sentiment  # noqa: E402
+
+DEFAULT_BACKENDS = ["textblob", "lexicon"]
+DEFAULT_BATCH_SIZES = [32, 256, 4096]
+
+
+def sample_texts(n_texts: int, seed: int = 42) -> list:
+    """``n_texts`` body texts drawn with replacement from the cleaned corpus."""
+    bodies = pd.read_csv(CLEAN_PATH, usecols=["body"])["body"].astype(str).to_numpy()
+    rng = np.random.default_rng(seed)
+    return bodies[rng.integers(0, len(bodies), n_texts)].tolist()
+
+
+def run_backend(backend: sentiment.SentimentBackend, texts: list) -> dict:
+    """Score ``texts`` twice: once timed, once under tracemalloc for peak heap allocation.
+
+    Tracing slows every allocation, so it is kept out of the timed pass.
+    """
+    t0 = time.perf_counter()
+    scores = backend.score(texts)
+    seconds = time.perf_counter() - t0
+
+    tracemalloc.start()
+    backend.score(texts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    labels = pd.Series(backend.label(scores)).value_counts()
+    return {
+        "backend": backend.name,
+        "batch_size": backend.batch_size,
+        "thresholds": list(backend.thresholds),
+        "texts": len(texts),
+        "seconds": round(seconds, 4),
+        "texts_per_second": round(len(texts) / seconds, 1) if seconds else None,
+        "peak_alloc_mb": round(peak / 2**20, 2),
+        "labels": {str(label): int(labels.get(label, 0)) for label in sentiment.LABELS},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--backends", nargs="+", choices=sorted(sentiment.BACKENDS), default=DEFAULT_BACKENDS)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--texts", type=int, default=20_000, help="number of texts to score per run")
+    parser.add_argument("--lexicon", type=Path, help="VADER-format lexicon file for the lexicon backend")
+    parser.add_argument("--onnx-model", type=Path, help="ONNX sentiment model for the onnx backend")
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/sentiment-<timestamp>.json)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Sentiment Backend Benchmark")
+    print("=" * 60)
+
+    texts = sample_texts(args.texts)
+    extra = {"lexicon": {"lexicon_path": args.lexicon}, "onnx": {"model_path": args.onnx_model}}
+    runs = []
+    for name in args.backends:
+        for batch_size in args.batch_sizes:
+            backend = sentiment.get_backend(name, batch_size=batch_size, **extra.get(name, {}))
+            # Warm up (lazy lexicon loads, ONNX session start) outside the timed run
+            backend.score(texts[:batch_size])
+            run = run_backend(backend, texts)
+            runs.append(run)
+            print(f"{name:<9} batch {batch_size:>5}  {run['texts_per_second']:>10,.0f} texts/s  "
+                  f"peak {run['peak_alloc_mb']:>7,.1f} MB  {run['labels']}")
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "runs": runs,
+    }
+    output = args.output or RESULTS_DIR / f"sentiment-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nSaved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,84 @@ an analysis-ready CSV with derived columns.
 
 Usage:
     python scripts/clean_data.py
+    python scripts/clean_data.py --sentiment-backend lexicon
+    python scripts/clean_data.py --sentiment-backend onnx --onnx-model models/sentiment.onnx
+    python scripts/clean_data.py --workers 0 --shard-output data/cleaned/shards
+    python scripts/clean_data.py --topics 12
+    python scripts/clean_data.py --topics-update
+    python scripts/clean_data.py --changepoints-update
+    python scripts/clean_data.py --dry-run
+    python scripts/clean_data.py --force
 
 Input:  data/raw/reddit_skills_raw.csv
 Output: data/cleaned/reddit_skills_cleaned.csv
+        data/cleaned/reddit_skills_cleaned.parquet (columnar copy for DuckDB)
+        data/cleaned/reddit_skills_cleaned.arrow (memory-mappable snapshot for the dashboard)
+        data/cleaned/reddit_skills_cleaned_time_index.npz (daily prefix sums)
+        data/cleaned/reddit_skills_cleaned_topk.npz (top-k scores per partition x month)
+        data/cleaned/reddit_skills_cleaned_threads.csv (one row per thread)
+        data/cleaned/reddit_skills_cleaned_reply_tree.npz (preorder reply-tree index)
+        data/cleaned/reddit_skills_cleaned_tokens.npz (shared token store)
+        data/cleaned/reddit_skills_cleaned_patterns.npz (frame and keyword bitmasks per record)
+        data/cleaned/reddit_skills_cleaned_topic_model.pkl (NMF topic model, for --topics-update)
+        data/cleaned/reddit_skills_cleaned_topics.npz (per-record topic weights and topic terms)
+        data/cleaned/reddit_skills_cleaned_topic_index.npz (daily prefix sums per topic x partition)
+        data/cleaned/reddit_skills_cleaned_similarity.npz (SimHash signatures for "More like this")
+        data/cleaned/reddit_skills_cleaned_changepoints.pkl (CUSUM detector state and change points)
+        data/cleaned/reddit_skills_cleaned_terms.npz (open-vocabulary document-term matrix and term counts)
+        <shard-output>/reddit_skills_cleaned_<YYYY-MM>.parquet (optional, one file per month)
+
+Stages are memoized (see analysis/pipeline.py): each is fingerprinted by
+its code, options, input files and upstream stages, and results are cached
+in data/cleaned/.stage_cache/. A run only recomputes stages whose
+fingerprint changed, plus those downstream; --dry-run lists them and why.
+
+With --workers, deduplication and the other whole-corpus checks run first,
+then the per-record stages (date filter, date parsing, tokenizing, sentiment)
+run on one month-shard per task in a process pool. Shards are merged back
+in the original row order, so the output is identical to a serial run.
+Derived columns, thread keys, burst flags and topics run after the merge.
 """
+import argparse
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from textblob import TextBlob
 
 # ── Paths ────────────────────────────────────────────────────────────────────
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 RAW_PATH = PROJECT_ROOT / "data" / "raw" / "reddit_skills_raw.csv"
 CLEAN_PATH = PROJECT_ROOT / "data" / "cleaned" / "reddit_skills_cleaned.csv"
+CLEAN_PARQUET_PATH = CLEAN_PATH.with_suffix(".parquet")
+
+sys.path.insert(0, str(PROJECT_ROOT))
+from analysis import (  # noqa: E402
+    authors, changepoints, patterns, reply_tree, sentiment, similarity, terms, threads, time_index, tokens, topics,
+    topk,
+)
+from analysis.patterns import KEYWORDS  # noqa: E402
+from analysis.pipeline import Pipeline, Stage, describe  # noqa: E402
+from analysis.query_backend import decode_patterns, snapshot_path, write_snapshot  # noqa: E402
+
+SNAPSHOT_PATH = snapshot_path(CLEAN_PATH)
+TIME_INDEX_PATH = time_index.index_path(CLEAN_PATH)
+TOPK_PATH = topk.index_path(CLEAN_PATH)
+THREADS_PATH = threads.rollup_path(CLEAN_PATH)
+REPLY_TREE_PATH = reply_tree.tree_path(CLEAN_PATH)
+TOKENS_PATH = tokens.store_path(CLEAN_PATH)
+PATTERNS_PATH = patterns.codes_path(CLEAN_PATH)
+TOPIC_MODEL_PATH = topics.model_path(CLEAN_PATH)
+TOPICS_PATH = topics.weights_path(CLEAN_PATH)
+TOPIC_INDEX_PATH = topics.index_path(CLEAN_PATH)
+SIMILARITY_PATH = similarity.similarity_path(CLEAN_PATH)
+CHANGEPOINTS_PATH = changepoints.monitor_path(CLEAN_PATH)
+TERMS_PATH = terms.index_path(CLEAN_PATH)
+STAGE_CACHE_DIR = CLEAN_PATH.parent / ".stage_cache"
 
 
 def load_raw_data(path: Path) -> pd.DataFrame:
@@ -60,6 +125,20 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def handle_reply_structure(df: pd.DataFrame) -> pd.DataFrame:
+    """Ensure parent_id and depth are present.
+
+    Older collection runs (and the Pushshift fetcher's comment-free output)
+    lack them: posts get no parent and depth 0, and comments without a parent
+    are treated as top-level replies to their thread's post (depth 1).
+    """
+    had_parents = "parent_id" in df.columns
+    df = reply_tree.default_parents(df)
+    if not had_parents:
+        print("No parent_id in raw data; treating comments as top-level replies")
+    return df
+
+
 def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
     """Extract date and month columns from created_utc for aggregation."""
     df["date"] = df["created_utc"].dt.date
@@ -67,30 +146,42 @@ def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def compute_sentiment(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute sentiment polarity using TextBlob.
+def tokenize(df: pd.DataFrame) -> tokens.TokenStore:
+    """Normalize and tokenize every body once into the shared token store.
 
-    TextBlob returns a polarity float in [-1.0, 1.0]:
+    Word counts, the lexicon sentiment backend and the dashboard's frame,
+    keyword and search matching all read this store instead of re-parsing
+    the text.
+    """
+    store = tokens.TokenStore.from_texts(df["body"])
+    print(f"Tokenized {len(store.ids):,} tokens ({len(store.vocab):,} distinct)")
+    return store
+
+
+def compute_sentiment(df: pd.DataFrame, backend: sentiment.SentimentBackend,
+                      store: tokens.TokenStore) -> pd.DataFrame:
+    """Compute sentiment polarity with the selected backend (TextBlob by default).
+
+    Every backend returns a polarity float in [-1.0, 1.0]:
       - Positive values = positive sentiment
       - Negative values = negative sentiment
       - Near zero = neutral
 
-    We also create a categorical label for filtering.
+    We also create a categorical label for filtering, using the backend's
+    own neutral band (TextBlob: +-0.1). Token-based backends read the shared
+    token store; the others need the raw text.
     """
-    df["sentiment_score"] = df["body"].apply(
-        lambda text: TextBlob(str(text)).sentiment.polarity
-    )
-
-    # Categorical label with +-0.1 neutral band
-    df["sentiment_label"] = df["sentiment_score"].apply(
-        lambda s: "positive" if s > 0.1 else ("negative" if s < -0.1 else "neutral")
-    )
+    df["sentiment_score"] = backend.score_tokens(store) if backend.uses_tokens else backend.score(df["body"])
+    df["sentiment_label"] = backend.label(df["sentiment_score"])
+    lower, upper = backend.thresholds
+    print(f"Sentiment backend: {backend.name} (batch size {backend.batch_size}, "
+          f"neutral band {lower:+g} to {upper:+g})")
     print(f"Sentiment distribution:\n{df['sentiment_label'].value_counts().to_string()}")
     return df
 
 
-def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Add word_count and engagement_tier columns.
+def add_derived_columns(df: pd.DataFrame, store: tokens.TokenStore) -> pd.DataFrame:
+    """Add word_count (tokens per body, from the token store) and engagement_tier columns.
 
     engagement_tier bins:
       - low: score < 10
@@ -98,7 +189,7 @@ def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
       - high: 25-99
       - viral: 100+
     """
-    df["word_count"] = df["body"].apply(lambda text: len(str(text).split()))
+    df["word_count"] = store.word_counts()
 
     df["engagement_tier"] = pd.cut(
         df["score"],
@@ -109,6 +200,92 @@ def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def add_thread_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Add thread_key, a dense integer per thread_id.
+
+    Thread-level views join the rollup table on this key rather than
+    regrouping string thread IDs.
+    """
+    df["thread_key"] = threads.thread_keys(df["thread_id"])
+    print(f"Assigned keys to {df['thread_key'].nunique()} threads")
+    return df
+
+
+def add_burst_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """Add burst_flag (0/1): part of an author's posting burst in one subreddit.
+
+    A burst is at least authors.BURST_MIN_COUNT records by the same author in
+    the same subreddit within authors.BURST_WINDOW, and at least
+    authors.BURST_MULTIPLIER times that author's rate there over the
+    authors.BURST_BASELINE before the window. Flagged
+    activity may be brigading; the dashboard can exclude it.
+    """
+    flags = authors.detect_bursts(df["author"], df["subreddit"], df["created_utc"])
+    df["burst_flag"] = flags.astype(np.int8)
+    print(f"Flagged {int(flags.sum())} records in author x subreddit posting bursts")
+    return df
+
+
+def previously_cleaned(df: pd.DataFrame) -> np.ndarray:
+    """Rows already present in the last cleaned output, matched on (thread_id, id)."""
+    if not CLEAN_PATH.exists():
+        return np.zeros(len(df), dtype=bool)
+    previous = pd.read_csv(CLEAN_PATH, usecols=["thread_id", "id"], dtype=str)
+    keys = pd.MultiIndex.from_frame(df[["thread_id", "id"]].astype(str))
+    return keys.isin(pd.MultiIndex.from_frame(previous))
+
+
+def add_topics(df: pd.DataFrame, store: tokens.TokenStore, n_topics: int, update: bool) -> tuple:
+    """Add topic_id and topic_weight from a mini-batch NMF model over sparse TF-IDF.
+
+    A full fit learns the vocabulary and trains over several passes. With
+    ``update`` the saved model instead continues training (one pass, same
+    vocabulary and IDF) on records that were not in the previous cleaned
+    output. Either way every record is then scored. topic_id is the
+    strongest topic (-1 when a body has no vocabulary term), topic_weight
+    its share of the record's topic weights. Returns the frame, the model
+    and the per-record weight matrix.
+    """
+    if update and TOPIC_MODEL_PATH.exists():
+        model = topics.TopicModel.load(TOPIC_MODEL_PATH)
+        new = np.flatnonzero(~previously_cleaned(df))
+        model.partial_fit(store.take(new))
+        print(f"Updated topic model on {len(new)} new records "
+              f"({model.nmf.n_components} topics, {len(model.terms):,} terms)")
+    else:
+        if update:
+            print(f"No topic model at {TOPIC_MODEL_PATH.name}; fitting from scratch")
+        model = topics.TopicModel.fit(store, n_topics)
+        print(f"Fitted {n_topics} topics over {len(model.terms):,} terms")
+
+    weights = model.transform(store)
+    df["topic_id"], df["topic_weight"] = topics.assign_topics(weights)
+    for topic, top in enumerate(model.top_terms(5)):
+        print(f"  Topic {topic}: {', '.join(top)} ({int((df['topic_id'] == topic).sum())} records)")
+    return df, model, weights
+
+
+def detect_change_points(df: pd.DataFrame, store: tokens.TokenStore, update: bool) -> changepoints.ChangePointMonitor:
+    """Run online CUSUM detectors over daily volume and sentiment per subreddit and keyword.
+
+    A full run feeds every day to fresh detectors. With ``update`` the saved
+    monitor keeps its detector state and only sees days after the last one
+    it processed, at O(1) cost per new day and series.
+    """
+    if update and CHANGEPOINTS_PATH.exists():
+        monitor = changepoints.ChangePointMonitor.load(CHANGEPOINTS_PATH)
+    else:
+        if update:
+            print(f"No change-point monitor at {CHANGEPOINTS_PATH.name}; starting from scratch")
+        monitor = changepoints.ChangePointMonitor()
+    rows = df[["date", "subreddit"]].assign(n=1, sentiment_sum=df["sentiment_score"],
+                                            code=store.pattern_codes(KEYWORDS))
+    found = monitor.update(changepoints.daily_series(decode_patterns(rows, list(KEYWORDS)), list(KEYWORDS)))
+    print(f"Detected {len(found)} new change points "
+          f"({len(monitor.detections)} total across {len(monitor.detectors)} series)")
+    return monitor
+
+
 def filter_date_range(df: pd.DataFrame) -> pd.DataFrame:
     """Keep only records within the study period (Jan 2022 – Jun 2025)."""
     start = pd.Timestamp("2022-01-01")
@@ -121,26 +298,335 @@ def filter_date_range(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def add_sentiment_arguments(parser: argparse.ArgumentParser):
+    """Sentiment backend options, shared with scripts/stream_data.py."""
+    parser.add_argument("--sentiment-backend", choices=sorted(sentiment.BACKENDS), default="textblob",
+                        help="sentiment scorer (default: textblob)")
+    parser.add_argument("--batch-size", type=int, help="texts per sentiment batch (default: per backend)")
+    parser.add_argument("--label-thresholds", type=float, nargs=2, metavar=("NEGATIVE", "POSITIVE"),
+                        help="scores below/above these are labelled negative/positive (default: per backend)")
+    parser.add_argument("--lexicon", type=Path, help="VADER-format lexicon file for the lexicon backend")
+    parser.add_argument("--onnx-model", type=Path, help="ONNX sentiment model for the onnx backend")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean the raw Reddit dataset and build the dashboard indexes.")
+    add_sentiment_arguments(parser)
+    parser.add_argument("--topics", type=int, default=topics.N_TOPICS,
+                        help=f"number of topics for a full topic-model fit (default: {topics.N_TOPICS})")
+    parser.add_argument("--topics-update", action="store_true",
+                        help="continue training the saved topic model on new records instead of refitting")
+    parser.add_argument("--changepoints-update", action="store_true",
+                        help="feed only days after the saved change-point monitor's last day to its detectors")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for the per-record stages, one month-shard per task "
+                             "(default: 1, serial; 0: one per CPU)")
+    parser.add_argument("--shard-output", type=Path, metavar="DIR",
+                        help="also save the cleaned data as one Parquet file per month in DIR")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="list the stages a run would recompute or load from the stage cache, and why")
+    parser.add_argument("--force", action="store_true", help="recompute every stage, ignoring the stage cache")
+    return parser.parse_args()
+
+
+def sentiment_options(args: argparse.Namespace) -> tuple:
+    """Backend name and options, picklable so pool workers can build their own backend."""
+    options = {"batch_size": args.batch_size, "thresholds": args.label_thresholds}
+    if args.sentiment_backend == "lexicon":
+        options["lexicon_path"] = args.lexicon
+    elif args.sentiment_backend == "onnx":
+        options["model_path"] = args.onnx_model
+    return args.sentiment_backend, options
+
+
+# ── Per-record Stages ────────────────────────────────────────────────────────
+
+def clean_records(df: pd.DataFrame, backend: sentiment.SentimentBackend) -> tuple:
+    """Run the stages that treat each record independently; returns the frame and its token store."""
+    df = filter_date_range(df)
+    df = parse_dates(df)
+    store = tokenize(df)
+    df = compute_sentiment(df, backend, store)
+    return df, store
+
+
+# Each pool worker builds the sentiment backend once (models and sessions
+# are not picklable) and reuses it for every shard it is given.
+_worker_backend = None
+
+
+def _init_worker(backend_name: str, options: dict):
+    global _worker_backend
+    _worker_backend = sentiment.get_backend(backend_name, **options)
+
+
+def _clean_shard(shard: pd.DataFrame) -> tuple:
+    # Stage reports from many workers would interleave; the parent summarizes instead
+    with contextlib.redirect_stdout(io.StringIO()):
+        return clean_records(shard, _worker_backend)
+
+
+def clean_records_parallel(df: pd.DataFrame, backend_name: str, options: dict, workers: int) -> tuple:
+    """``clean_records`` on one month-shard per task, merged back in the original row order.
+
+    The row index (raw file order, kept through every stage) puts merged
+    shards back exactly where a serial run would have them, whatever order
+    the shards finish in.
+    """
+    months = df["created_utc"].dt.strftime("%Y-%m")
+    keys, shards = zip(*df.groupby(months, sort=True))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(backend_name, options)) as pool:
+        results = list(pool.map(_clean_shard, shards))
+    for month, (shard, store) in zip(keys, results):
+        print(f"  {month}: {len(shard):>7,} records, {len(store.ids):>9,} tokens")
+
+    merged = pd.concat([shard for shard, _ in results])
+    order = np.argsort(merged.index.to_numpy(), kind="stable")
+    store = tokens.TokenStore.concat([store for _, store in results]).take(order)
+    filtered = len(df) - len(merged)
+    df = merged.iloc[order]
+    print(f"Cleaned {len(keys)} month-shards on {workers} workers")
+    if filtered > 0:
+        print(f"Filtered {filtered} rows outside study date range")
+    print(f"Tokenized {len(store.ids):,} tokens ({len(store.vocab):,} distinct)")
+    print(f"Sentiment backend: {backend_name}")
+    print(f"Sentiment distribution:\n{df['sentiment_label'].value_counts().to_string()}")
+    return df, store
+
+
+def save_shards(df: pd.DataFrame, directory: Path):
+    """Save the cleaned data as one Parquet file per month."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for month, shard in df.groupby("month", sort=True):
+        shard.to_parquet(directory / f"{CLEAN_PATH.stem}_{month}.parquet", index=False)
+    print(f"Saved {df['month'].nunique()} monthly shards to {directory}")
+
+
+# ── Stage DAG ────────────────────────────────────────────────────────────────
+# Each stage below is fingerprinted by its code, config, input files and
+# upstream stages (see analysis.pipeline). Column stages return only the
+# columns they add, indexed like the records, so a change to one rule (say
+# the engagement_tier bins) recomputes that stage and the outputs, while
+# sentiment, topics and the rest load from the stage cache.
+
+def stage_raw() -> pd.DataFrame:
+    """The raw export after the whole-corpus checks: duplicates, missing values, reply structure."""
+    df = load_raw_data(RAW_PATH)
+    df = remove_duplicates(df)
+    df = handle_missing_values(df)
+    return handle_reply_structure(df)
+
+
+def stage_records(raw: pd.DataFrame, backend_name: str, backend_options: dict, workers: int) -> tuple:
+    """Date filter, dates, tokens and sentiment per record; returns the frame and its token store."""
+    if workers > 1:
+        return clean_records_parallel(raw, backend_name, backend_options, workers)
+    return clean_records(raw, sentiment.get_backend(backend_name, **backend_options))
+
+
+def stage_derived(records: tuple) -> pd.DataFrame:
+    df, store = records
+    return add_derived_columns(df[["score"]].copy(), store)[["word_count", "engagement_tier"]]
+
+
+def stage_thread_keys(records: tuple) -> pd.DataFrame:
+    df, _ = records
+    return add_thread_keys(df[["thread_id"]].copy())[["thread_key"]]
+
+
+def stage_bursts(records: tuple) -> pd.DataFrame:
+    df, _ = records
+    return add_burst_flags(df[["author", "subreddit", "created_utc"]].copy())[["burst_flag"]]
+
+
+def stage_topics(records: tuple, n_topics: int, update: bool) -> tuple:
+    """Topic columns, the fitted model and the per-record topic weights."""
+    df, store = records
+    columns, model, weights = add_topics(df[["thread_id", "id"]].copy(), store, n_topics, update)
+    return columns[["topic_id", "topic_weight"]], model, weights
+
+
+def stage_cleaned(records: tuple, derived: pd.DataFrame, thread_keys: pd.DataFrame,
+                  bursts: pd.DataFrame, topic_results: tuple) -> pd.DataFrame:
+    """The analysis-ready frame: record columns, then each column stage's columns."""
+    df, _ = records
+    return pd.concat([df, derived, thread_keys, bursts, topic_results[0]], axis=1)
+
+
+def save_csv(cleaned: pd.DataFrame):
+    cleaned.to_csv(CLEAN_PATH, index=False)
+    print(f"Saved {len(cleaned)} cleaned rows to {CLEAN_PATH.name}")
+    print(f"Columns: {list(cleaned.columns)}")
+
+
+def save_parquet(cleaned: pd.DataFrame):
+    # Columnar copy for the dashboard's DuckDB backend, which scans it out of core
+    cleaned.to_parquet(CLEAN_PARQUET_PATH, index=False)
+    print(f"Saved Parquet copy to {CLEAN_PARQUET_PATH.name}")
+
+
+def save_snapshot(cleaned: pd.DataFrame):
+    # Uncompressed single-batch Arrow file the dashboard memory-maps once per process
+    write_snapshot(cleaned, SNAPSHOT_PATH)
+    print(f"Saved Arrow snapshot to {SNAPSHOT_PATH.name}")
+
+
+def save_time_index(cleaned: pd.DataFrame):
+    # Daily prefix sums so the dashboard answers any date range / granularity in O(1)
+    time_index.TimeIndex.from_daily(time_index.daily_totals(cleaned)).save(TIME_INDEX_PATH)
+    print(f"Saved time index to {TIME_INDEX_PATH.name}")
+
+
+def save_topk(cleaned: pd.DataFrame):
+    # Per-partition top-k score lists so featured quotes never scan the corpus
+    topk.TopKIndex.build(topk.score_keys(cleaned)).save(TOPK_PATH)
+    print(f"Saved top-{topk.TOP_K} index to {TOPK_PATH.name}")
+
+
+def save_thread_rollup(cleaned: pd.DataFrame):
+    rollup = threads.thread_rollup(cleaned)
+    rollup.to_csv(THREADS_PATH, index=False)
+    print(f"Saved {len(rollup)} thread rollups to {THREADS_PATH.name}")
+
+
+def save_reply_tree(cleaned: pd.DataFrame):
+    tree = reply_tree.ReplyTree.build(cleaned["id"], cleaned["parent_id"], cleaned["thread_key"],
+                                      cleaned["created_utc"])
+    tree.save(REPLY_TREE_PATH)
+    print(f"Saved reply tree ({int(tree.depth.max()) + 1} levels) to {REPLY_TREE_PATH.name}")
+
+
+def save_token_store(records: tuple):
+    records[1].save(TOKENS_PATH)
+    print(f"Saved token store to {TOKENS_PATH.name}")
+
+
+def save_pattern_codes(records: tuple):
+    # Matched once here, so the dashboard needs no token store to draw frames and keywords
+    patterns.save_codes(PATTERNS_PATH, patterns.pattern_codes(records[1]))
+    print(f"Saved pattern codes to {PATTERNS_PATH.name}")
+
+
+def save_topics(cleaned: pd.DataFrame, topic_results: tuple):
+    _, model, weights = topic_results
+    model.save(TOPIC_MODEL_PATH)
+    topics.save_weights(TOPICS_PATH, weights, model.top_terms())
+    key_columns = [*time_index.PARTITION_COLUMNS, "topic_id"]
+    time_index.TimeIndex.from_daily(time_index.daily_totals(cleaned, key_columns), key_columns).save(TOPIC_INDEX_PATH)
+    print(f"Saved topic model, weights and topic index to {TOPIC_MODEL_PATH.name}, "
+          f"{TOPICS_PATH.name} and {TOPIC_INDEX_PATH.name}")
+
+
+def save_similarity(records: tuple):
+    # Random-projection signatures so "More like this" never compares raw text
+    similarity.SimilarityIndex.build(records[1]).save(SIMILARITY_PATH)
+    print(f"Saved {similarity.SIGNATURE_BITS}-bit similarity signatures to {SIMILARITY_PATH.name}")
+
+
+def save_change_points(cleaned: pd.DataFrame, records: tuple, update: bool):
+    detect_change_points(cleaned, records[1], update).save(CHANGEPOINTS_PATH)
+    print(f"Saved change-point monitor to {CHANGEPOINTS_PATH.name}")
+
+
+def save_terms(cleaned: pd.DataFrame, records: tuple):
+    # Every term's mentions per day and partition, so the dashboard can chart any of them
+    index = terms.TermIndex.build(records[1], cleaned)
+    index.save(TERMS_PATH)
+    print(f"Saved term index ({len(index.terms):,} terms, {index.matrix.nnz:,} record-term pairs) "
+          f"to {TERMS_PATH.name}")
+    emerging = index.emerging()
+    if not emerging.empty:
+        latest = emerging[emerging["month"] == emerging["month"].max()]
+        print(f"Emerging terms in {latest['month'].iloc[0]:%B %Y}: {', '.join(latest['term'].head(5))}")
+
+
+def sentiment_inputs(args: argparse.Namespace) -> tuple:
+    """Model and lexicon files the sentiment stage reads, so edits to them invalidate it."""
+    paths = []
+    if args.sentiment_backend == "lexicon" and args.lexicon:
+        paths.append(args.lexicon)
+    if args.sentiment_backend == "onnx" and args.onnx_model:
+        paths += [args.onnx_model, args.onnx_model.with_name("tokenizer.json")]
+    return tuple(paths)
+
+
+def build_pipeline(args: argparse.Namespace) -> tuple:
+    """The cleaning stage DAG and its target (output) stages, in write order."""
+    pipeline = Pipeline(STAGE_CACHE_DIR)
+    backend_name, backend_options = sentiment_options(args)
+    add = pipeline.add
+    add(Stage("raw", stage_raw, inputs=(RAW_PATH,),
+              code=(load_raw_data, remove_duplicates, handle_missing_values, handle_reply_structure,
+                    reply_tree.default_parents)))
+    add(Stage("records", stage_records, deps=("raw",), inputs=sentiment_inputs(args),
+              code=(clean_records, clean_records_parallel, _clean_shard, filter_date_range, parse_dates,
+                    tokenize, compute_sentiment, sentiment, tokens),
+              config={"backend_name": backend_name, "backend_options": backend_options},
+              settings={"workers": args.workers or os.cpu_count()}))
+    add(Stage("derived", stage_derived, deps=("records",), code=(add_derived_columns,)))
+    add(Stage("thread_keys", stage_thread_keys, deps=("records",), code=(add_thread_keys, threads.thread_keys)))
+    add(Stage("bursts", stage_bursts, deps=("records",), code=(add_burst_flags, authors)))
+    add(Stage("topics", stage_topics, deps=("records",), code=(add_topics, previously_cleaned, topics),
+              config={"n_topics": args.topics, "update": args.topics_update},
+              always="--topics-update continues from the saved model" if args.topics_update else ""))
+    # Cheap to reassemble, and every output already caches what it needs
+    add(Stage("cleaned", stage_cleaned, deps=("records", "derived", "thread_keys", "bursts", "topics"),
+              cache=False))
+
+    # The CSV is written first: the dashboard treats indexes older than it as stale
+    outputs = [
+        Stage("csv", save_csv, deps=("cleaned",), outputs=(CLEAN_PATH,)),
+        Stage("parquet", save_parquet, deps=("cleaned",), outputs=(CLEAN_PARQUET_PATH,)),
+        Stage("snapshot", save_snapshot, deps=("cleaned",), outputs=(SNAPSHOT_PATH,), code=(write_snapshot,)),
+        Stage("time_index", save_time_index, deps=("cleaned",), outputs=(TIME_INDEX_PATH,), code=(time_index,)),
+        Stage("topk", save_topk, deps=("cleaned",), outputs=(TOPK_PATH,), code=(topk,)),
+        Stage("thread_rollup", save_thread_rollup, deps=("cleaned",), outputs=(THREADS_PATH,), code=(threads,)),
+        Stage("reply_tree", save_reply_tree, deps=("cleaned",), outputs=(REPLY_TREE_PATH,), code=(reply_tree,)),
+        Stage("token_store", save_token_store, deps=("records",), outputs=(TOKENS_PATH,), code=(tokens,)),
+        Stage("pattern_codes", save_pattern_codes, deps=("records",), outputs=(PATTERNS_PATH,),
+              code=(patterns, tokens)),
+        Stage("topic_outputs", save_topics, deps=("cleaned", "topics"),
+              outputs=(TOPIC_MODEL_PATH, TOPICS_PATH, TOPIC_INDEX_PATH), code=(time_index, topics)),
+        Stage("similarity", save_similarity, deps=("records",), outputs=(SIMILARITY_PATH,), code=(similarity,)),
+        Stage("change_points", save_change_points, deps=("cleaned", "records"), outputs=(CHANGEPOINTS_PATH,),
+              code=(detect_change_points, changepoints, patterns),
+              config={"update": args.changepoints_update},
+              always="--changepoints-update feeds new days" if args.changepoints_update else ""),
+        Stage("terms", save_terms, deps=("cleaned", "records"), outputs=(TERMS_PATH,), code=(terms,)),
+    ]
+    if args.shard_output:
+        outputs.append(Stage("shards", save_shards, deps=("cleaned",), outputs=(args.shard_output,),
+                             config={"directory": args.shard_output}))
+    for stage in outputs:
+        add(stage)
+    return pipeline, [stage.name for stage in outputs]
+
+
+def freshen_outputs(pipeline: Pipeline, targets: list):
+    """Give up-to-date outputs at least the CSV's mtime, so the dashboard does not rebuild them."""
+    written = CLEAN_PATH.stat().st_mtime
+    for name in targets:
+        for path in pipeline.stages[name].outputs:
+            if path.is_file() and path.stat().st_mtime < written:
+                os.utime(path, (written, written))
+
+
 def main():
+    args = parse_args()
     print("=" * 60)
     print("Reddit Skills-Based Hiring — Data Cleaning Pipeline")
     print("=" * 60)
 
-    df = load_raw_data(RAW_PATH)
-    df = remove_duplicates(df)
-    df = handle_missing_values(df)
-    df = filter_date_range(df)
-    df = parse_dates(df)
-    df = compute_sentiment(df)
-    df = add_derived_columns(df)
+    pipeline, targets = build_pipeline(args)
+    if args.dry_run:
+        print("Dry run — stages that would run, load from the stage cache, or are up to date:")
+        print(describe(pipeline.plan(targets, force=args.force)))
+        return
 
     # Ensure output directory exists
     CLEAN_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    # Save cleaned data
-    df.to_csv(CLEAN_PATH, index=False)
-    print(f"\nSaved {len(df)} cleaned rows to {CLEAN_PATH.name}")
-    print(f"Columns: {list(df.columns)}")
+    pipeline.run(targets, force=args.force)
+    freshen_outputs(pipeline, targets)
     print("=" * 60)
 
 
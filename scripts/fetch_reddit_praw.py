@@ -10,6 +10,11 @@ import pandas as pd
 import datetime
 import time
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from analysis.subreddits import FEDERAL_SUBREDDITS  # noqa: E402
 
 # ── 1) Configure Reddit API credentials via environment variables ────────────
 reddit = praw.Reddit(
@@ -19,7 +24,7 @@ reddit = praw.Reddit(
 )
 
 # ── 2) Define search scope ──────────────────────────────────────────────────
-subreddits = ["deptHHS", "FedEmployees", "feddiscussion", "govfire"]
+subreddits = list(FEDERAL_SUBREDDITS)
 keywords = ["hiring", "skills", "RIF", "applied", "hired"]
 
 after = int(datetime.datetime(2024, 1, 1).timestamp())
@@ -40,6 +45,8 @@ for sub in subreddits:
                     "type":        "post",
                     "thread_id":   submission.id,
                     "id":          submission.id,
+                    "parent_id":   "",
+                    "depth":       0,
                     "title":       submission.title,
                     "body":        submission.selftext,
                     "created_utc": datetime.datetime.fromtimestamp(submission.created_utc),
@@ -48,12 +55,19 @@ for sub in subreddits:
                     "author":      str(submission.author),
                 })
                 submission.comments.replace_more(limit=0)
+                # list() is breadth-first, so a comment's parent is always seen
+                # before it; depth counts from the post (top-level comment = 1).
+                depth = {submission.id: 0}
                 for c in submission.comments.list():
+                    parent_id = c.parent_id.split("_", 1)[1]  # strip t1_/t3_ prefix
+                    depth[c.id] = depth.get(parent_id, 0) + 1
                     if c.score >= min_score:
                         records.append({
                             "type":        "comment",
                             "thread_id":   submission.id,
                             "id":          c.id,
+                            "parent_id":   parent_id,
+                            "depth":       depth[c.id],
                             "title":       "",
                             "body":        c.body,
                             "created_utc": datetime.datetime.fromtimestamp(c.created_utc),
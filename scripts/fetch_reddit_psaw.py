@@ -5,9 +5,15 @@ Fetch historical Reddit submissions via Pushshift API (PSAW wrapper).
 Targets career and HR subreddits for broader skills-based hiring discourse.
 """
 import datetime
+import sys
+from pathlib import Path
+
 import pandas as pd
 from psaw import PushshiftAPI
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from analysis.subreddits import CAREER_SUBREDDITS  # noqa: E402
+
 # 1) Initialize PSAW with custom base URL
 api = PushshiftAPI(
     network_request_args={"headers": {"User-Agent": "Mozilla/5.0"}}
@@ -15,7 +21,7 @@ api = PushshiftAPI(
 api.base_url = "https://api.pushshift.io/reddit"
 
 # 2) Define search scope
-subreddits = ["humanresources", "recruiting", "jobs", "careerguidance"]
+subreddits = list(CAREER_SUBREDDITS)
 keywords = ["hiring", "skills"]
 after = int(datetime.datetime(2022, 1, 1).timestamp())
 before = int(datetime.datetime(2025, 7, 24).timestamp())
@@ -35,6 +41,8 @@ posts = []
 for post in gen:
     posts.append({
         "thread_id":   post.id,
+        "parent_id":   "",       # submissions are thread roots
+        "depth":       0,
         "title":       post.title,
         "body":        post.selftext,
         "created_utc": datetime.datetime.fromtimestamp(post.created_utc),
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Streaming ingestion for the Reddit Skills-Based Hiring Dataset
+
+Follows new submissions and comments, cleans them in micro-batches with the
+batch pipeline's own stages and appends each batch as a Parquet partition
+next to the cleaned CSV. The dashboard polls for new partitions and extends
+its indexes with those rows only, so a post reaches the charts within a
+micro-batch wait plus the dashboard's refresh interval.
+
+Usage:
+    python scripts/stream_data.py                                   # tail the local spool
+    python scripts/stream_data.py --replay data/raw/reddit_skills_raw.csv --rate 5
+    python scripts/stream_data.py --once                            # clean what the spool holds, then exit
+    python scripts/stream_data.py --source praw                     # follow Reddit (needs REDDIT_CLIENT_ID/SECRET)
+
+Input:  data/raw/stream_spool.jsonl (jsonl source) or the Reddit API (praw source)
+Output: data/cleaned/reddit_skills_cleaned_stream/part-<NNNNNN>.parquet
+
+Each micro-batch goes through deduplication (within the batch and against
+every record already cleaned or streamed), missing values, reply structure,
+dates, tokenizing, sentiment and derived columns. New threads get keys after
+the existing ones. Burst flags judge each author x subreddit against its
+whole history. Topics come from the saved topic model without refitting.
+Unlike the batch pipeline there is no study-period filter: the stream is
+new activity by definition. Partitions are append-only; a record's burst
+flag is not revised by bursts that happen after its batch.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from clean_data import (
+    CLEAN_PATH, TOPIC_MODEL_PATH, add_derived_columns, add_sentiment_arguments, compute_sentiment,
+    handle_missing_values, handle_reply_structure, parse_dates, remove_duplicates, sentiment_options, tokenize,
+)
+from analysis import authors, sentiment, streaming, topics  # project root put on sys.path by clean_data
+from analysis.subreddits import SUBREDDITS
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SPOOL_PATH = PROJECT_ROOT / "data" / "raw" / "stream_spool.jsonl"
+STREAM_DIR = streaming.stream_dir(CLEAN_PATH)
+HISTORY_COLUMNS = ["thread_id", "id", "thread_key", "author", "subreddit", "created_utc"]
+
+
+class StreamState:
+    """Everything cleaned so far, as far as new batches are checked against it."""
+
+    def __init__(self, history: pd.DataFrame):
+        self.history = history.reset_index(drop=True)
+        self.seen = set(self._keys(history))
+        threads = history.drop_duplicates("thread_id")
+        self.thread_keys = dict(zip(threads["thread_id"].astype(str), threads["thread_key"].astype(np.int64)))
+
+    @classmethod
+    def load(cls) -> "StreamState":
+        frames = []
+        if CLEAN_PATH.exists():
+            frames.append(pd.read_csv(CLEAN_PATH, usecols=HISTORY_COLUMNS, dtype={"thread_id": str, "id": str},
+                                      parse_dates=["created_utc"]))
+        frames += [pd.read_parquet(path, columns=HISTORY_COLUMNS) for path in streaming.partitions(STREAM_DIR)]
+        if not frames:
+            return cls(pd.DataFrame({col: pd.Series(dtype=object) for col in HISTORY_COLUMNS}))
+        history = pd.concat(frames, ignore_index=True)
+        history["created_utc"] = pd.to_datetime(history["created_utc"])
+        return cls(history)
+
+    @staticmethod
+    def _keys(df: pd.DataFrame) -> np.ndarray:
+        return (df["thread_id"].astype(str) + "\x1f" + df["id"].astype(str)).to_numpy()
+
+    def unseen(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of ``df`` not cleaned before."""
+        return df[[key not in self.seen for key in self._keys(df)]]
+
+    def assign_thread_keys(self, thread_ids: pd.Series) -> np.ndarray:
+        """Existing threads keep their key; new ones are numbered after every key in use."""
+        ids = thread_ids.astype(str)
+        next_key = max(self.thread_keys.values(), default=-1) + 1
+        for thread_id in sorted(set(ids) - self.thread_keys.keys()):
+            self.thread_keys[thread_id] = next_key
+            next_key += 1
+        return ids.map(self.thread_keys).to_numpy(dtype=np.int64)
+
+    def burst_flags(self, df: pd.DataFrame) -> np.ndarray:
+        """Burst flags for ``df``, each author x subreddit judged with its recent history."""
+        keys = df["author"].astype(str) + "\x1f" + df["subreddit"].astype(str)
+        since = df["created_utc"].min() - authors.BURST_WINDOW - authors.BURST_BASELINE
+        recent = self.history[self.history["created_utc"] > since]
+        past = recent[(recent["author"].astype(str) + "\x1f" + recent["subreddit"].astype(str)).isin(keys)]
+        rows = pd.concat([past, df[["author", "subreddit", "created_utc"]]], ignore_index=True)
+        flags = authors.detect_bursts(rows["author"], rows["subreddit"], rows["created_utc"])
+        return flags[len(past):]
+
+    def add(self, df: pd.DataFrame):
+        self.seen.update(self._keys(df))
+        self.history = pd.concat([self.history, df[HISTORY_COLUMNS]], ignore_index=True)
+
+
+def clean_batch(records: list, state: StreamState, backend: sentiment.SentimentBackend, model,
+                columns: list) -> tuple:
+    """One micro-batch through the cleaning stages; returns the cleaned rows and how many were dropped."""
+    df = pd.DataFrame(records)
+    df["created_utc"] = pd.to_datetime(df["created_utc"])
+    df[["thread_id", "id"]] = df[["thread_id", "id"]].astype(str)
+    # Stage reports would repeat every batch; the batch summary line replaces them
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = state.unseen(remove_duplicates(df))
+        if df.empty:
+            return df, len(records)
+        df = handle_missing_values(df.reset_index(drop=True)).reset_index(drop=True)
+        df = handle_reply_structure(df)
+        df = parse_dates(df)
+        store = tokenize(df)
+        df = compute_sentiment(df, backend, store)
+        df = add_derived_columns(df, store)
+    df["thread_key"] = state.assign_thread_keys(df["thread_id"])
+    df["burst_flag"] = state.burst_flags(df).astype(np.int8)
+    if model is not None:
+        df["topic_id"], df["topic_weight"] = topics.assign_topics(model.transform(store))
+    else:
+        df["topic_id"], df["topic_weight"] = -1, 0.0
+    state.add(df)
+    return df[columns], len(records) - len(df)
+
+
+def make_source(args: argparse.Namespace):
+    if args.source == "praw":
+        import praw
+
+        reddit = praw.Reddit(
+            client_id=os.environ["REDDIT_CLIENT_ID"],
+            client_secret=os.environ["REDDIT_CLIENT_SECRET"],
+            user_agent="skills_hiring_research/0.1",
+        )
+        return streaming.PrawSource(reddit, args.subreddits)
+    return streaming.JsonlSource(args.spool, follow=not args.once)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Clean new Reddit records in micro-batches and append them for the dashboard.")
+    parser.add_argument("--source", choices=["jsonl", "praw"], default="jsonl",
+                        help="jsonl: tail the local spool file (default); praw: follow the subreddits on Reddit")
+    parser.add_argument("--spool", type=Path, default=SPOOL_PATH,
+                        help=f"JSON-lines file of raw records for the jsonl source (default: {SPOOL_PATH.name})")
+    parser.add_argument("--subreddits", nargs="+", default=SUBREDDITS, help="subreddits the praw source follows (default: both fetchers' lists)")
+    parser.add_argument("--max-batch", type=int, default=streaming.MAX_BATCH_RECORDS,
+                        help=f"records per micro-batch at most (default: {streaming.MAX_BATCH_RECORDS})")
+    parser.add_argument("--max-wait", type=float, default=streaming.MAX_BATCH_SECONDS,
+                        help="seconds a record waits for its micro-batch to fill "
+                             f"(default: {streaming.MAX_BATCH_SECONDS:g})")
+    parser.add_argument("--poll", type=float, default=streaming.POLL_SECONDS,
+                        help=f"seconds between polls of an idle source (default: {streaming.POLL_SECONDS:g})")
+    parser.add_argument("--once", action="store_true", help="clean what the spool holds now, then exit")
+    parser.add_argument("--replay", type=Path, metavar="RAW_CSV",
+                        help="instead of cleaning, append RAW_CSV's records to the spool as new events")
+    parser.add_argument("--rate", type=float, default=2.0, help="events per second for --replay (default: 2)")
+    add_sentiment_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.replay:
+        raw = pd.read_csv(args.replay)
+        print(f"Replaying {len(raw)} records from {args.replay.name} into {args.spool} at {args.rate:g}/s")
+        streaming.replay(raw, args.spool, args.rate)
+        return
+
+    print("=" * 60)
+    print("Reddit Skills-Based Hiring — Streaming Ingestion")
+    print("=" * 60)
+    if not CLEAN_PATH.exists():
+        sys.exit(f"No cleaned data at {CLEAN_PATH}; run scripts/clean_data.py first")
+    columns = list(pd.read_csv(CLEAN_PATH, nrows=0).columns)
+    state = StreamState.load()
+    name, options = sentiment_options(args)
+    backend = sentiment.get_backend(name, **options)
+    model = topics.TopicModel.load(TOPIC_MODEL_PATH) if TOPIC_MODEL_PATH.exists() else None
+    print(f"Checking new records against {len(state.seen):,} cleaned or streamed records")
+    if model is None:
+        print(f"No topic model at {TOPIC_MODEL_PATH.name}; streamed records get topic_id -1")
+
+    batches = streaming.micro_batches(make_source(args), args.max_batch, args.max_wait, args.poll)
+    for records in batches:
+        cleaned, dropped = clean_batch(records, state, backend, model, columns)
+        stamp = datetime.datetime.now().strftime("%H:%M:%S")
+        if cleaned.empty:
+            print(f"[{stamp}] {len(records)} records, all seen before")
+            continue
+        path = streaming.write_partition(cleaned, STREAM_DIR)
+        print(f"[{stamp}] {path.name}: {len(cleaned)} records in {cleaned['thread_key'].nunique()} threads"
+              f"{f' ({dropped} duplicates or empty dropped)' if dropped else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,60 @@
+import copy
+import functools
+import html
+import logging
+import os
+import threading
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
 from pathlib import Path
 
+from analysis.authors import ActivityIndex
+from analysis.bootstrap import CONFIDENCE, RESAMPLES, bootstrap_means
+from analysis.browse import PAGE_ROWS, extend_order, matching, preview, sort_keys, sort_order
+from analysis.changepoints import (
+    MATCH_DAYS, ChangePointMonitor, daily_series, event_coverage, match_events, monitor_path as changepoints_path,
+)
+from analysis.diagnostics import Diagnostics
+from analysis.event_study import event_study
+from analysis.export import EXPORT_FORMATS, export_file
+from analysis.patterns import (
+    FRAMES, KEYWORDS, codes_path as pattern_codes_path, load_codes, pattern_codes as match_patterns,
+)
+from analysis.query_backend import (
+    BROWSE_SORTS,
+    DEFAULT_SORT,
+    QUOTE_COLUMNS,
+    REPLY_SOURCE_COLUMNS,
+    TABLE_COLUMNS,
+    THREAD_SOURCE_COLUMNS,
+    FilterState,
+    decode_patterns,
+    frame_summary,
+    keyword_summary,
+    make_backend,
+    snapshot_path,
+)
+from analysis.reply_tree import ReplyTree, tree_path
+from analysis.result_cache import ResultCache, normalize_filters, normalize_query
+from analysis.similarity import TOP_K as SIMILAR_K, SimilarityIndex, similarity_path
+from analysis.streaming import partitions, read_partitions, stream_dir
+from analysis.subreddits import FEDERAL_SUBREDDITS
+from analysis.terms import (
+    BASELINE_MONTHS, MIN_DF as TERM_MIN_DF, MIN_MENTIONS, TermIndex, index_path as terms_path,
+)
+from analysis.threads import read_rollup, rollup_path, thread_rollup
+from analysis.time_index import (
+    GRANULARITIES, PARTITION_COLUMNS, TimeIndex, daily_totals, index_path as time_index_path,
+)
+from analysis.tokens import TokenStore, store_path
+from analysis.topics import index_path as topic_index_path, load_labels, weights_path as topic_weights_path
+from analysis.topk import TOP_K, TopKIndex, index_path as topk_index_path, score_keys
+
+logger = logging.getLogger("dashboard")
+
 # ── Page Config ──────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="Skills-Based Hiring in Public Discourse",
@@ -11,6 +62,47 @@ st.set_page_config(
     layout="wide",
 )
 
+# ── Diagnostics ──────────────────────────────────────────────────────────────
+# Opt in with DASHBOARD_DIAGNOSTICS=1 or ?diagnostics=1. Each rerun then records
+# section timings, stage row counts and memory, cache hits/misses and chart
+# payload sizes, shown in a sidebar panel and appended to a JSON-lines log.
+DIAGNOSTICS = (
+    os.environ.get("DASHBOARD_DIAGNOSTICS") == "1"
+    or st.query_params.get("diagnostics") == "1"
+)
+DIAGNOSTICS_LOG = Path(os.environ.get(
+    "DASHBOARD_DIAGNOSTICS_LOG",
+    Path(__file__).resolve().parent / "logs" / "dashboard_diagnostics.jsonl",
+))
+diag = Diagnostics(enabled=DIAGNOSTICS)
+_cache_state = threading.local()
+
+
+def instrumented(cache_decorator):
+    """Wrap a Streamlit cache decorator so diagnostics can tell hits from misses.
+
+    The inner body flags a miss when it actually executes; the outer wrapper
+    reads the flag once the cached call returns.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            _cache_state.miss = True
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            _cache_state.miss = False
+            result = cached(*args, **kwargs)
+            diag.result(fn.__name__, result, hit=not _cache_state.miss)
+            return result
+
+        call.clear = cached.clear
+        return call
+    return decorate
+
 # ── Altair Theme ─────────────────────────────────────────────────────────────
 PALETTE = ["#2C3E50", "#E67E22", "#7F8C8D", "#27AE60", "#8E44AD", "#C0392B"]
 
@@ -39,30 +131,350 @@ def research_theme():
 alt.themes.register("research", research_theme)
 alt.themes.enable("research")
 
+# ── Chart Payloads ───────────────────────────────────────────────────────────
+# Every chart is built from a pre-aggregated, column-projected frame so the
+# spec sent to the browser stays small regardless of corpus size. Specs over
+# this many bytes are logged so regressions are easy to spot.
+CHART_PAYLOAD_LIMIT = int(os.environ.get("DASHBOARD_CHART_PAYLOAD_LIMIT", 250_000))
+
+# Altair's 5,000-row cap would fail daily series outright; chart size is
+# bounded by days x groups (never by corpus size) and watched by the limit above.
+alt.data_transformers.disable_max_rows()
+
+
+def show_chart(chart, name):
+    """Render an Altair chart, logging a warning if its spec exceeds the payload limit."""
+    payload = len(chart.to_json(indent=None).encode("utf-8"))
+    diag.chart(name, payload)
+    if payload > CHART_PAYLOAD_LIMIT:
+        logger.warning(
+            "Chart %r spec is %s bytes (limit %s); aggregate before charting.",
+            name, f"{payload:,}", f"{CHART_PAYLOAD_LIMIT:,}",
+        )
+    st.altair_chart(chart, use_container_width=True)
+
+
 # ── Load Data ────────────────────────────────────────────────────────────────
 DATA_DIR = Path(__file__).resolve().parent / "data"
-DATA_PATH = DATA_DIR / "cleaned" / "reddit_skills_cleaned.csv"
+DATA_PATH = Path(os.environ.get("DASHBOARD_DATA_PATH", DATA_DIR / "cleaned" / "reddit_skills_cleaned.csv"))
 POLICY_PATH = DATA_DIR / "policy_events.csv"
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv(DATA_PATH, parse_dates=["created_utc"])
-    df["date"] = pd.to_datetime(df["date"])
-    df["month"] = pd.to_datetime(df["month"])
-    return df
-
-@st.cache_data
+STREAM_DIR = stream_dir(DATA_PATH)
+
+# "pandas" holds the corpus in memory; "duckdb" queries the CSV/Parquet file as SQL
+QUERY_BACKEND = os.environ.get("DASHBOARD_BACKEND", "pandas")
+
+def is_fresh(path):
+    """True if a pipeline-built index exists and is no older than the data file."""
+    return path.exists() and path.stat().st_mtime >= DATA_PATH.stat().st_mtime
+
+@instrumented(st.cache_resource)
+def load_backend():
+    # A resource rather than cached data: the backend may hold a database
+    # connection, and every session can share one read-only instance. The
+    # pandas backend memory-maps the pipeline's Arrow snapshot when it is
+    # fresh, so the corpus lives once in the OS page cache, not on the heap.
+    if not DATA_PATH.exists():
+        raise FileNotFoundError(DATA_PATH)
+    snapshot = snapshot_path(DATA_PATH)
+    if QUERY_BACKEND == "pandas" and is_fresh(snapshot):
+        return make_backend(QUERY_BACKEND, snapshot)
+    return make_backend(QUERY_BACKEND, DATA_PATH)
+
+# Indexes written by the pipeline are rebuilt from the backend when the file is
+# missing or older than the data it summarizes.
+@instrumented(st.cache_resource)
+def load_time_index(_backend):
+    path = time_index_path(DATA_PATH)
+    if is_fresh(path):
+        return TimeIndex.load(path)
+    return TimeIndex.from_daily(_backend.daily_totals())
+
+@instrumented(st.cache_resource)
+def load_topk_index(_backend):
+    path = topk_index_path(DATA_PATH)
+    if is_fresh(path):
+        return TopKIndex.load(path)
+    return TopKIndex.build(_backend.score_keys())
+
+@instrumented(st.cache_resource)
+def load_thread_rollup(_backend):
+    # Shared, read-only: one row per thread, sorted by thread_key
+    path = rollup_path(DATA_PATH)
+    if is_fresh(path):
+        return read_rollup(path)
+    return thread_rollup(_backend.columns(THREAD_SOURCE_COLUMNS))
+
+@instrumented(st.cache_resource)
+def load_reply_stats(_backend):
+    # Per-record reply statistics from the preorder reply tree: one prefix-sum
+    # pass gives every record's reply count and mean reply sentiment.
+    path = tree_path(DATA_PATH)
+    if is_fresh(path):
+        tree = ReplyTree.load(path)
+    else:
+        cols = _backend.columns(REPLY_SOURCE_COLUMNS)
+        tree = ReplyTree.build(cols["id"], cols["parent_id"].fillna(""), cols["thread_key"], cols["created_utc"])
+    return reply_statistics(tree, _backend.columns(["thread_key", "type", "sentiment_score"]))
+
+def reply_statistics(tree, records):
+    records = records.assign(depth=tree.depth[tree.slot], replies=tree.descendant_counts())
+    records["reply_sentiment"] = tree.reply_means(records["sentiment_score"])
+    return records[records["replies"] > 0].reset_index(drop=True)
+
+@instrumented(st.cache_resource)
+def load_token_store(_backend):
+    # Every body tokenized once; loaded on the first search, "More like this"
+    # or term index build, not at startup
+    path = store_path(DATA_PATH)
+    if is_fresh(path):
+        return TokenStore.load(path)
+    return TokenStore.from_texts(_backend.columns(["body"])["body"])
+
+@instrumented(st.cache_resource)
+def load_pattern_codes(_backend):
+    # One bitmask per record and pattern set, in row-position order: the
+    # pipeline's, or matched against the token store when those are stale
+    path = pattern_codes_path(DATA_PATH)
+    codes = load_codes(path) if is_fresh(path) else None
+    return codes if codes is not None else match_patterns(load_token_store(_backend))
+
+def corpus_tokens(live=()):
+    # The token store over every row position, streamed rows included
+    tokens = load_token_store(load_backend())
+    return tokens.append(load_live(live)["live_tokens"]) if live else tokens
+
+@instrumented(st.cache_resource(max_entries=2))
+def load_similarity(live=()):
+    # Loaded on the first "More like this", not at startup. Streamed records
+    # are signed with the corpus's vocabulary, so earlier results stay valid.
+    if live:
+        return load_similarity().extend(load_live(live)["live_tokens"])
+    path = similarity_path(DATA_PATH)
+    if is_fresh(path):
+        return SimilarityIndex.load(path)
+    return SimilarityIndex.build(load_token_store(load_backend()))
+
+@instrumented(st.cache_resource(max_entries=2))
+def load_terms(live=()):
+    # Loaded on first view of the Keywords tab. Streamed records are counted
+    # against the corpus's terms; terms they introduce arrive with the next
+    # pipeline run.
+    if live:
+        corpus = load_live(live)
+        return load_terms().extend(corpus["live_tokens"], corpus["live_rows"])
+    path = terms_path(DATA_PATH)
+    if is_fresh(path):
+        return TermIndex.load(path)
+    return TermIndex.build(load_token_store(load_backend()), load_backend().columns(["date", *PARTITION_COLUMNS]))
+
+# The term picker lists this many of the most widely used terms; any other
+# indexed term can be typed in
+TERM_OPTIONS = 5_000
+
+@instrumented(st.cache_resource(max_entries=1))
+def term_options(live=()):
+    index = load_terms(live)
+    frequent = np.argsort(-index.document_frequencies(), kind="stable")[:TERM_OPTIONS]
+    return [str(term) for term in index.terms[frequent]]
+
+@instrumented(st.cache_resource(max_entries=2 * len(BROWSE_SORTS)))
+def load_browse_order(_backend, sort, live=()):
+    # Every row position in the record browser's ``sort`` order, built on the
+    # first use of that sort; streamed rows are merged into the corpus's order
+    column, descending = BROWSE_SORTS[sort]
+    keys = sort_keys(_backend.columns([column])[column], descending)
+    if live:
+        return extend_order(load_browse_order(load_backend(), sort), keys)
+    return sort_order(keys)
+
+@instrumented(st.cache_resource)
+def load_topics(_backend):
+    # Topic terms and a time index keyed on topic_id as well as the partitions,
+    # so topic trends honour the sidebar filters; None when the cleaned data
+    # predates the pipeline's topic stage
+    path = topic_weights_path(DATA_PATH)
+    if not is_fresh(path):
+        return None
+    key_columns = [*PARTITION_COLUMNS, "topic_id"]
+    index_file = topic_index_path(DATA_PATH)
+    if is_fresh(index_file):
+        index = TimeIndex.load(index_file)
+    else:
+        index = TimeIndex.from_daily(_backend.daily_totals(key_columns), key_columns)
+    return load_labels(path), index
+
+@instrumented(st.cache_resource)
 def load_policy_events():
+    # Shared, read-only like the corpus: no per-session copy
     pe = pd.read_csv(POLICY_PATH, parse_dates=["date"])
     return pe
 
-try:
-    df = load_data()
-except FileNotFoundError:
-    st.error(f"Data file not found at {DATA_PATH}. Run `python scripts/clean_data.py` first.")
-    st.stop()
+@instrumented(st.cache_resource)
+def load_change_point_monitor():
+    # The corpus's CUSUM state and detections, shared by every session: the
+    # one the pipeline pickled, or one fed the corpus's daily series when that
+    # is missing or stale. Streamed rows update copies of it.
+    path = changepoints_path(DATA_PATH)
+    if is_fresh(path):
+        return ChangePointMonitor.load(path)
+    backend = load_backend()
+    bounds = backend.bounds()
+    everything = FilterState(start=bounds.min_date, end=bounds.max_date, subreddits=tuple(bounds.subreddits),
+                             content_type="All", tiers=tuple(bounds.tiers))
+    codes = load_pattern_codes(backend)["keywords"]
+    monitor = ChangePointMonitor()
+    monitor.update(daily_series(backend.event_combinations(everything, codes, list(KEYWORDS)), list(KEYWORDS)))
+    return monitor
+
+@instrumented(st.cache_resource(max_entries=1))
+def load_change_points(live=()):
+    # CUSUM change points on the whole corpus's daily series, each matched to
+    # its nearest policy event; loaded on first view of the Volume tab. With
+    # streamed rows, a copy of the corpus's monitor is fed their daily series:
+    # only days after the corpus's last are new to it, as in the pipeline's
+    # --changepoints-update.
+    monitor = load_change_point_monitor()
+    if live:
+        corpus = load_live(live)
+        rows = corpus["rows"]
+        codes = corpus["pattern_codes"]["keywords"][len(load_pattern_codes(load_backend())["keywords"]):]
+        streamed = decode_patterns(rows[["date", "subreddit"]].assign(
+            n=1, sentiment_sum=rows["sentiment_score"], code=codes), list(KEYWORDS))
+        monitor = copy.deepcopy(monitor)
+        monitor.update(daily_series(streamed, list(KEYWORDS)))
+    return match_events(monitor.changes(), load_policy_events())
+
+# ── Streamed Partitions ──────────────────────────────────────────────────────
+# scripts/stream_data.py appends cleaned micro-batches as Parquet partitions.
+# Their rows are numbered after the corpus's and held apart from it: the
+# backend and token store keep the corpus as loaded and add the streamed rows
+# as a separate segment. Each refresh reads and tokenizes only the partitions
+# that arrived since the last one, and extends the previous refresh's indexes
+# with them: prefix sums and top-k lists merge, pattern codes append, and only
+# threads the new rows touch are rolled up again. Shared by every session.
+LIVE_REFRESH_SECONDS = float(os.environ.get("DASHBOARD_LIVE_REFRESH", 30))
+LIVE_COLUMNS = list(dict.fromkeys([*THREAD_SOURCE_COLUMNS, *REPLY_SOURCE_COLUMNS, "type", "sentiment_score"]))
+
+def live_partitions():
+    return tuple(str(path) for path in partitions(STREAM_DIR))
+
+def replace_threads(table, updated, touched):
+    """``table`` with the rows of ``touched`` thread keys replaced by ``updated``."""
+    kept = table[~table["thread_key"].isin(touched)]
+    return pd.concat([kept, updated], ignore_index=True)
+
+@instrumented(st.cache_resource)
+def load_thread_index(_backend):
+    # The corpus's rows grouped by thread_key, to re-roll the threads streamed rows touch
+    cols = _backend.columns(["thread_key", "created_utc"])
+    return ActivityIndex(cols["thread_key"].to_numpy(np.int64),
+                         cols["created_utc"].to_numpy("datetime64[ns]").astype(np.int64))
+
+@st.cache_resource
+def live_history():
+    # The newest streamed corpus built in this process, which the next refresh extends
+    return {}
+
+@instrumented(st.cache_resource(max_entries=1))
+def load_live(live):
+    history = live_history()
+    previous = history.get("corpus")
+    # Partitions are never rewritten, so an earlier refresh is reusable when its
+    # partitions are a prefix of the current ones
+    if previous is not None and previous["paths"] != live[:len(previous["paths"])]:
+        previous = None
+    done = previous["paths"] if previous else ()
+    corpus = extend_live(previous, live[len(done):]) if live != done else previous
+    history["corpus"] = corpus
+    return corpus
+
+def extend_live(previous, paths):
+    """The streamed corpus of ``previous`` (None: no streamed rows yet) plus the partitions ``paths``."""
+    base = load_backend()
+    frames = [read_partitions([path]) for path in paths]
+    new = pd.concat(frames, ignore_index=True)
+    if previous is None:
+        previous = {
+            "paths": (),
+            "rows": new.iloc[:0],
+            "time_index": load_time_index(base),
+            "topk_index": load_topk_index(base),
+            "threads": load_thread_rollup(base),
+            "reply_stats": load_reply_stats(base),
+            "live_tokens": TokenStore.from_texts(new["body"].iloc[:0]),
+            "pattern_codes": load_pattern_codes(base),
+            "topic_model": load_topics(base),
+            "spans": {},
+        }
+    rows = pd.concat([previous["rows"], new], ignore_index=True)
+    offset = len(previous["pattern_codes"]["frames"])
+
+    # Only the streamed segment is tokenized here; the corpus's store stays
+    # unloaded until a search or similarity query needs it
+    new_tokens = TokenStore.from_texts(new["body"])
+    new_codes = match_patterns(new_tokens)
+    pattern_codes = {name: np.concatenate([codes, new_codes[name]])
+                     for name, codes in previous["pattern_codes"].items()}
+
+    # Threads the new rows touch, re-rolled from all their rows, corpus and streamed
+    touched = np.unique(new["thread_key"])
+    thread_rows = pd.concat([
+        base.take(load_thread_index(base).rows_of(touched), LIVE_COLUMNS),
+        rows.loc[rows["thread_key"].isin(touched), LIVE_COLUMNS],
+    ], ignore_index=True)
+    threads = replace_threads(previous["threads"], thread_rollup(thread_rows), touched)
+    threads = threads.sort_values("thread_key", kind="stable").reset_index(drop=True)
+    tree = ReplyTree.build(thread_rows["id"], thread_rows["parent_id"].fillna(""), thread_rows["thread_key"],
+                           thread_rows["created_utc"])
+    updated = reply_statistics(tree, thread_rows[["thread_key", "type", "sentiment_score"]])
+    reply_stats = replace_threads(previous["reply_stats"], updated, touched)
+
+    topic_model = previous["topic_model"]
+    if topic_model is not None:
+        labels, index = topic_model
+        topic_model = labels, index.extend(daily_totals(new, [*PARTITION_COLUMNS, "topic_id"]))
+
+    return {
+        "paths": previous["paths"] + tuple(paths),
+        "backend": base.with_rows(rows),
+        "rows": rows,
+        "time_index": previous["time_index"].extend(daily_totals(new)),
+        "topk_index": previous["topk_index"].extend(score_keys(new).assign(pos=lambda k: k["pos"] + offset)),
+        "threads": threads,
+        "reply_stats": reply_stats,
+        "live_tokens": TokenStore.concat([previous["live_tokens"], new_tokens]),
+        "live_rows": rows[["date", *PARTITION_COLUMNS]],
+        "pattern_codes": pattern_codes,
+        "topic_model": topic_model,
+        "records": len(rows),
+        "latest": rows["created_utc"].max(),
+        # Each partition's date span, for deciding which cached results it affects
+        "spans": {**previous["spans"], **{path: (frame["date"].min().date(), frame["date"].max().date())
+                                          for path, frame in zip(paths, frames)}},
+    }
 
-policy_events = load_policy_events()
+with diag.section("load"):
+    try:
+        backend = load_backend()
+    except FileNotFoundError:
+        st.error(f"Data file not found at {DATA_PATH}. Run `python scripts/clean_data.py` first.")
+        st.stop()
+
+    time_index = load_time_index(backend)
+    topk_index = load_topk_index(backend)
+    threads = load_thread_rollup(backend)
+    reply_stats = load_reply_stats(backend)
+    pattern_codes = load_pattern_codes(backend)
+    topic_model = load_topics(backend)
+    policy_events = load_policy_events()
+
+    live = live_partitions()
+    live_spans = {}
+    if live:
+        corpus = load_live(live)
+        backend, time_index, topk_index = corpus["backend"], corpus["time_index"], corpus["topk_index"]
+        threads, reply_stats, topic_model = corpus["threads"], corpus["reply_stats"], corpus["topic_model"]
+        pattern_codes, live_spans = corpus["pattern_codes"], corpus["spans"]
 
 # Key policy dates — each with a distinct color for chart rules, labels, and legend dots
 POLICY_EVENTS = [
@@ -73,31 +485,26 @@ POLICY_EVENTS = [
 ]
 
 
-def policy_rules_and_labels():
-    """Create Altair layers for policy event vertical rules + staggered text labels,
-    each event in its own color."""
-    layers = []
-    for evt in POLICY_EVENTS:
-        evt_df = pd.DataFrame([{"date": evt["date"], "label": evt["label"]}])
-        rule = (
-            alt.Chart(evt_df)
-            .mark_rule(strokeDash=[4, 4], strokeWidth=1.5, color=evt["color"])
-            .encode(x="date:T")
-        )
-        label = (
-            alt.Chart(evt_df)
-            .mark_text(
-                align="left", dx=5, dy=evt["dy"], fontSize=10,
-                color=evt["color"], fontStyle="italic",
-            )
-            .encode(x="date:T", y=alt.value(0), text="label:N")
-        )
-        layers.append(rule)
-        layers.append(label)
-    result = layers[0]
-    for layer in layers[1:]:
-        result = result + layer
-    return result
+@st.cache_resource
+def policy_overlay():
+    """Policy event rules + staggered text labels as one layered spec.
+
+    Built once per process from a single frame; per-event colors come from a
+    stroke/fill scale so they stay independent of each chart's color scale.
+    Text ``dy`` offsets are plotted on an unscaled (pixel) y channel.
+    """
+    events = pd.DataFrame(POLICY_EVENTS)[["date", "label", "dy"]]
+    scale = alt.Scale(domain=[e["label"] for e in POLICY_EVENTS], range=[e["color"] for e in POLICY_EVENTS])
+    base = alt.Chart(events).encode(x="date:T")
+    rules = base.mark_rule(strokeDash=[4, 4], strokeWidth=1.5).encode(
+        stroke=alt.Stroke("label:N", scale=scale, legend=None),
+    )
+    labels = base.mark_text(align="left", dx=5, fontSize=10, fontStyle="italic").encode(
+        y=alt.Y("dy:Q", scale=None),
+        text="label:N",
+        fill=alt.Fill("label:N", scale=scale, legend=None),
+    )
+    return alt.layer(rules, labels)
 
 
 # ── Custom CSS ───────────────────────────────────────────────────────────────
@@ -199,613 +606,1309 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ── Sidebar Filters ──────────────────────────────────────────────────────────
-st.sidebar.markdown("### Filters")
+# ── Section Data ─────────────────────────────────────────────────────────────
+# Each section's aggregates live in one process-wide LRU result cache, keyed on
+# the section, its arguments and the normalized FilterState (the backend is the
+# same for every session). Sessions on the same filters share one result, and
+# the cache holds at most DASHBOARD_RESULT_CACHE_MB of them. Results are shared,
+# not copied, so renderers must not modify them in place.
+RESULT_CACHE_MB = float(os.environ.get("DASHBOARD_RESULT_CACHE_MB", 256))
+
+@st.cache_resource
+def result_cache():
+    return ResultCache(RESULT_CACHE_MB * 2**20)
+
+# Sections summarizing whole threads, which a streamed comment changes even
+# when it falls outside the filtered date range
+WHOLE_THREAD_SECTIONS = {"thread_data", "reply_data"}
+
+def live_dependencies(fn, filters):
+    """Streamed partitions a result can depend on: those with records in the filtered date range."""
+    whole = fn.__name__ in WHOLE_THREAD_SECTIONS
+    return tuple(path for path, (lo, hi) in live_spans.items()
+                 if whole or (lo <= filters.end and hi >= filters.start))
+
+def result_key(fn, filters, *args):
+    # The code object invalidates entries when the function is edited, as st.cache_data does.
+    # Partitions only append rows, so results whose date range no streamed
+    # record falls in keep their entries when new partitions arrive.
+    return (fn.__name__, fn.__code__, normalize_filters(filters), live_dependencies(fn, filters), *args)
+
+def shared_result(fn):
+    """Serve ``fn(_backend, filters, *args)`` from the shared result cache."""
+    @functools.wraps(fn)
+    def call(_backend, filters, *args):
+        result, hit = result_cache().get(result_key(fn, filters, *args), lambda: fn(_backend, filters, *args))
+        diag.result(fn.__name__, result, hit=hit)
+        return result
+
+    call.compute = fn
+    return call
+
+
+@shared_result
+def count_records(_backend, filters):
+    return _backend.count(filters)
+
+
+@shared_result
+def event_study_data(_backend, filters, window_days):
+    """Pre/post-window volume and sentiment deltas for every policy event in the CSV."""
+    combos = _backend.event_combinations(filters, pattern_codes["keywords"], list(KEYWORDS))
+    return event_study(combos, policy_events, window_days, list(KEYWORDS))
+
+
+@shared_result
+def sentiment_data(_backend, filters):
+    """Subreddit means and histogram bins of sentiment."""
+    return (
+        _backend.subreddit_sentiment(filters),
+        _backend.sentiment_histogram(filters, maxbins=30),
+    )
 
-min_date = df["date"].min().date()
-max_date = df["date"].max().date()
-date_range = st.sidebar.date_input(
-    "Date range",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date,
-)
 
-all_subs = sorted(df["subreddit"].unique())
-selected_subs = st.sidebar.multiselect("Subreddits", options=all_subs, default=all_subs)
+@shared_result
+def subreddit_intervals(_backend, filters):
+    """Bootstrap intervals of mean sentiment per subreddit."""
+    rows = _backend.select(filters, ["subreddit", "sentiment_score"])
+    return bootstrap_means(rows["sentiment_score"], rows[["subreddit"]].astype(str))
 
-content_type = st.sidebar.radio("Content type", ["All", "Posts only", "Comments only"])
 
-all_tiers = sorted(df["engagement_tier"].unique())
-selected_tiers = st.sidebar.multiselect("Engagement tier", options=all_tiers, default=all_tiers)
+@shared_result
+def trend_intervals(_backend, filters, granularity):
+    """Bootstrap intervals of mean sentiment per subreddit and calendar period (day, week or month)."""
+    rows = _backend.select(filters, ["subreddit", "date", "sentiment_score"])
+    periods = pd.DatetimeIndex(rows["date"]).to_period(GRANULARITIES[granularity]).start_time
+    keys = pd.DataFrame({"period": periods.as_unit("ns"), "subreddit": rows["subreddit"].astype(str)})
+    return bootstrap_means(rows["sentiment_score"], keys)
 
-# Apply filters
-if len(date_range) == 2:
-    d_start, d_end = date_range
-else:
-    d_start, d_end = min_date, max_date
 
-mask = (
-    (df["date"].dt.date >= d_start)
-    & (df["date"].dt.date <= d_end)
-    & (df["subreddit"].isin(selected_subs))
-    & (df["engagement_tier"].isin(selected_tiers))
-)
-if content_type == "Posts only":
-    mask = mask & (df["type"] == "post")
-elif content_type == "Comments only":
-    mask = mask & (df["type"] == "comment")
+@shared_result
+def frame_intervals(_backend, filters):
+    """Bootstrap intervals of mean sentiment per frame; a record counts once per frame it matches."""
+    rows = _backend.select(filters, ["sentiment_score"])
+    codes = pattern_codes["frames"][rows["pos"].to_numpy()]
+    scores = rows["sentiment_score"].to_numpy()
+    hits = [np.flatnonzero((codes >> bit) & 1) for bit in range(len(FRAMES))]
+    frames = np.repeat(list(FRAMES), [len(idx) for idx in hits])
+    return bootstrap_means(np.concatenate([scores[idx] for idx in hits]), pd.DataFrame({"frame": frames}))
 
-filtered = df[mask].copy()
 
-st.sidebar.markdown("---")
-st.sidebar.markdown(f"**Showing {len(filtered):,} of {len(df):,} records**")
+@shared_result
+def frame_data(_backend, filters):
+    """Frame counts, mean sentiment per frame, and monthly frame counts."""
+    combos = _backend.pattern_combinations(filters, pattern_codes["frames"], list(FRAMES))
+    return frame_summary(combos, list(FRAMES))
 
-# ── Section 1: Title & Research Context ──────────────────────────────────────
-st.markdown("# Skills-Based Hiring in Public Discourse")
-st.markdown(
-    "*How Reddit communities discuss workforce reform, degree requirements, and the opportunity gap*"
-)
 
-st.markdown("""
-In the United States, over 70 million workers are **Skilled Through Alternative Routes (STARs)** —
-they have the skills employers need but lack a four-year degree. A growing body of research documents
-the "paper ceiling" that excludes these workers from quality jobs despite demonstrated competency.
-This dashboard explores how public discourse on Reddit reflects — and sometimes anticipates — the
-policy shifts that have made skills-based hiring a bipartisan priority across 25 states.
-""")
+@shared_result
+def keyword_data(_backend, filters):
+    """Monthly keyword mentions and pairwise keyword co-occurrence percentages."""
+    combos = _backend.pattern_combinations(filters, pattern_codes["keywords"], list(KEYWORDS))
+    return keyword_summary(combos, list(KEYWORDS))
 
-# Stat callout cards
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.markdown("""
-    <div class="stat-card">
-        <div class="stat-value">70M+</div>
-        <div class="stat-label">Workers are STARs in the US</div>
-    </div>
-    """, unsafe_allow_html=True)
-with col2:
-    st.markdown("""
-    <div class="stat-card">
-        <div class="stat-value">25</div>
-        <div class="stat-label">States committed to removing degree requirements</div>
-    </div>
-    """, unsafe_allow_html=True)
-with col3:
-    st.markdown("""
-    <div class="stat-card">
-        <div class="stat-value">2.5pp</div>
-        <div class="stat-label">Annual decline in degree requirements per year of policy exposure</div>
-    </div>
-    """, unsafe_allow_html=True)
 
-st.caption("Blair, Debroy & Heck 2021; Heck, Corcoran de Castillo, Blair & Debroy 2024")
+@shared_result
+def term_data(_backend, filters, picked):
+    """Monthly mentions and pairwise co-occurrence percentages of any indexed terms.
 
-if filtered.empty:
-    st.warning("No data matches the current filters. Adjust the sidebar filters.")
-    st.stop()
+    Mentions come from the term index's per-day, per-partition counts;
+    co-occurrence is one sparse product over the matching records' rows.
+    """
+    index = load_terms(live)
+    mentions = index.monthly(filters, list(picked)).rename(columns={"term": "keyword"})
+    return mentions, index.cooccurrence(_backend.positions(filters), list(picked))
 
-# ── Section 2: Discourse Volume & Policy Events ─────────────────────────────
-st.markdown("---")
-st.markdown("## Discourse Volume & Policy Events")
-st.markdown('<p class="research-q">Does online discussion of skills-based hiring track with real-world policy action?</p>', unsafe_allow_html=True)
 
-st.markdown("""
-Heck et al. (2024) found that state-level commitments to skills-based hiring produced a
-measurable 2.5 percentage-point annual decline in degree-required job postings. If policy
-is moving the needle on employer behavior, we should expect public discourse to reflect
-that shift. The chart below overlays four key policy milestones against monthly Reddit
-discussion volume.
-""")
+@shared_result
+def emerging_terms(_backend, filters):
+    """The fastest-growing terms of each month in range, against the months before it."""
+    return load_terms(live).emerging(filters)
 
-monthly = (
-    filtered.groupby(["month", "type"])
-    .size()
-    .reset_index(name="count")
-)
 
-bars = (
-    alt.Chart(monthly)
-    .mark_bar(opacity=0.85)
-    .encode(
-        x=alt.X("month:T", title="Month", axis=alt.Axis(format="%b %Y")),
-        y=alt.Y("count:Q", title="Records", stack="zero"),
-        color=alt.Color(
-            "type:N",
-            title="Type",
-            scale=alt.Scale(domain=["post", "comment"], range=["#2C3E50", "#7F8C8D"]),
-        ),
-        tooltip=[
-            alt.Tooltip("month:T", title="Month", format="%B %Y"),
-            "type:N",
-            "count:Q",
-        ],
+@shared_result
+def thread_data(_backend, filters):
+    """Rollup rows for threads with at least one matching record, joined on thread_key."""
+    keys = np.sort(_backend.thread_keys(filters))
+    return threads.iloc[np.searchsorted(threads["thread_key"].to_numpy(), keys)].reset_index(drop=True)
+
+
+@shared_result
+def reply_data(_backend, filters):
+    """Records with replies, in threads that have at least one matching record."""
+    keys = _backend.thread_keys(filters)
+    return reply_stats[reply_stats["thread_key"].isin(keys)].reset_index(drop=True)
+
+
+@shared_result
+def top_quotes(_backend, filters, n):
+    """The ``n`` highest-scoring records, projected to the columns a quote card shows.
+
+    Merged from the per-partition top-k index; only the final ``n`` rows are read.
+    """
+    positions = topk_index.top(filters, n, exact=_backend.top_positions)
+    return _backend.take(positions, QUOTE_COLUMNS).assign(pos=positions)
+
+
+@shared_result
+def similar_records(_backend, filters, pos, k):
+    """The ``k`` matching records worded most like the record at ``pos``, most similar first.
+
+    Candidates are ranked by SimHash signature distance, then the nearest
+    re-scored by exact TF-IDF cosine; only the final ``k`` rows are read.
+    """
+    hits = load_similarity(live).query(corpus_tokens(live), pos, _backend.positions(filters), k)
+    rows = _backend.take(hits["pos"].to_numpy(), QUOTE_COLUMNS)
+    return rows.assign(similarity=hits["similarity"].to_numpy())
+
+
+def search_matches(query):
+    """Records matching a normalized text search, one bool per row position.
+
+    Shared through the result cache like the sections' data, so paging and
+    other fragment reruns do not scan the vocabulary again.
+    """
+    key = ("search_matches", normalize_query(query), live)
+    result, hit = result_cache().get(key, lambda: corpus_tokens(live).search(query))
+    diag.result("search_matches", result, hit=hit)
+    return result
+
+
+@shared_result
+def browse_positions(_backend, filters, query, sort):
+    """Positions of the record browser's rows in ``sort`` order, optionally narrowed by a text search.
+
+    Read off the pre-sorted order with one mask, so no rows are sorted or
+    read. The query's words are matched in order, each as a word prefix,
+    against the token store.
+    """
+    selected = np.zeros(len(pattern_codes["frames"]), dtype=bool)
+    selected[_backend.positions(filters)] = True
+    if query:
+        selected &= search_matches(query)
+    return matching(load_browse_order(_backend, sort, live), selected)
+
+
+@shared_result
+def browse_page(_backend, filters, query, sort, page):
+    """One page of the record browser: its rows with a body preview, and each row's ``pos``."""
+    positions = browse_positions(_backend, filters, query, sort)[page * PAGE_ROWS:(page + 1) * PAGE_ROWS]
+    rows = _backend.take(positions, TABLE_COLUMNS)
+    return rows.assign(date=rows["date"].dt.strftime("%Y-%m-%d"), body=preview(rows["body"]), pos=positions)
+
+
+# Filter presets most viewers start from. With DASHBOARD_WARMUP=1 every
+# section's default view of each preset is computed once per process, in the
+# background, so the first viewers find them cached.
+WARMUP = os.environ.get("DASHBOARD_WARMUP") == "1"
+
+def preset_filters(bounds):
+    everything = FilterState(
+        start=bounds.min_date,
+        end=bounds.max_date,
+        subreddits=tuple(bounds.subreddits),
+        content_type="All",
+        tiers=tuple(bounds.tiers),
     )
-    .properties(height=350)
-)
+    federal = everything._replace(subreddits=tuple(s for s in bounds.subreddits if s in FEDERAL_SUBREDDITS))
+    return [
+        everything,
+        everything._replace(content_type="Comments only"),
+        everything._replace(content_type="Posts only"),
+        federal,
+        federal._replace(content_type="Comments only"),
+    ]
 
-volume_chart = (bars + policy_rules_and_labels()).interactive()
-st.altair_chart(volume_chart, use_container_width=True)
+# Each section with the extra arguments its default widget values pass
+WARMUP_SECTIONS = [
+    (count_records, ()),
+    (event_study_data, (30,)),
+    (sentiment_data, ()),
+    (subreddit_intervals, ()),
+    (trend_intervals, ("month",)),
+    (frame_data, ()),
+    (frame_intervals, ()),
+    (keyword_data, ()),
+    (thread_data, ()),
+    (reply_data, ()),
+    (top_quotes, (5,)),
+    (browse_page, ("", DEFAULT_SORT, 0)),
+]
 
-# Policy events legend with context — dot colors match chart lines
-st.markdown("""
-<div class="policy-legend">
-    <div class="legend-title">Policy Milestones</div>
-    <span class="policy-dot" style="background:#2980B9"></span><strong>Maryland (Mar 2022)</strong> — First state to
-    eliminate four-year degree requirements for thousands of state government positions,
-    launching a wave of executive action nationwide.<br>
-    <span class="policy-dot" style="background:#E67E22"></span><strong>Colorado (Apr 2022)</strong> — Governor Polis
-    signed an executive order directing state agencies to adopt skills-based hiring practices
-    and review existing degree requirements.<br>
-    <span class="policy-dot" style="background:#8E44AD"></span><strong>15 states committed (mid-2023)</strong> — By
-    mid-2023, governors from both parties had signed skills-based hiring orders or legislation,
-    representing the tipping point identified in Heck et al. (2024).<br>
-    <span class="policy-dot" style="background:#27AE60"></span><strong>Connecticut (Jun 2024)</strong> — Signed
-    skills-first hiring into law, moving beyond executive order to durable legislation — a
-    signal that reform is becoming institutionalized rather than administration-dependent.
-</div>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def start_warmup(_backend):
+    # Runs outside any session, so it fills the cache directly rather than
+    # through the session-bound wrappers
+    cache = result_cache()
 
-st.markdown("""
-<div class="takeaway">
-    <strong>Takeaway:</strong> Discussion volume is not uniformly distributed — it clusters
-    around policy events and workforce disruptions. The Maryland executive order in March 2022
-    coincides with the beginning of sustained engagement in federal employment subreddits.
-    Notably, some discourse spikes <em>precede</em> formal state action, suggesting that
-    public pressure and media coverage may be contributing to the policy momentum documented
-    by Heck et al. The mid-2023 period — when 15 states had committed — marks an inflection
-    point in both policy and discourse.
-</div>
-""", unsafe_allow_html=True)
+    def warm():
+        for filters in preset_filters(_backend.bounds()):
+            for section, args in WARMUP_SECTIONS:
+                fn = section.compute
+                cache.get(result_key(fn, filters, *args), lambda: fn(_backend, filters, *args))
+        logger.info("Result cache warmed: %s", cache.stats())
 
-# ── Section 3: Sentiment Landscape ───────────────────────────────────────────
-st.markdown("---")
-st.markdown("## Sentiment Landscape")
-st.markdown('<p class="research-q">How does the tone of discourse vary across communities?</p>', unsafe_allow_html=True)
+    thread = threading.Thread(target=warm, name="result-cache-warmup", daemon=True)
+    thread.start()
+    return thread
 
-st.markdown("""
-Blair et al. (2021) argued that the "paper ceiling" is sustained not just by formal
-requirements but by cultural assumptions about degree-holders' competence. If those
-assumptions are shifting in public discourse, we would expect sentiment toward skills-based
-hiring to be broadly positive — but the degree of positivity may vary by community context.
-""")
+if WARMUP:
+    start_warmup(backend)
 
-col_left, col_right = st.columns(2)
 
-# Left: Average sentiment by subreddit (horizontal bar)
-sub_sentiment = (
-    filtered.groupby("subreddit")["sentiment_score"]
-    .mean()
-    .reset_index()
-    .sort_values("sentiment_score")
-)
+def export_records(filters, matches, sort, fmt):
+    """The record browser's rows as a file in ``fmt``; runs when a download button is clicked.
+
+    Not cached: each click streams a fresh export, and nothing is held between reruns.
+    """
+    return export_file(backend.export_batches(filters, matches, sort), fmt)
+
+
+# Rolling windows are sampled at most this many times per series, so the
+# chart spec stays small however long the selected date range is.
+ROLLING_POINTS = 400
+
+
+def time_series(filters, by, index=None):
+    """Per-period totals at the sidebar granularity, from a prefix-sum index (default: the main one).
+
+    Not cached: differencing prefix sums costs the same at any corpus size.
+    """
+    step = -(-((filters.end - filters.start).days + 1) // ROLLING_POINTS)
+    series = (index or time_index).series(filters, granularity.lower(), by=by, window=rolling_days, step=step)
+    diag.stage(f"time_series:{by}", len(series))
+    return series
+
 
-with col_left:
-    st.markdown("#### Average Sentiment by Subreddit")
-    sent_bar = (
-        alt.Chart(sub_sentiment)
-        .mark_bar(cornerRadiusEnd=3)
+def period_axis():
+    """X encoding and tooltip for the ``period`` column at the current granularity."""
+    title = f"{rolling_days}-day window ending" if granularity == "Rolling" else granularity
+    tooltip_format = "%B %Y" if granularity == "Month" else "%b %d, %Y"
+    return (
+        alt.X("period:T", title=title, axis=alt.Axis(format="%b %Y")),
+        alt.Tooltip("period:T", title=title, format=tooltip_format),
+    )
+
+
+INTERVAL_NOTE = f"{CONFIDENCE:.0%} bootstrap confidence intervals of the mean ({RESAMPLES:,} resamples per group)."
+INTERVAL_TOOLTIPS = [
+    alt.Tooltip("ci_low:Q", title=f"{CONFIDENCE:.0%} CI low", format=".3f"),
+    alt.Tooltip("ci_high:Q", title=f"{CONFIDENCE:.0%} CI high", format=".3f"),
+]
+
+
+def with_intervals(means, intervals, keys):
+    """``means`` with the ``ci_low``/``ci_high`` bounds of its group from ``bootstrap_means``."""
+    bounds = intervals[[*keys, "ci_low", "ci_high"]]
+    return means.merge(bounds, on=keys, how="left")
+
+
+# ── Section Renderers ────────────────────────────────────────────────────────
+# Sections live in tabs that rerun on selection, so only the open tab's
+# renderer executes on each interaction.
+
+# Section 2: Discourse Volume & Policy Events
+def render_volume(filters):
+    st.markdown("## Discourse Volume & Policy Events")
+    st.markdown('<p class="research-q">Does online discussion of skills-based hiring track with real-world policy action?</p>', unsafe_allow_html=True)
+
+    st.markdown("""
+    Heck et al. (2024) found that state-level commitments to skills-based hiring produced a
+    measurable 2.5 percentage-point annual decline in degree-required job postings. If policy
+    is moving the needle on employer behavior, we should expect public discourse to reflect
+    that shift. The chart below overlays four key policy milestones against Reddit discussion
+    volume; the sidebar sets the time granularity.
+    """)
+
+    volume = time_series(filters, by="type")
+    x, period_tooltip = period_axis()
+
+    base = alt.Chart(volume[["period", "type", "count"]])
+    mark = base.mark_area(opacity=0.85) if granularity == "Rolling" else base.mark_bar(opacity=0.85)
+    bars = (
+        mark
         .encode(
-            y=alt.Y("subreddit:N", title=None, sort=alt.EncodingSortField("sentiment_score", order="ascending")),
-            x=alt.X("sentiment_score:Q", title="Average Sentiment"),
-            color=alt.condition(
-                alt.datum.sentiment_score > 0,
-                alt.value("#2C3E50"),
-                alt.value("#C0392B"),
+            x=x,
+            y=alt.Y("count:Q", title="Records", stack="zero"),
+            color=alt.Color(
+                "type:N",
+                title="Type",
+                scale=alt.Scale(domain=["post", "comment"], range=["#2C3E50", "#7F8C8D"]),
             ),
-            tooltip=["subreddit:N", alt.Tooltip("sentiment_score:Q", format=".3f")],
+            tooltip=[period_tooltip, "type:N", "count:Q"],
         )
-        .properties(height=250)
+        .properties(height=350)
     )
-    st.altair_chart(sent_bar, use_container_width=True)
-
-# Right: Sentiment distribution histogram for filtered data
-with col_right:
-    st.markdown("#### Sentiment Distribution")
-    sent_hist = (
-        alt.Chart(filtered)
-        .mark_bar(opacity=0.8, cornerRadiusEnd=2)
+
+    volume_chart = (bars + policy_overlay()).interactive()
+    show_chart(volume_chart, "volume")
+
+    # Policy events legend with context — dot colors match chart lines
+    st.markdown("""
+    <div class="policy-legend">
+        <div class="legend-title">Policy Milestones</div>
+        <span class="policy-dot" style="background:#2980B9"></span><strong>Maryland (Mar 2022)</strong> — First state to
+        eliminate four-year degree requirements for thousands of state government positions,
+        launching a wave of executive action nationwide.<br>
+        <span class="policy-dot" style="background:#E67E22"></span><strong>Colorado (Apr 2022)</strong> — Governor Polis
+        signed an executive order directing state agencies to adopt skills-based hiring practices
+        and review existing degree requirements.<br>
+        <span class="policy-dot" style="background:#8E44AD"></span><strong>15 states committed (mid-2023)</strong> — By
+        mid-2023, governors from both parties had signed skills-based hiring orders or legislation,
+        representing the tipping point identified in Heck et al. (2024).<br>
+        <span class="policy-dot" style="background:#27AE60"></span><strong>Connecticut (Jun 2024)</strong> — Signed
+        skills-first hiring into law, moving beyond executive order to durable legislation — a
+        signal that reform is becoming institutionalized rather than administration-dependent.
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+    <div class="takeaway">
+        <strong>Takeaway:</strong> Discussion volume is not uniformly distributed — it clusters
+        around policy events and workforce disruptions. The Maryland executive order in March 2022
+        coincides with the beginning of sustained engagement in federal employment subreddits.
+        Notably, some discourse spikes <em>precede</em> formal state action, suggesting that
+        public pressure and media coverage may be contributing to the policy momentum documented
+        by Heck et al. The mid-2023 period — when 15 states had committed — marks an inflection
+        point in both policy and discourse.
+    </div>
+    """, unsafe_allow_html=True)
+
+    render_event_study(filters)
+    render_change_points(filters)
+
+
+def render_event_study(filters):
+    st.markdown("#### Event Study: Before vs. After Each State Action")
+    st.markdown("""
+    For every state action in the policy timeline, compare the window before the event with
+    the same-length window after it — per subreddit and per keyword.
+    """)
+
+    col_window, col_group, col_metric = st.columns(3)
+    window_days = col_window.select_slider("Window (days)", options=[7, 14, 30, 60, 90], value=30)
+    group_type = col_group.radio("Compare by", ["Subreddit", "Keyword"], horizontal=True)
+    metric = col_metric.radio("Metric", ["Volume change %", "Sentiment change"], horizontal=True)
+
+    study = event_study_data(backend, filters, window_days)
+    field = "volume_pct_change" if metric == "Volume change %" else "sentiment_delta"
+    study = study.assign(event=study["date"].dt.strftime("%Y-%m-%d") + " " + study["state"])
+
+    grid = study[study["group_type"] == group_type.lower()]
+    heatmap = (
+        alt.Chart(grid[["event", "group", field, "pre_count", "post_count"]])
+        .mark_rect(cornerRadius=2)
         .encode(
-            x=alt.X("sentiment_score:Q", bin=alt.Bin(maxbins=30), title="Sentiment Score"),
-            y=alt.Y("count():Q", title="Count"),
-            color=alt.value("#2C3E50"),
-            tooltip=["count():Q"],
+            x=alt.X("group:N", title=None),
+            y=alt.Y("event:N", title=None, sort="ascending"),
+            color=alt.Color(
+                f"{field}:Q",
+                title=metric,
+                scale=alt.Scale(scheme="redblue", domainMid=0),
+            ),
+            tooltip=[
+                "event:N",
+                "group:N",
+                alt.Tooltip("pre_count:Q", title="Before"),
+                alt.Tooltip("post_count:Q", title="After"),
+                alt.Tooltip(f"{field}:Q", title=metric, format=".2f"),
+            ],
         )
-        .properties(height=250)
+        .properties(height=max(250, 16 * grid["event"].nunique()))
+    )
+    show_chart(heatmap, "event_study")
+
+    overall = study[study["group_type"] == "all"]
+    st.dataframe(
+        overall[["event", "label", "pre_count", "post_count", "volume_pct_change", "pre_sentiment", "post_sentiment", "sentiment_delta"]],
+        column_config={
+            "event": st.column_config.TextColumn("Event", width="medium"),
+            "label": st.column_config.TextColumn("Action", width="medium"),
+            "pre_count": st.column_config.NumberColumn("Before", width="small"),
+            "post_count": st.column_config.NumberColumn("After", width="small"),
+            "volume_pct_change": st.column_config.NumberColumn("Volume Δ %", format="%.1f"),
+            "pre_sentiment": st.column_config.NumberColumn("Sentiment before", format="%.3f"),
+            "post_sentiment": st.column_config.NumberColumn("Sentiment after", format="%.3f"),
+            "sentiment_delta": st.column_config.NumberColumn("Sentiment Δ", format="%.3f"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(
+        f"Windows are the {window_days} days before each event date and the {window_days} days "
+        "from it onward. Events close together have overlapping windows, so deltas describe "
+        "co-occurrence, not causal effects."
     )
-    st.altair_chart(sent_hist, use_container_width=True)
 
-st.markdown("""
-<div class="takeaway">
-    <strong>Takeaway:</strong> Overall sentiment skews positive, consistent with the
-    finding from Blair et al. (2021) that public awareness of STARs is growing alongside
-    support for reform. However, the distribution reveals a long negative tail — a
-    meaningful minority of records express frustration, skepticism, or hostility. Subreddit
-    averages mask this variance: a community like r/feddiscussion may appear neutral on
-    average while containing both strong advocates and vocal skeptics. The histogram on the
-    right shows this bimodal tendency more clearly than the averages alone.
-</div>
-""", unsafe_allow_html=True)
 
-# Sentiment over time
-st.markdown("#### Sentiment Trends Over Time")
-monthly_sent = (
-    filtered.groupby(["month", "subreddit"])["sentiment_score"]
-    .mean()
-    .reset_index()
-)
+def render_change_points(filters):
+    st.markdown("#### Detected Change Points")
+    st.markdown("""
+    Instead of eyeballing the charts for dips and surges, an online CUSUM detector follows the
+    daily volume and mean sentiment of every subreddit and keyword and flags the days where the
+    level shifts. Each change point is matched to the nearest state action in the policy timeline.
+    """)
 
-sentiment_time = (
-    alt.Chart(monthly_sent)
-    .mark_line(point=alt.OverlayMarkDef(size=30), strokeWidth=2)
-    .encode(
-        x=alt.X("month:T", title="Month", axis=alt.Axis(format="%b %Y")),
-        y=alt.Y("sentiment_score:Q", title="Avg Sentiment"),
-        color=alt.Color("subreddit:N", title="Subreddit"),
+    col_group, col_metric = st.columns(2)
+    series = col_group.radio("Series", ["All records", "Subreddit", "Keyword"], horizontal=True)
+    group_type = {"All records": "all", "Subreddit": "subreddit", "Keyword": "keyword"}[series]
+    metric = col_metric.radio("Signal", ["Volume", "Sentiment"], horizontal=True)
+
+    changes = load_change_points(live)
+    start, end = pd.Timestamp(filters.start), pd.Timestamp(filters.end)
+    shown = changes[
+        (changes["group_type"] == group_type)
+        & (changes["metric"] == metric.lower())
+        & changes["date"].between(start, end)
+    ]
+    if group_type == "subreddit":
+        shown = shown[shown["group"].isin(filters.subreddits)]
+    if shown.empty:
+        st.info("No change points detected for these series in the selected date range.")
+        return
+
+    shown = shown.assign(shift=np.where(shown["direction"] > 0, "rise", "drop"))
+    events = policy_events[policy_events["date"].between(start, end)][["date", "label"]]
+    rules = alt.Chart(events).mark_rule(strokeDash=[4, 4], color="#95A5A6").encode(
+        x="date:T",
+        tooltip=[alt.Tooltip("date:T", title="Policy event", format="%b %d, %Y"), "label:N"],
+    )
+    points = alt.Chart(shown[["date", "group", "shift", "baseline", "value", "nearest_event", "lag_days"]]).mark_point(
+        size=90, filled=True,
+    ).encode(
+        x=alt.X("date:T", title=None, axis=alt.Axis(format="%b %Y")),
+        y=alt.Y("group:N", title=None),
+        shape=alt.Shape("shift:N", title="Shift", scale=alt.Scale(domain=["rise", "drop"], range=["triangle-up", "triangle-down"])),
+        color=alt.Color("shift:N", title="Shift", scale=alt.Scale(domain=["rise", "drop"], range=["#27AE60", "#C0392B"])),
         tooltip=[
-            alt.Tooltip("month:T", title="Month", format="%B %Y"),
-            "subreddit:N",
-            alt.Tooltip("sentiment_score:Q", format=".3f"),
+            alt.Tooltip("date:T", format="%b %d, %Y"),
+            "group:N",
+            "shift:N",
+            alt.Tooltip("baseline:Q", title="Baseline", format=".3f"),
+            alt.Tooltip("value:Q", title="Day value", format=".3f"),
+            alt.Tooltip("nearest_event:N", title="Nearest event"),
+            alt.Tooltip("lag_days:Q", title="Days after event"),
         ],
     )
-    .properties(height=350)
-    .interactive()
-)
-st.altair_chart(sentiment_time, use_container_width=True)
+    show_chart((rules + points).properties(height=max(160, 28 * shown["group"].nunique())).interactive(),
+               "change_points")
 
-st.markdown("""
-<div class="takeaway">
-    <strong>Takeaway:</strong> Sentiment is not static. Periods of RIF-related anxiety
-    (visible as sharp dips) depress sentiment across multiple communities simultaneously,
-    suggesting that workforce reduction discourse contaminates the broader conversation
-    around hiring reform. This aligns with a key concern in the Heck et al. (2024) analysis:
-    that skills-based hiring risks being associated with cost-cutting rather than opportunity
-    expansion if messaging is not carefully separated.
-</div>
-""", unsafe_allow_html=True)
+    matched = int(shown["matched"].sum())
+    chance = event_coverage(policy_events, start, end)
+    st.caption(
+        f"{matched} of {len(shown)} change points ({matched / len(shown):.0%}) fall within {MATCH_DAYS} days "
+        f"of a state action; {chance:.0%} would by chance, given how much of the range lies that close to one. "
+        "Dashed lines mark the policy events."
+    )
 
-# ── Section 4: Discourse Framing Analysis ────────────────────────────────────
-st.markdown("---")
-st.markdown("## Discourse Framing Analysis")
-st.markdown('<p class="research-q">What frames dominate the conversation — and do they align with the academic findings?</p>', unsafe_allow_html=True)
 
-st.markdown("""
-Academic research on skills-based hiring operates within specific frames — equity for
-STARs, the paper ceiling, and the policy mechanics of degree requirement removal. But
-public discourse may organize itself differently. This section classifies each record into
-five discourse frames using pattern matching, revealing how Reddit users actually talk about
-these issues compared to how researchers do.
-""")
+# Section 3: Sentiment Landscape
+def render_sentiment(filters):
+    st.markdown("## Sentiment Landscape")
+    st.markdown('<p class="research-q">How does the tone of discourse vary across communities?</p>', unsafe_allow_html=True)
 
-FRAMES = {
-    "Reform Advocacy": r"(?i)(?:skills?.based|STARs|paper.ceiling|remove.degree|hiring.reform)",
-    "Skepticism & Barriers": r"(?i)(?:won'?t.change|HR.push.?back|classification.system|OPM|bureaucra)",
-    "RIF & Workforce Cuts": r"(?i)(?:\bRIF\b|layoff|DOGE|reduction.in.force|\bfired\b)",
-    "Practitioner Experience": r"(?i)(?:hired|my.team|my.agency|GS-\d|I'?ve.seen|in.my.experience)",
-    "Career Transition": r"(?i)(?:career.chang|transition|military.to.civilian|no.degree)",
-}
+    st.markdown("""
+    Blair et al. (2021) argued that the "paper ceiling" is sustained not just by formal
+    requirements but by cultural assumptions about degree-holders' competence. If those
+    assumptions are shifting in public discourse, we would expect sentiment toward skills-based
+    hiring to be broadly positive — but the degree of positivity may vary by community context.
+    """)
 
-# Vectorized frame classification
-frame_dfs = []
-for frame, pattern in FRAMES.items():
-    matches = filtered[filtered["body"].str.contains(pattern, na=False)]
-    if not matches.empty:
-        chunk = matches[["month", "sentiment_score"]].copy()
-        chunk["frame"] = frame
-        frame_dfs.append(chunk)
-
-if frame_dfs:
-    frame_df = pd.concat(frame_dfs, ignore_index=True)
-
-    # Frame distribution
-    frame_counts = frame_df["frame"].value_counts().reset_index()
-    frame_counts.columns = ["frame", "count"]
-
-    col_f1, col_f2 = st.columns(2)
-
-    with col_f1:
-        st.markdown("#### Frame Distribution")
-        frame_bar = (
-            alt.Chart(frame_counts)
-            .mark_bar(cornerRadiusEnd=3)
-            .encode(
-                y=alt.Y("frame:N", title=None, sort=alt.EncodingSortField("count", order="descending")),
-                x=alt.X("count:Q", title="Records matching frame"),
-                color=alt.Color("frame:N", legend=None),
-                tooltip=["frame:N", "count:Q"],
-            )
-            .properties(height=250)
-        )
-        st.altair_chart(frame_bar, use_container_width=True)
-
-    # Frame x Sentiment heatmap
-    with col_f2:
-        st.markdown("#### Avg Sentiment by Frame")
-        frame_sent = (
-            frame_df.groupby("frame")["sentiment_score"]
-            .mean()
-            .reset_index()
-            .sort_values("sentiment_score")
+    col_left, col_right = st.columns(2)
+
+    sub_sentiment, sent_bins = sentiment_data(backend, filters)
+    sub_sentiment = with_intervals(sub_sentiment, subreddit_intervals(backend, filters), ["subreddit"])
+
+    # Left: Average sentiment by subreddit (horizontal bar) with bootstrap error bars
+    with col_left:
+        st.markdown("#### Average Sentiment by Subreddit")
+        sent_base = alt.Chart(sub_sentiment).encode(
+            y=alt.Y("subreddit:N", title=None, sort=alt.EncodingSortField("sentiment_score", order="ascending")),
         )
-        heatmap = (
-            alt.Chart(frame_sent)
-            .mark_bar(cornerRadiusEnd=3)
-            .encode(
-                y=alt.Y("frame:N", title=None, sort=alt.EncodingSortField("sentiment_score", order="ascending")),
+        sent_bar = alt.layer(
+            sent_base.mark_bar(cornerRadiusEnd=3).encode(
                 x=alt.X("sentiment_score:Q", title="Average Sentiment"),
-                color=alt.Color(
-                    "sentiment_score:Q",
-                    title="Sentiment",
-                    scale=alt.Scale(scheme="redyellowgreen", domain=[-0.2, 0.4]),
+                color=alt.condition(
+                    alt.datum.sentiment_score > 0,
+                    alt.value("#2C3E50"),
+                    alt.value("#C0392B"),
                 ),
-                tooltip=["frame:N", alt.Tooltip("sentiment_score:Q", format=".3f")],
+                tooltip=["subreddit:N", alt.Tooltip("sentiment_score:Q", format=".3f"), *INTERVAL_TOOLTIPS],
+            ),
+            sent_base.mark_errorbar(ticks=True, color="#7F8C8D").encode(
+                x=alt.X("ci_low:Q", title="Average Sentiment"),
+                x2="ci_high:Q",
+            ),
+        ).properties(height=250)
+        show_chart(sent_bar, "subreddit_sentiment")
+        st.caption(f"Error bars: {INTERVAL_NOTE}")
+
+    # Right: Sentiment distribution histogram for filtered data
+    with col_right:
+        st.markdown("#### Sentiment Distribution")
+        sent_hist = (
+            alt.Chart(sent_bins)
+            .mark_bar(opacity=0.8, cornerRadiusEnd=2)
+            .encode(
+                x=alt.X("bin_start:Q", bin="binned", title="Sentiment Score"),
+                x2="bin_end:Q",
+                y=alt.Y("count:Q", title="Count"),
+                color=alt.value("#2C3E50"),
+                tooltip=[
+                    alt.Tooltip("bin_start:Q", title="From", format=".2f"),
+                    alt.Tooltip("bin_end:Q", title="To", format=".2f"),
+                    "count:Q",
+                ],
             )
             .properties(height=250)
         )
-        st.altair_chart(heatmap, use_container_width=True)
+        show_chart(sent_hist, "sentiment_histogram")
 
     st.markdown("""
     <div class="takeaway">
-        <strong>Takeaway:</strong> Reform Advocacy is the most prevalent frame, which is
-        encouraging — the discourse is primarily oriented around solutions rather than
-        grievances. But the sentiment gap between frames is striking. Practitioner Experience
-        and Career Transition records tend to be positive: people sharing success stories
-        and offering practical guidance. RIF &amp; Workforce Cuts discourse, by contrast,
-        carries the most negative sentiment. This pattern matters for policy communications:
-        Blair et al. (2021) emphasized that STARs succeed when given the opportunity, but
-        if the loudest negative signal in public discourse comes from workforce reduction
-        rather than from doubts about STARs' competence, then the messaging challenge is
-        about <em>decoupling reform from austerity</em>, not about proving STARs' value.
+        <strong>Takeaway:</strong> Overall sentiment skews positive, consistent with the
+        finding from Blair et al. (2021) that public awareness of STARs is growing alongside
+        support for reform. However, the distribution reveals a long negative tail — a
+        meaningful minority of records express frustration, skepticism, or hostility. Subreddit
+        averages mask this variance: a community like r/feddiscussion may appear neutral on
+        average while containing both strong advocates and vocal skeptics. The histogram on the
+        right shows this bimodal tendency more clearly than the averages alone.
     </div>
     """, unsafe_allow_html=True)
 
-    # Frame trends over time
-    st.markdown("#### Frame Trends Over Time")
-    frame_time = (
-        frame_df.groupby(["month", "frame"])
-        .size()
-        .reset_index(name="count")
+    # Sentiment over time
+    st.markdown("#### Sentiment Trends Over Time")
+    sentiment_series = time_series(filters, by="subreddit")[["period", "subreddit", "sentiment_score"]]
+    x, period_tooltip = period_axis()
+    # Rolling windows overlap, so bands are only drawn for calendar periods
+    banded = granularity != "Rolling"
+    if banded:
+        intervals = trend_intervals(backend, filters, granularity.lower())
+        sentiment_series = with_intervals(sentiment_series, intervals, ["period", "subreddit"])
+    sentiment_base = alt.Chart(sentiment_series).encode(x=x, color=alt.Color("subreddit:N", title="Subreddit"))
+    sentiment_lines = sentiment_base.mark_line(
+        point=alt.OverlayMarkDef(size=30) if granularity in ("Week", "Month") else False, strokeWidth=2,
+    ).encode(
+        y=alt.Y("sentiment_score:Q", title="Avg Sentiment"),
+        tooltip=[
+            period_tooltip,
+            "subreddit:N",
+            alt.Tooltip("sentiment_score:Q", format=".3f"),
+            *(INTERVAL_TOOLTIPS if banded else []),
+        ],
     )
-    frame_area = (
-        alt.Chart(frame_time)
-        .mark_area(opacity=0.7)
+    layers = [sentiment_lines]
+    if banded:
+        layers.insert(0, sentiment_base.mark_area(opacity=0.12).encode(y="ci_low:Q", y2="ci_high:Q"))
+    sentiment_time = alt.layer(*layers).properties(height=350).interactive()
+    show_chart(sentiment_time, "sentiment_trend")
+    if banded:
+        st.caption(f"Shaded bands: {INTERVAL_NOTE}")
+
+    st.markdown("""
+    <div class="takeaway">
+        <strong>Takeaway:</strong> Sentiment is not static. Periods of RIF-related anxiety
+        (visible as sharp dips) depress sentiment across multiple communities simultaneously,
+        suggesting that workforce reduction discourse contaminates the broader conversation
+        around hiring reform. This aligns with a key concern in the Heck et al. (2024) analysis:
+        that skills-based hiring risks being associated with cost-cutting rather than opportunity
+        expansion if messaging is not carefully separated.
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# Section 4: Discourse Framing Analysis
+def render_frames(filters):
+    st.markdown("## Discourse Framing Analysis")
+    st.markdown('<p class="research-q">What frames dominate the conversation — and do they align with the academic findings?</p>', unsafe_allow_html=True)
+
+    st.markdown("""
+    Academic research on skills-based hiring operates within specific frames — equity for
+    STARs, the paper ceiling, and the policy mechanics of degree requirement removal. But
+    public discourse may organize itself differently. This section classifies each record into
+    five discourse frames using pattern matching, revealing how Reddit users actually talk about
+    these issues compared to how researchers do.
+    """)
+
+    frame_counts, frame_sent, frame_time = frame_data(backend, filters)
+    frame_sent = with_intervals(frame_sent, frame_intervals(backend, filters), ["frame"])
+
+    if not frame_counts.empty:
+        col_f1, col_f2 = st.columns(2)
+
+        with col_f1:
+            st.markdown("#### Frame Distribution")
+            frame_bar = (
+                alt.Chart(frame_counts)
+                .mark_bar(cornerRadiusEnd=3)
+                .encode(
+                    y=alt.Y("frame:N", title=None, sort=alt.EncodingSortField("count", order="descending")),
+                    x=alt.X("count:Q", title="Records matching frame"),
+                    color=alt.Color("frame:N", legend=None),
+                    tooltip=["frame:N", "count:Q"],
+                )
+                .properties(height=250)
+            )
+            show_chart(frame_bar, "frame_distribution")
+
+        # Frame x Sentiment heatmap
+        with col_f2:
+            st.markdown("#### Avg Sentiment by Frame")
+            frame_base = alt.Chart(frame_sent).encode(
+                y=alt.Y("frame:N", title=None, sort=alt.EncodingSortField("sentiment_score", order="ascending")),
+            )
+            heatmap = alt.layer(
+                frame_base.mark_bar(cornerRadiusEnd=3).encode(
+                    x=alt.X("sentiment_score:Q", title="Average Sentiment"),
+                    color=alt.Color(
+                        "sentiment_score:Q",
+                        title="Sentiment",
+                        scale=alt.Scale(scheme="redyellowgreen", domain=[-0.2, 0.4]),
+                    ),
+                    tooltip=["frame:N", alt.Tooltip("sentiment_score:Q", format=".3f"), *INTERVAL_TOOLTIPS],
+                ),
+                frame_base.mark_errorbar(ticks=True, color="#7F8C8D").encode(
+                    x=alt.X("ci_low:Q", title="Average Sentiment"),
+                    x2="ci_high:Q",
+                ),
+            ).properties(height=250)
+            show_chart(heatmap, "frame_sentiment")
+            st.caption(f"Error bars: {INTERVAL_NOTE}")
+
+        st.markdown("""
+        <div class="takeaway">
+            <strong>Takeaway:</strong> Reform Advocacy is the most prevalent frame, which is
+            encouraging — the discourse is primarily oriented around solutions rather than
+            grievances. But the sentiment gap between frames is striking. Practitioner Experience
+            and Career Transition records tend to be positive: people sharing success stories
+            and offering practical guidance. RIF &amp; Workforce Cuts discourse, by contrast,
+            carries the most negative sentiment. This pattern matters for policy communications:
+            Blair et al. (2021) emphasized that STARs succeed when given the opportunity, but
+            if the loudest negative signal in public discourse comes from workforce reduction
+            rather than from doubts about STARs' competence, then the messaging challenge is
+            about <em>decoupling reform from austerity</em>, not about proving STARs' value.
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Frame trends over time
+        st.markdown("#### Frame Trends Over Time")
+        frame_area = (
+            alt.Chart(frame_time)
+            .mark_area(opacity=0.7)
+            .encode(
+                x=alt.X("month:T", title="Month", axis=alt.Axis(format="%b %Y")),
+                y=alt.Y("count:Q", title="Records", stack="zero"),
+                color=alt.Color("frame:N", title="Frame"),
+                tooltip=[
+                    alt.Tooltip("month:T", title="Month", format="%B %Y"),
+                    "frame:N",
+                    "count:Q",
+                ],
+            )
+            .properties(height=350)
+            .interactive()
+        )
+        show_chart(frame_area, "frame_trend")
+
+        st.caption(
+            "A single record can match multiple frames. Frame classification uses pattern "
+            "matching against key terms associated with each discourse category."
+        )
+
+        st.markdown("""
+        <div class="takeaway">
+            <strong>Takeaway:</strong> The composition of discourse shifts over time. RIF-related
+            discussion tends to cluster in specific periods — often aligned with federal workforce
+            reduction announcements — rather than being a constant background hum. When RIF
+            discourse surges, it can temporarily dominate the conversation and crowd out Reform
+            Advocacy, creating windows where the public narrative around skills-based hiring
+            turns negative even though the underlying policy trend is positive.
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.info("No discourse frames matched in the filtered data.")
+
+    if topic_model is not None:
+        render_topics(filters)
+
+
+def render_topics(filters):
+    labels, index = topic_model
+    st.markdown("#### Emergent Topics Over Time")
+    st.markdown("""
+    Frames are defined in advance; topics are learned from the corpus itself. A non-negative
+    matrix factorization of the records' TF-IDF vectors groups words that tend to appear
+    together, and each record is assigned its strongest topic. Topics are named by their
+    highest-weighted terms.
+    """)
+    series = time_series(filters, "topic_id", index=index)
+    series = series[series["topic_id"] != "-1"]
+    if series.empty:
+        st.info("No records in the filtered data were assigned a topic.")
+        return
+    topic_names = {str(i): f"{i + 1}. {', '.join(terms[:3])}" for i, terms in enumerate(labels)}
+    series = series.assign(topic=series["topic_id"].map(topic_names))
+    x, period_tooltip = period_axis()
+    topic_area = (
+        alt.Chart(series[["period", "topic", "count"]])
+        .mark_area(opacity=0.75)
         .encode(
-            x=alt.X("month:T", title="Month", axis=alt.Axis(format="%b %Y")),
+            x=x,
             y=alt.Y("count:Q", title="Records", stack="zero"),
-            color=alt.Color("frame:N", title="Frame"),
-            tooltip=[
-                alt.Tooltip("month:T", title="Month", format="%B %Y"),
-                "frame:N",
-                "count:Q",
-            ],
+            color=alt.Color("topic:N", title="Topic", scale=alt.Scale(scheme="tableau10")),
+            tooltip=[period_tooltip, "topic:N", "count:Q"],
         )
         .properties(height=350)
         .interactive()
     )
-    st.altair_chart(frame_area, use_container_width=True)
-
+    show_chart(topic_area, "topic_trend")
     st.caption(
-        "A single record can match multiple frames. Frame classification uses pattern "
-        "matching against key terms associated with each discourse category."
+        "Each record counts once, under its strongest topic. Records with no modelled terms are "
+        "left out. Counts follow the sidebar filters and time-series granularity."
     )
 
-    st.markdown("""
-    <div class="takeaway">
-        <strong>Takeaway:</strong> The composition of discourse shifts over time. RIF-related
-        discussion tends to cluster in specific periods — often aligned with federal workforce
-        reduction announcements — rather than being a constant background hum. When RIF
-        discourse surges, it can temporarily dominate the conversation and crowd out Reform
-        Advocacy, creating windows where the public narrative around skills-based hiring
-        turns negative even though the underlying policy trend is positive.
-    </div>
-    """, unsafe_allow_html=True)
-else:
-    st.info("No discourse frames matched in the filtered data.")
 
-# ── Section 5: Keyword Trends in Context ─────────────────────────────────────
-st.markdown("---")
-st.markdown("## Keyword Trends in Context")
-st.markdown('<p class="research-q">Are key terms from the academic literature gaining traction in public discourse?</p>', unsafe_allow_html=True)
+# Section 5: Keyword Trends in Context
+def render_keywords(filters):
+    st.markdown("## Keyword Trends in Context")
+    st.markdown('<p class="research-q">Are key terms from the academic literature gaining traction in public discourse?</p>', unsafe_allow_html=True)
 
-st.markdown("""
-The research of Blair et al. (2021) introduced "STARs" and "paper ceiling" as organizing
-concepts for the skills-based hiring movement. Heck et al. (2024) tracked policy adoption.
-But policy impact depends partly on whether these ideas reach the people they aim to help.
-This section tracks how six key terms from the academic literature appear in Reddit
-discourse over time.
-""")
+    st.markdown("""
+    The research of Blair et al. (2021) introduced "STARs" and "paper ceiling" as organizing
+    concepts for the skills-based hiring movement. Heck et al. (2024) tracked policy adoption.
+    But policy impact depends partly on whether these ideas reach the people they aim to help.
+    This section tracks how six key terms from the academic literature appear in Reddit
+    discourse over time. Pick other words or phrases to chart them instead.
+    """)
 
-keywords = {
-    "skills-based": r"(?i)skills?.based",
-    "STARs": r"(?i)\bstars?\b",
-    "degree requirement": r"(?i)degree.?require",
-    "paper ceiling": r"(?i)paper.ceiling",
-    "competency": r"(?i)competen",
-    "RIF": r"(?i)\brif\b",
-}
+    picked = st.multiselect(
+        "Terms",
+        term_options(live),
+        accept_new_options=True,
+        placeholder="The six literature keywords",
+        key="keyword_terms",
+        help=f"Any word or two-word phrase used in at least {TERM_MIN_DF} records. "
+             "Leave empty for the curated keywords.",
+    )
+    if picked:
+        index = load_terms(live)
+        normalized = [term for term in dict.fromkeys(index.normalize(term) for term in picked) if term]
+        columns = index.lookup(normalized)
+        missing = [term for term, column in zip(normalized, columns) if column < 0]
+        if missing:
+            st.caption(f"Not in the term index: {', '.join(missing)}.")
+        found = tuple(term for term, column in zip(normalized, columns) if column >= 0)
+        kw_df, co_df = term_data(backend, filters, found) if found else (pd.DataFrame(), pd.DataFrame())
+    else:
+        kw_df, co_df = keyword_data(backend, filters)
+    legend_title = "Term" if picked else "Keyword"
+
+    if not kw_df.empty:
+        kw_lines = (
+            alt.Chart(kw_df)
+            .mark_line(point=alt.OverlayMarkDef(size=30), strokeWidth=2)
+            .encode(
+                x=alt.X("month:T", title="Month", axis=alt.Axis(format="%b %Y")),
+                y=alt.Y("mentions:Q", title="Mentions"),
+                color=alt.Color("keyword:N", title=legend_title),
+                tooltip=[
+                    alt.Tooltip("month:T", title="Month", format="%B %Y"),
+                    alt.Tooltip("keyword:N", title=legend_title),
+                    "mentions:Q",
+                ],
+            )
+            .properties(height=350)
+        )
 
-keyword_rows = []
-for label, pattern in keywords.items():
-    monthly_kw = (
-        filtered[filtered["body"].str.contains(pattern, na=False)]
-        .groupby("month")
-        .size()
-        .reset_index(name="mentions")
+        kw_chart = (kw_lines + policy_overlay()).interactive()
+        show_chart(kw_chart, "keyword_trend")
+
+        if not picked:
+            st.markdown("""
+            <div class="takeaway">
+                <strong>Takeaway:</strong> "Skills-based" is by far the most-used term, appearing in
+                over half of all records — it has successfully entered the public vocabulary.
+                "STARs" and "degree requirement" show moderate adoption, typically in communities
+                already engaged with federal hiring policy. But "paper ceiling" — the central
+                metaphor of the Opportunity@Work research program — has <strong>zero mentions</strong>
+                in this corpus. This is a significant finding: the academic framing that motivates
+                the policy movement has not yet penetrated the communities it aims to serve. For
+                Opportunity@Work's communications strategy, this suggests an opportunity to seed
+                the "paper ceiling" concept in the same subreddits where "skills-based" already
+                resonates.
+            </div>
+            """, unsafe_allow_html=True)
+
+        # Keyword co-occurrence
+        st.markdown("#### Keyword Co-occurrence")
+        st.markdown("""
+        When someone mentions one keyword, what other terms appear in the same record? High
+        co-occurrence suggests concepts are linked in public understanding; low co-occurrence
+        suggests they operate as separate conversations.
+        """)
+
+        if not co_df.empty:
+            co_heatmap = (
+                alt.Chart(co_df)
+                .mark_rect(cornerRadius=3)
+                .encode(
+                    x=alt.X("primary:N", title=f"Primary {legend_title}"),
+                    y=alt.Y("co-occurs with:N", title=f"Co-occurring {legend_title}"),
+                    color=alt.Color(
+                        "co-occurrence %:Q",
+                        title="Co-occurrence %",
+                        scale=alt.Scale(scheme="blues"),
+                    ),
+                    tooltip=["primary:N", "co-occurs with:N", alt.Tooltip("co-occurrence %:Q", format=".1f")],
+                )
+                .properties(height=250)
+            )
+            show_chart(co_heatmap, "keyword_cooccurrence")
+
+            if not picked:
+                st.markdown("""
+                <div class="takeaway">
+                    <strong>Takeaway:</strong> "Skills-based" and "degree requirement" co-occur
+                    frequently — people discussing one tend to discuss the other, which aligns with
+                    the Heck et al. (2024) finding that degree requirement removal is the most
+                    visible policy lever. "RIF," however, shows lower co-occurrence with reform
+                    terminology, confirming that workforce reduction operates as a <em>separate
+                    discourse</em> rather than an integrated part of the hiring reform conversation.
+                    This is both a risk (RIF negativity bleeds into adjacent discussions) and an
+                    opportunity (the reform narrative can be insulated from austerity framing with
+                    deliberate messaging).
+                </div>
+                """, unsafe_allow_html=True)
+    else:
+        st.info(f"No {legend_title.lower()} matches found in the filtered data.")
+
+    st.markdown("#### Emerging Terms")
+    st.markdown(f"""
+    Which words and phrases are suddenly more common? Every term used in at least {TERM_MIN_DF}
+    records is tracked, not only the keywords above. A term is emerging in a month when its share
+    of records is well above its share over the {BASELINE_MONTHS} months before. Pick one above to
+    chart it.
+    """)
+    emerging = emerging_terms(backend, filters)
+    if emerging.empty:
+        st.info("No emerging terms in the filtered data; the date range needs more than one month.")
+        return
+    months = sorted(emerging["month"].unique(), reverse=True)
+    month = st.selectbox("Month", months, format_func=lambda m: f"{pd.Timestamp(m):%B %Y}", key="emerging_month")
+    rows = emerging[emerging["month"] == month]
+    emerging_bars = (
+        alt.Chart(rows[["term", "mentions", "share", "baseline_share", "growth"]])
+        .mark_bar(color=PALETTE[1])
+        .encode(
+            x=alt.X("growth:Q", title="Share of records vs. baseline (x)"),
+            y=alt.Y("term:N", title=None, sort="-x"),
+            tooltip=[
+                "term:N",
+                alt.Tooltip("mentions:Q", title="Records"),
+                alt.Tooltip("share:Q", title="Share this month (%)", format=".1f"),
+                alt.Tooltip("baseline_share:Q", title="Baseline share (%)", format=".1f"),
+                alt.Tooltip("growth:Q", title="Growth", format=".1f"),
+            ],
+        )
+        .properties(height=max(150, 28 * len(rows)))
     )
-    monthly_kw["keyword"] = label
-    keyword_rows.append(monthly_kw)
+    show_chart(emerging_bars, "emerging_terms")
+    st.caption(
+        "Shares count one added mention, so terms new this month rank high without dividing by zero. "
+        f"The first month in the date range has no baseline. Terms need at least "
+        f"{MIN_MENTIONS} records in the month."
+    )
+
 
-if keyword_rows:
-    kw_df = pd.concat(keyword_rows, ignore_index=True)
+# Section 6: Thread Dynamics
+# The scatter plots at most this many threads (those with the most records)
+THREAD_CHART_LIMIT = 1_000
 
-    kw_lines = (
-        alt.Chart(kw_df)
-        .mark_line(point=alt.OverlayMarkDef(size=30), strokeWidth=2)
+
+def render_threads(filters):
+    st.markdown("## Thread Dynamics")
+    st.markdown('<p class="research-q">Which conversations draw replies, and how divided are they?</p>', unsafe_allow_html=True)
+
+    st.markdown("""
+    Posts and comments are grouped into threads. Each thread is summarized once by the data
+    pipeline: how many replies it drew, how long the conversation ran, its top score, and how
+    far apart the sentiment of its records sits. A thread with a wide sentiment spread is one
+    where participants disagree in tone.
+    """)
+
+    thread_df = thread_data(backend, filters)
+
+    col_t1, col_t2, col_t3 = st.columns(3)
+    col_t1.metric("Threads", f"{len(thread_df):,}")
+    col_t2.metric("Median replies per thread", f"{thread_df['comments'].median():.0f}")
+    col_t3.metric("Median thread lifetime", f"{thread_df['lifetime_hours'].median() / 24:,.1f} days")
+
+    st.markdown("#### Replies vs. Sentiment Spread")
+    chart_df = thread_df.nlargest(THREAD_CHART_LIMIT, "records").assign(
+        sentiment_sd=lambda t: np.sqrt(t["sentiment_var"]),
+    )[["title", "subreddit", "comments", "sentiment_mean", "sentiment_sd", "max_score"]]
+    spread = (
+        alt.Chart(chart_df)
+        .mark_circle(opacity=0.7)
         .encode(
-            x=alt.X("month:T", title="Month", axis=alt.Axis(format="%b %Y")),
-            y=alt.Y("mentions:Q", title="Mentions"),
-            color=alt.Color("keyword:N", title="Keyword"),
+            x=alt.X("comments:Q", title="Replies"),
+            y=alt.Y("sentiment_sd:Q", title="Sentiment spread (SD)"),
+            size=alt.Size("max_score:Q", title="Top score", scale=alt.Scale(range=[20, 400])),
+            color=alt.Color("subreddit:N", title="Subreddit"),
             tooltip=[
-                alt.Tooltip("month:T", title="Month", format="%B %Y"),
-                "keyword:N",
-                "mentions:Q",
+                "title:N",
+                "subreddit:N",
+                "comments:Q",
+                alt.Tooltip("sentiment_mean:Q", title="Mean sentiment", format=".3f"),
+                alt.Tooltip("sentiment_sd:Q", title="Spread", format=".3f"),
+                alt.Tooltip("max_score:Q", title="Top score"),
             ],
         )
         .properties(height=350)
+        .interactive()
+    )
+    show_chart(spread, "thread_spread")
+
+    st.markdown("#### Most-Discussed Threads")
+    st.dataframe(
+        thread_df.nlargest(20, ["comments", "max_score"])[
+            ["title", "subreddit", "comments", "sentiment_mean", "sentiment_var", "first_utc", "lifetime_hours", "max_score"]
+        ],
+        column_config={
+            "title": st.column_config.TextColumn("Thread", width="large"),
+            "subreddit": st.column_config.TextColumn("Subreddit", width="small"),
+            "comments": st.column_config.NumberColumn("Replies", width="small"),
+            "sentiment_mean": st.column_config.NumberColumn("Mean sentiment", format="%.3f"),
+            "sentiment_var": st.column_config.NumberColumn("Sentiment variance", format="%.3f"),
+            "first_utc": st.column_config.DatetimeColumn("Started", format="MMM D, YYYY"),
+            "lifetime_hours": st.column_config.NumberColumn("Lifetime (h)", format="%.1f"),
+            "max_score": st.column_config.NumberColumn("Top score", width="small"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.markdown("#### Do Replies Echo Their Parent?")
+    st.markdown("""
+    Each point is a post or comment that drew replies. Its own sentiment is set against the mean
+    sentiment of every reply beneath it. Points along the diagonal are conversations
+    that keep the opening tone; points far from it are ones the replies push the other way.
+    """)
+    replies = reply_data(backend, filters)
+    echo = (
+        alt.Chart(replies.nlargest(THREAD_CHART_LIMIT, "replies")[["type", "depth", "replies", "sentiment_score", "reply_sentiment"]])
+        .mark_circle(opacity=0.6)
+        .encode(
+            x=alt.X("sentiment_score:Q", title="Sentiment of post/comment"),
+            y=alt.Y("reply_sentiment:Q", title="Mean sentiment of its replies"),
+            size=alt.Size("replies:Q", title="Replies", scale=alt.Scale(range=[20, 300])),
+            color=alt.Color("type:N", title="Type", scale=alt.Scale(domain=["post", "comment"], range=["#2C3E50", "#E67E22"])),
+            tooltip=[
+                "type:N",
+                "depth:Q",
+                "replies:Q",
+                alt.Tooltip("sentiment_score:Q", format=".3f"),
+                alt.Tooltip("reply_sentiment:Q", format=".3f"),
+            ],
+        )
+        .properties(height=300)
+    )
+    show_chart(echo, "reply_echo")
+
+    st.caption(
+        "Filters choose which threads appear (any thread with a matching record); thread "
+        "statistics always cover every collected record in the thread. Threads whose post was "
+        "not collected have no title."
     )
 
-    kw_chart = (kw_lines + policy_rules_and_labels()).interactive()
-    st.altair_chart(kw_chart, use_container_width=True)
+
+# Section 7: Voices from the Discourse
+def render_voices(filters):
+    st.markdown("## Voices from the Discourse")
+    st.markdown('<p class="research-q">What are people actually saying?</p>', unsafe_allow_html=True)
+
+    st.markdown("""
+    Quantitative analysis reveals patterns, but the individual voices behind the data give
+    those patterns meaning. The quotes below are the highest-upvoted records in the filtered
+    dataset — community-validated contributions that represent what resonates most with
+    these audiences. Below them, a searchable table provides access to all primary sources.
+    """)
+
+    # Featured quotes — top upvoted
+    st.markdown("#### Featured Quotes")
+    n_quotes = st.select_slider("Number of quotes", options=[5, 10, 25, 50, 100, TOP_K], value=5)
+    top_records = top_quotes(backend, filters, n_quotes)
+    for row in top_records.itertuples(index=False):
+        # Escaped after truncating, so no entity is cut in half
+        body_text = str(row.body)[:500]
+        if len(str(row.body)) > 500:
+            body_text += "..."
+        body_text = html.escape(body_text).replace("\n", "<br>")
+        sentiment_color = "#27AE60" if row.sentiment_label == "positive" else (
+            "#C0392B" if row.sentiment_label == "negative" else "#7F8C8D"
+        )
+        st.markdown(
+            f'<div class="quote-card">{body_text}'
+            f'<div class="quote-meta">r/{html.escape(str(row.subreddit))} · {row.date.strftime("%b %d, %Y")} · '
+            f'Score: {row.score} · '
+            f'<span style="color:{sentiment_color}">{row.sentiment_label}</span></div></div>',
+            unsafe_allow_html=True,
+        )
+        showing = st.session_state.get("similar_quote") == row.pos
+        st.button(
+            "Hide similar" if showing else "More like this",
+            key=f"similar_{row.pos}",
+            on_click=toggle_similar_quote,
+            args=(row.pos,),
+        )
+        if showing:
+            render_similar(filters, row.pos)
 
     st.markdown("""
     <div class="takeaway">
-        <strong>Takeaway:</strong> "Skills-based" is by far the most-used term, appearing in
-        over half of all records — it has successfully entered the public vocabulary.
-        "STARs" and "degree requirement" show moderate adoption, typically in communities
-        already engaged with federal hiring policy. But "paper ceiling" — the central
-        metaphor of the Opportunity@Work research program — has <strong>zero mentions</strong>
-        in this corpus. This is a significant finding: the academic framing that motivates
-        the policy movement has not yet penetrated the communities it aims to serve. For
-        Opportunity@Work's communications strategy, this suggests an opportunity to seed
-        the "paper ceiling" concept in the same subreddits where "skills-based" already
-        resonates.
+        <strong>Takeaway:</strong> The most-upvoted records tend to reflect lived experience —
+        practitioners describing what they have seen on the ground, not abstract policy
+        arguments. This aligns with Blair et al.'s emphasis on the 70 million STARs whose
+        competence is demonstrated through work, not credentials. The discourse is anchored
+        in personal testimony, which suggests that communications strategies built around
+        individual stories may resonate more effectively than policy white papers in these
+        communities.
     </div>
     """, unsafe_allow_html=True)
 
-    # Keyword co-occurrence
-    st.markdown("#### Keyword Co-occurrence")
-    st.markdown("""
-    When someone mentions one keyword, what other terms appear in the same record? High
-    co-occurrence suggests concepts are linked in public understanding; low co-occurrence
-    suggests they operate as separate conversations.
-    """)
+    browse_records(filters)
+
+
+def toggle_similar_quote(pos):
+    showing = st.session_state.get("similar_quote") == pos
+    st.session_state["similar_quote"] = None if showing else pos
+
+
+def render_similar(filters, pos):
+    """Table of the records in the current filter most similar to the record at ``pos``."""
+    similar = similar_records(backend, filters, int(pos), SIMILAR_K)
+    if similar.empty:
+        st.caption("No similar records in the current filter.")
+        return
+    st.dataframe(
+        similar.assign(date=similar["date"].dt.strftime("%Y-%m-%d")),
+        column_config={
+            "similarity": st.column_config.ProgressColumn("Similarity", min_value=0.0, max_value=1.0, format="%.2f"),
+            "date": st.column_config.TextColumn("Date", width="small"),
+            "subreddit": st.column_config.TextColumn("Subreddit", width="small"),
+            "sentiment_label": st.column_config.TextColumn("Sentiment", width="small"),
+            "score": st.column_config.NumberColumn("Score", width="small"),
+            "body": st.column_config.TextColumn("Content", width="large"),
+        },
+        column_order=["similarity", "date", "subreddit", "sentiment_label", "score", "body"],
+        hide_index=True,
+        use_container_width=True,
+    )
 
-    co_data = []
-    for primary_label, primary_pattern in keywords.items():
-        primary_mask = filtered["body"].str.contains(primary_pattern, na=False)
-        primary_count = primary_mask.sum()
-        if primary_count == 0:
-            continue
-        for secondary_label, secondary_pattern in keywords.items():
-            if secondary_label == primary_label:
-                continue
-            both = (primary_mask & filtered["body"].str.contains(secondary_pattern, na=False)).sum()
-            pct = both / primary_count * 100 if primary_count > 0 else 0
-            co_data.append({
-                "primary": primary_label,
-                "co-occurs with": secondary_label,
-                "co-occurrence %": round(pct, 1),
-            })
-
-    if co_data:
-        co_df = pd.DataFrame(co_data)
-        co_heatmap = (
-            alt.Chart(co_df)
-            .mark_rect(cornerRadius=3)
-            .encode(
-                x=alt.X("primary:N", title="Primary Keyword"),
-                y=alt.Y("co-occurs with:N", title="Co-occurring Keyword"),
-                color=alt.Color(
-                    "co-occurrence %:Q",
-                    title="Co-occurrence %",
-                    scale=alt.Scale(scheme="blues"),
-                ),
-                tooltip=["primary:N", "co-occurs with:N", alt.Tooltip("co-occurrence %:Q", format=".1f")],
-            )
-            .properties(height=250)
+
+@st.fragment
+def browse_records(filters):
+    """Paged record table; searching, sorting or paging reruns only this fragment.
+
+    Only the current page is sent to the browser, with bodies cut to a
+    preview; a selected row's full text is read on its own.
+    """
+    st.markdown("#### Browse All Records")
+    search_column, sort_column = st.columns([3, 1])
+    search_query = search_column.text_input("Search text content", placeholder="e.g. skills-based, degree, RIF...")
+    sort = sort_column.selectbox("Sort by", list(BROWSE_SORTS), key="browse_sort")
+    query = normalize_query(search_query)
+
+    positions = browse_positions(backend, filters, query, sort)
+    n_pages = max(1, -(-len(positions) // PAGE_ROWS))
+    table_slot = st.container()
+    # Keyed on the view, so a new search, sort or filter starts again at page 1
+    page = st.number_input(
+        f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1,
+        key=f"browse_page_{hash((normalize_filters(filters), query, sort))}",
+    ) - 1
+    rows = browse_page(backend, filters, query, sort, page)
+
+    # Selecting a row reruns only this fragment, shows its full text and lists records like it
+    table = table_slot.dataframe(
+        rows,
+        column_config={
+            "date": st.column_config.TextColumn("Date", width="small"),
+            "subreddit": st.column_config.TextColumn("Subreddit", width="small"),
+            "type": st.column_config.TextColumn("Type", width="small"),
+            "sentiment_label": st.column_config.TextColumn("Sentiment", width="small"),
+            "score": st.column_config.NumberColumn("Score", width="small"),
+            "body": st.column_config.TextColumn("Content", width="large"),
+            "pos": None,
+        },
+        use_container_width=True,
+        height=400,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="browse_table",
+    )
+
+    first = page * PAGE_ROWS
+    st.caption(f"Showing {first + 1 if len(rows) else 0:,}–{first + len(rows):,} of {len(positions):,} records"
+               + (f' matching "{search_query}"' if search_query else "")
+               + f" · {sort} across all pages · select a row for its full text and records like it")
+
+    selected = [row for row in table.selection.rows if row < len(rows)]
+    if selected:
+        pos = int(rows["pos"].iloc[selected[0]])
+        record = backend.take([pos], ["title", "body"]).iloc[0]
+        st.markdown("##### Full text")
+        title = record["title"] if pd.notna(record["title"]) else ""
+        heading = f"<strong>{html.escape(title)}</strong><br>" if title else ""
+        body = html.escape(str(record["body"])).replace("\n", "<br>")
+        st.markdown(f'<div class="quote-card">{heading}{body}</div>', unsafe_allow_html=True)
+        st.markdown("##### More like this")
+        render_similar(filters, pos)
+
+    # Exports are generated only when clicked, streamed from the backend in
+    # batches to a temporary file: every matching record, in full, in table order.
+    matches = search_matches(query) if query else None
+    for column, (label, fmt) in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS.items()):
+        column.download_button(
+            f"Download {label}",
+            data=functools.partial(export_records, filters, matches, sort, label),
+            file_name=f"reddit_skills_records.{fmt.extension}",
+            mime=fmt.mime,
+            key=f"export_{fmt.extension}",
+            use_container_width=True,
         )
-        st.altair_chart(co_heatmap, use_container_width=True)
 
-        st.markdown("""
-        <div class="takeaway">
-            <strong>Takeaway:</strong> "Skills-based" and "degree requirement" co-occur
-            frequently — people discussing one tend to discuss the other, which aligns with
-            the Heck et al. (2024) finding that degree requirement removal is the most
-            visible policy lever. "RIF," however, shows lower co-occurrence with reform
-            terminology, confirming that workforce reduction operates as a <em>separate
-            discourse</em> rather than an integrated part of the hiring reform conversation.
-            This is both a risk (RIF negativity bleeds into adjacent discussions) and an
-            opportunity (the reform narrative can be insulated from austerity framing with
-            deliberate messaging).
-        </div>
-        """, unsafe_allow_html=True)
+
+SECTIONS = {
+    "Volume & Policy Events": render_volume,
+    "Sentiment": render_sentiment,
+    "Framing": render_frames,
+    "Keywords": render_keywords,
+    "Threads": render_threads,
+    "Voices": render_voices,
+}
+
+# ── Sidebar Filters ──────────────────────────────────────────────────────────
+st.sidebar.markdown("### Filters")
+
+bounds = backend.bounds()
+if diag.enabled:
+    diag.stage("corpus", bounds.total, backend.memory_bytes())
+min_date = bounds.min_date
+max_date = bounds.max_date
+date_range = st.sidebar.date_input(
+    "Date range",
+    value=(min_date, max_date),
+    min_value=min_date,
+    max_value=max_date,
+)
+
+all_subs = bounds.subreddits
+selected_subs = st.sidebar.multiselect("Subreddits", options=all_subs, default=all_subs)
+
+content_type = st.sidebar.radio("Content type", ["All", "Posts only", "Comments only"])
+
+all_tiers = bounds.tiers
+selected_tiers = st.sidebar.multiselect("Engagement tier", options=all_tiers, default=all_tiers)
+
+exclude_bursts = st.sidebar.checkbox(
+    "Exclude posting bursts",
+    help="Hide records flagged as part of an author's burst of activity in one subreddit "
+    "(possible brigading); see burst_flag in the data dictionary.",
+)
+
+st.sidebar.markdown("### Time Series")
+granularity = st.sidebar.radio("Granularity", ["Day", "Week", "Month", "Rolling"], index=2, horizontal=True)
+rolling_days = st.sidebar.slider(
+    "Rolling window (days)", min_value=3, max_value=90, value=30,
+    disabled=granularity != "Rolling",
+)
+
+if len(date_range) == 2:
+    d_start, d_end = date_range
 else:
-    st.info("No keyword matches found in the filtered data.")
+    d_start, d_end = min_date, max_date
 
-# ── Section 6: Voices from the Discourse ─────────────────────────────────────
-st.markdown("---")
-st.markdown("## Voices from the Discourse")
-st.markdown('<p class="research-q">What are people actually saying?</p>', unsafe_allow_html=True)
+filters = FilterState(
+    start=d_start,
+    end=d_end,
+    subreddits=tuple(selected_subs),
+    content_type=content_type,
+    tiers=tuple(selected_tiers),
+    exclude_bursts=exclude_bursts,
+)
+n_filtered = count_records(backend, filters)
+diag.stage("filtered", n_filtered)
 
-st.markdown("""
-Quantitative analysis reveals patterns, but the individual voices behind the data give
-those patterns meaning. The quotes below are the highest-upvoted records in the filtered
-dataset — community-validated contributions that represent what resonates most with
-these audiences. Below them, a searchable table provides access to all primary sources.
-""")
+st.sidebar.markdown("---")
+st.sidebar.markdown(f"**Showing {n_filtered:,} of {bounds.total:,} records**")
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS or None)
+def watch_stream():
+    # Lists the partition directory on a timer; new partitions rerun the app,
+    # which extends the indexes and recomputes only the results they affect
+    if live_partitions() != live:
+        st.rerun()
+    if live:
+        corpus = load_live(live)
+        st.caption(f"Live: includes {corpus['records']:,} streamed records, "
+                   f"latest {corpus['latest']:%b %d, %Y %H:%M}")
+
+with st.sidebar:
+    watch_stream()
 
-# Featured quotes — top upvoted
-st.markdown("#### Featured Quotes")
-top_records = filtered.nlargest(5, "score")
-for _, row in top_records.iterrows():
-    body_text = str(row["body"])[:500]
-    if len(str(row["body"])) > 500:
-        body_text += "..."
-    sentiment_color = "#27AE60" if row["sentiment_label"] == "positive" else (
-        "#C0392B" if row["sentiment_label"] == "negative" else "#7F8C8D"
-    )
-    st.markdown(
-        f'<div class="quote-card">{body_text}'
-        f'<div class="quote-meta">r/{row["subreddit"]} · {row["date"].strftime("%b %d, %Y")} · '
-        f'Score: {row["score"]} · '
-        f'<span style="color:{sentiment_color}">{row["sentiment_label"]}</span></div></div>',
-        unsafe_allow_html=True,
-    )
+# ── Section 1: Title & Research Context ──────────────────────────────────────
+st.markdown("# Skills-Based Hiring in Public Discourse")
+st.markdown(
+    "*How Reddit communities discuss workforce reform, degree requirements, and the opportunity gap*"
+)
 
 st.markdown("""
-<div class="takeaway">
-    <strong>Takeaway:</strong> The most-upvoted records tend to reflect lived experience —
-    practitioners describing what they have seen on the ground, not abstract policy
-    arguments. This aligns with Blair et al.'s emphasis on the 70 million STARs whose
-    competence is demonstrated through work, not credentials. The discourse is anchored
-    in personal testimony, which suggests that communications strategies built around
-    individual stories may resonate more effectively than policy white papers in these
-    communities.
-</div>
-""", unsafe_allow_html=True)
+In the United States, over 70 million workers are **Skilled Through Alternative Routes (STARs)** —
+they have the skills employers need but lack a four-year degree. A growing body of research documents
+the "paper ceiling" that excludes these workers from quality jobs despite demonstrated competency.
+This dashboard explores how public discourse on Reddit reflects — and sometimes anticipates — the
+policy shifts that have made skills-based hiring a bipartisan priority across 25 states.
+""")
 
-# Searchable data table
-st.markdown("#### Browse All Records")
-search_query = st.text_input("Search text content", placeholder="e.g. skills-based, degree, RIF...")
+# Stat callout cards
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.markdown("""
+    <div class="stat-card">
+        <div class="stat-value">70M+</div>
+        <div class="stat-label">Workers are STARs in the US</div>
+    </div>
+    """, unsafe_allow_html=True)
+with col2:
+    st.markdown("""
+    <div class="stat-card">
+        <div class="stat-value">25</div>
+        <div class="stat-label">States committed to removing degree requirements</div>
+    </div>
+    """, unsafe_allow_html=True)
+with col3:
+    st.markdown("""
+    <div class="stat-card">
+        <div class="stat-value">2.5pp</div>
+        <div class="stat-label">Annual decline in degree requirements per year of policy exposure</div>
+    </div>
+    """, unsafe_allow_html=True)
 
-table_data = filtered.copy()
-if search_query:
-    table_data = table_data[
-        table_data["body"].str.contains(search_query, case=False, na=False)
-    ]
+st.caption("Blair, Debroy & Heck 2021; Heck, Corcoran de Castillo, Blair & Debroy 2024")
 
-display_cols = ["date", "subreddit", "type", "sentiment_label", "score", "body"]
-table_display = table_data[display_cols].copy()
-table_display["date"] = table_display["date"].dt.strftime("%Y-%m-%d")
-table_display = table_display.sort_values("date", ascending=False).reset_index(drop=True)
-
-st.dataframe(
-    table_display,
-    column_config={
-        "date": st.column_config.TextColumn("Date", width="small"),
-        "subreddit": st.column_config.TextColumn("Subreddit", width="small"),
-        "type": st.column_config.TextColumn("Type", width="small"),
-        "sentiment_label": st.column_config.TextColumn("Sentiment", width="small"),
-        "score": st.column_config.NumberColumn("Score", width="small"),
-        "body": st.column_config.TextColumn("Content", width="large"),
-    },
-    use_container_width=True,
-    height=400,
-)
+if n_filtered == 0:
+    st.warning("No data matches the current filters. Adjust the sidebar filters.")
+    st.stop()
 
-st.caption(f"Showing {len(table_display):,} records" + (f' matching "{search_query}"' if search_query else ""))
+# ── Sections 2–7: Tabbed Analysis ────────────────────────────────────────────
+st.markdown("---")
+section_tabs = st.tabs(list(SECTIONS), key="section", on_change="rerun")
+for tab, render in zip(section_tabs, SECTIONS.values()):
+    if tab.open:
+        with tab, diag.section(render.__name__):
+            render(filters)
 
-# ── Section 7: Methodology & Data Notes ──────────────────────────────────────
+# ── Section 8: Methodology & Data Notes ──────────────────────────────────────
 st.markdown("---")
 st.markdown("## Methodology & Data Notes")
 
@@ -824,14 +1927,16 @@ r/humanresources, r/deptHHS, r/careerguidance
 - Date parsing and month aggregation
 - Sentiment scoring via TextBlob polarity (-1.0 to +1.0)
 - Engagement tier binning (low / medium / high / viral)
-- 15-field data dictionary maintained alongside the dataset
+- Topic modelling: mini-batch NMF over TF-IDF of the record text
+- 21-field data dictionary maintained alongside the dataset
 
 **Sentiment model:** TextBlob polarity scores with thresholds at +/-0.1 for positive/negative
 classification. Manual validation on a random sample of n=50 records showed **84% agreement**
 with human judgment. TextBlob tends to undercount sarcasm and domain-specific negativity.
 
 **Limitations:**
-- Small corpus (n=491) limits statistical power for subreddit-level comparisons
+- Small corpus (n=491) limits statistical power for subreddit-level comparisons; the sentiment
+  charts show 95% bootstrap intervals so overlapping groups are not over-read
 - TextBlob's lexicon-based approach has limited nuance for policy discourse
 - Reddit's user base skews younger, male, and more tech-savvy than the general population
 - Subreddit culture effects may drive sentiment more than topic-level factors
@@ -844,7 +1949,7 @@ with human judgment. TextBlob tends to undercount sarcasm and domain-specific ne
   progress on skills-based hiring.](https://opportunityatwork.org/our-solutions/stars-insights/paper-ceiling-state-policy/) Opportunity@Work.
     """)
 
-# ── Section 8: Footer ────────────────────────────────────────────────────────
+# ── Section 9: Footer ────────────────────────────────────────────────────────
 st.markdown("---")
 st.markdown(
     '<p style="text-align:center; color:#95A5A6; font-size:0.85rem;">'
@@ -855,3 +1960,27 @@ st.markdown(
     "</p>",
     unsafe_allow_html=True,
 )
+
+# ── Diagnostics Panel ────────────────────────────────────────────────────────
+if DIAGNOSTICS:
+    record = diag.append_log(DIAGNOSTICS_LOG, backend=backend.name, filters=filters._asdict())
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        st.metric("Rerun time", f"{record['total_seconds'] * 1000:,.0f} ms")
+        st.markdown("**Sections**")
+        st.dataframe(
+            pd.DataFrame(list(record["sections"].items()), columns=["section", "seconds"]),
+            hide_index=True, use_container_width=True,
+        )
+        st.markdown("**Stages**")
+        st.dataframe(pd.DataFrame(record["stages"]), hide_index=True, use_container_width=True)
+        st.markdown("**Cache**")
+        st.dataframe(diag.cache_table(), hide_index=True, use_container_width=True)
+        cache_stats = result_cache().stats()
+        st.caption(
+            f"Shared result cache: {cache_stats['entries']} entries, "
+            f"{cache_stats['bytes'] / 2**20:,.1f} of {cache_stats['budget_bytes'] / 2**20:,.0f} MB, "
+            f"{cache_stats['evictions']} evicted"
+        )
+        st.markdown("**Chart payloads**")
+        st.dataframe(pd.DataFrame(record["charts"]), hide_index=True, use_container_width=True)
+        st.caption(f"Appended to {DIAGNOSTICS_LOG}")